@@ -5,12 +5,29 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Contoh menjalankan: ``uvicorn ecommerce.asgi:application --workers 4``.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+# Di ASGI kode sinkron tiap request berjalan di thread-nya sendiri, jadi koneksi persisten
+# tidak bisa dipakai ulang antar request; pakai pooling di sisi database (mis. pgbouncer).
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+
+class EcommerceASGIHandler(ASGIHandler):
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None and settings.ASYNC_READ_VIEWS:
+            request.urlconf = 'ecommerce.urls_async'
+        return request, error_response
+
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+application = EcommerceASGIHandler()
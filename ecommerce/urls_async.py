@@ -0,0 +1,14 @@
+# ecommerce/urls_async.py
+# URLconf untuk deployment ASGI (dipilih oleh ecommerce/asgi.py): aksi baca katalog dan
+# riwayat order dilayani view async, semua URL lain sama dengan ecommerce/urls.py.
+from django.urls import path, include
+
+from ecommerceapp.async_views import async_urlpatterns
+from ecommerceapp.urls import router
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/v1/', include(async_urlpatterns(router.urls))),
+    *sync_urlpatterns,
+]
@@ -7,4 +7,5 @@ site.register(Product)
 site.register(CartItem)
 site.register(Order)
 site.register(OrderItem)
-site.register(Category)
\ No newline at end of file
+site.register(Category)
+site.register(OutboxJob)
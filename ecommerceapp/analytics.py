@@ -0,0 +1,181 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .db_utils import increment_or_create
+from .models import CustomUser, Order, OrderItem, SellerProductSalesRollup, SellerSalesRollup
+
+PERIODS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _collect(orders, items, sign, status=None, order_rows=None, product_rows=None):
+    if order_rows is None:
+        order_rows = defaultdict(lambda: {'order_count': 0, 'units': 0, 'revenue': Decimal('0')})
+    if product_rows is None:
+        product_rows = defaultdict(lambda: {'units': 0, 'revenue': Decimal('0')})
+
+    keys = {}
+    for order in orders:
+        if order.seller_id is None:
+            continue
+        keys[order.pk] = (order.seller_id, timezone.localdate(order.created_at), status or order.status)
+        order_rows[keys[order.pk]]['order_count'] += sign
+
+    for item in items:
+        key = keys.get(item.order_id)
+        if key is None:
+            continue
+        seller_id, day, order_status = key
+        amount = item.quantity * item.price
+        order_rows[key]['units'] += sign * item.quantity
+        order_rows[key]['revenue'] += sign * amount
+        product_row = product_rows[(seller_id, item.product_id, day, order_status)]
+        product_row['units'] += sign * item.quantity
+        product_row['revenue'] += sign * amount
+    return order_rows, product_rows
+
+
+def _lock_sellers(seller_ids):
+    """
+    Kunci baris user seller (urut id agar tidak deadlock) sampai transaksi selesai. Semua penulis
+    rollup mengambil kunci ini, sehingga increment tidak menyela hapus-lalu-hitung-ulang rebuild_rollups.
+    SQLite mengabaikannya; di sana transaksi IMMEDIATE sudah berjalan berurutan.
+    """
+    if seller_ids:
+        list(CustomUser.objects.select_for_update().filter(pk__in=seller_ids).order_by('pk').values_list('pk'))
+
+
+def _apply(order_rows, product_rows):
+    _lock_sellers({key[0] for key in order_rows} | {key[0] for key in product_rows})
+    increment_or_create(SellerSalesRollup, ('seller', 'day', 'status'), order_rows)
+    increment_or_create(
+        SellerProductSalesRollup, ('seller', 'product', 'day', 'status'), product_rows, coalesce_keys=('product',),
+    )
+
+
+def record_new_orders(orders, items):
+    _apply(*_collect(orders, items, 1))
+
+
+def merge_deleted_product_rollups(product_ids):
+    """
+    Gabungkan rollup produk yang akan dihapus ke baris product NULL sebelum FK-nya di-SET_NULL,
+    agar tidak bentrok dengan indeks unik (seller, COALESCE(product, 0), day, status).
+    """
+    rollups = SellerProductSalesRollup.objects.filter(product_id__in=product_ids)
+    _lock_sellers(set(rollups.values_list('seller_id', flat=True)))
+    product_rows = defaultdict(lambda: {'units': 0, 'revenue': Decimal('0')})
+    for seller_id, day, status, units, revenue in rollups.values_list('seller_id', 'day', 'status', 'units', 'revenue'):
+        row = product_rows[(seller_id, None, day, status)]
+        row['units'] += units
+        row['revenue'] += revenue
+    if not product_rows:
+        return
+    rollups.delete()
+    increment_or_create(
+        SellerProductSalesRollup, ('seller', 'product', 'day', 'status'), product_rows, coalesce_keys=('product',),
+    )
+
+
+def record_status_changes(orders, old_statuses, items):
+    """Pindahkan rollup banyak order (``order.status`` sudah status baru) dari status lamanya di ``old_statuses``."""
+    order_rows = product_rows = None
+    by_status = defaultdict(list)
+    for order in orders:
+        by_status[old_statuses[order.pk]].append(order)
+    for old_status, group in by_status.items():
+        order_rows, product_rows = _collect(group, items, -1, status=old_status, order_rows=order_rows, product_rows=product_rows)
+    _collect(orders, items, 1, order_rows=order_rows, product_rows=product_rows)
+    _apply(order_rows, product_rows)
+
+
+def rebuild_rollups(seller_id=None, chunk_size=2000):
+    """
+    Hitung ulang rollup dari riwayat Order/OrderItem. Setiap seller diproses dalam satu transaksi
+    dengan barisnya terkunci (lihat _lock_sellers), order dibaca per potongan berdasarkan id.
+    """
+    if seller_id is not None:
+        seller_ids = [seller_id]
+    else:
+        seller_ids = sorted(
+            set(Order.objects.exclude(seller=None).values_list('seller_id', flat=True).distinct())
+            | set(SellerSalesRollup.objects.values_list('seller_id', flat=True).distinct())
+            | set(SellerProductSalesRollup.objects.values_list('seller_id', flat=True).distinct())
+        )
+    return sum(_rebuild_seller(pk, chunk_size) for pk in seller_ids)
+
+
+def _rebuild_seller(seller_id, chunk_size):
+    orders = Order.objects.filter(seller_id=seller_id).order_by('id')
+    with transaction.atomic():
+        _lock_sellers([seller_id])
+        SellerSalesRollup.objects.filter(seller_id=seller_id).delete()
+        SellerProductSalesRollup.objects.filter(seller_id=seller_id).delete()
+
+        last_id = 0
+        processed = 0
+        while True:
+            chunk = list(orders.filter(id__gt=last_id).only('id', 'seller_id', 'created_at', 'status')[:chunk_size])
+            if not chunk:
+                return processed
+            items = OrderItem.objects.filter(order_id__in=[order.pk for order in chunk]).only(
+                'order_id', 'product_id', 'quantity', 'price'
+            )
+            _apply(*_collect(chunk, items, 1))
+            last_id = chunk[-1].pk
+            processed += len(chunk)
+
+
+def sales_summary(seller, period, start, end):
+    day_range = {'seller': seller, 'day__gte': start, 'day__lte': end}
+    trunc = PERIODS[period]
+    bucket = trunc('day') if trunc else F('day')
+
+    buckets = {}
+
+    def get_bucket(value):
+        key = value.isoformat()
+        if key not in buckets:
+            buckets[key] = {
+                'period': key, 'revenue': Decimal('0'), 'orders': 0, 'units': 0, 'status': {}, 'products': [],
+            }
+        return buckets[key]
+
+    status_rows = (
+        SellerSalesRollup.objects.filter(**day_range)
+        .annotate(bucket=bucket).values('bucket', 'status')
+        .annotate(orders=Sum('order_count'), units=Sum('units'), revenue=Sum('revenue'))
+        .order_by('bucket', 'status')
+    )
+    for row in status_rows:
+        entry = get_bucket(row['bucket'])
+        if row['orders']:
+            entry['status'][row['status']] = row['orders']
+        if row['status'] != 'CANCELLED':
+            entry['orders'] += row['orders']
+            entry['units'] += row['units']
+            entry['revenue'] += row['revenue']
+
+    product_rows = (
+        SellerProductSalesRollup.objects.filter(**day_range).exclude(status='CANCELLED')
+        .annotate(bucket=bucket).values('bucket', 'product_id', 'product__name')
+        .annotate(units=Sum('units'), revenue=Sum('revenue'))
+        .order_by('bucket', '-units')
+    )
+    for row in product_rows:
+        if not row['units']:
+            continue
+        get_bucket(row['bucket'])['products'].append({
+            'id': row['product_id'], 'name': row['product__name'],
+            'units': row['units'], 'revenue': row['revenue'],
+        })
+
+    return [buckets[key] for key in sorted(buckets)]
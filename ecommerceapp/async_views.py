@@ -0,0 +1,153 @@
+"""
+Jalur baca async (list/retrieve) untuk katalog dan riwayat order, dipakai saat aplikasi
+dijalankan lewat ASGI (lihat ecommerce/asgi.py).
+
+DRF belum punya view async, jadi setiap AsyncReadView membungkus ViewSet yang sudah ada:
+negosiasi konten, autentikasi, permission, throttle dan pemilihan replica tetap dijalankan
+oleh ``ViewSet.initial()`` (satu kali pindah thread), lalu query dijalankan dengan ORM async
+(acount/aget/async for) dan hasilnya diserialisasi dengan serializer yang sama. Di handler
+ASGI Django setiap request punya thread sinkron sendiri, sehingga request yang sedang
+menunggu database tidak menahan request lain.
+
+Method selain GET/HEAD, dan permintaan Browsable API, diteruskan ke view DRF sinkron.
+"""
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.urls import URLPattern
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .db_router import replica_read_scope
+from .pagination import apaginate_page_number
+from .search import acategory_facets
+from .views import CategoryViewSet, OrderViewSet, ProductViewSet
+
+
+class AsyncReadView:
+    def __init__(self, drf_view):
+        self.fallback = drf_view
+        self.actions = {'head': drf_view.actions['get'], **drf_view.actions}
+        self.action = self.actions['get']
+
+    @classmethod
+    def as_view(cls, drf_view):
+        self = cls(drf_view)
+
+        async def view(request, *args, **kwargs):
+            return await self.dispatch(request, *args, **kwargs)
+
+        # Atribut yang sama dengan view DRF: label metrik instrumentasi dan pengecualian CSRF.
+        view.cls = drf_view.cls
+        view.actions = self.actions
+        view.csrf_exempt = True
+        return view
+
+    def make_viewset(self, request, *args, **kwargs):
+        # Meniru view() di ViewSetMixin.as_view(), tanpa dispatch().
+        view = self.fallback.cls(**self.fallback.initkwargs)
+        view.action_map = self.actions
+        for method, action in self.actions.items():
+            setattr(view, method, getattr(view, action))
+        view.args, view.kwargs = args, kwargs
+        view.request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+        view = self.make_viewset(request, *args, **kwargs)
+        with replica_read_scope():
+            try:
+                await sync_to_async(view.initial)(view.request, *args, **kwargs)
+                if not isinstance(view.request.accepted_renderer, JSONRenderer):
+                    return await sync_to_async(self.fallback)(request, *args, **kwargs)
+                handler = partial(getattr(self, self.action), view)
+                if hasattr(view, 'acached_response'):
+                    response = await view.acached_response(handler, view.request, *args, **kwargs)
+                else:
+                    response = await handler(view.request, *args, **kwargs)
+            except Exception as exc:
+                response = view.handle_exception(exc)
+        return self.finalize(view, response)
+
+    def finalize(self, view, response):
+        response = view.finalize_response(view.request, response)
+        if not isinstance(response, Response):
+            return response
+        # Render di sini agar handler ASGI tidak perlu memanggil response.render() lewat thread lain.
+        response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for name, value in response.items():
+            rendered[name] = value
+        return rendered
+
+    async def paginate(self, view, queryset):
+        paginator = view.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, 'apaginate_queryset'):
+            return await paginator.apaginate_queryset(queryset, view.request, view=view)
+        return await apaginate_page_number(paginator, queryset, view.request)
+
+    async def paginated_response(self, view, data):
+        return view.paginator.get_paginated_response(data)
+
+    async def list(self, view, request, *args, **kwargs):
+        queryset = view.filter_queryset(view.get_queryset())
+        page = await self.paginate(view, queryset)
+        if page is not None:
+            return await self.paginated_response(view, await self.serialize(view, page, many=True))
+        rows = [row async for row in queryset]
+        return Response(await self.serialize(view, rows, many=True))
+
+    async def retrieve(self, view, request, *args, **kwargs):
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        view.check_object_permissions(view.request, instance)
+        return Response(await self.serialize(view, instance))
+
+    async def serialize(self, view, instance, many=False):
+        serializer = view.get_serializer(instance, many=many)
+        # FastSerializer mengambil relasi many (item order) dengan query sendiri, jadi perlu versi async.
+        if hasattr(serializer, 'adata'):
+            return await serializer.adata()
+        return serializer.data
+
+
+class ProductReadView(AsyncReadView):
+    async def paginated_response(self, view, data):
+        response = await super().paginated_response(view, data)
+        if view.search_queryset is not None:
+            response.data['facets'] = {'category': await acategory_facets(view.search_queryset)}
+        return response
+
+
+READ_VIEWS = {
+    ProductViewSet: ProductReadView,
+    CategoryViewSet: AsyncReadView,
+    OrderViewSet: AsyncReadView,
+}
+
+
+def async_urlpatterns(patterns):
+    """
+    Ambil pola URL router yang melayani list/retrieve ViewSet di READ_VIEWS dan ganti
+    view-nya dengan versi async. Regex, sufiks format dan initkwargs router tetap sama.
+    """
+    return [
+        URLPattern(pattern.pattern, READ_VIEWS[pattern.callback.cls].as_view(pattern.callback), pattern.default_args)
+        for pattern in patterns
+        if getattr(pattern.callback, 'cls', None) in READ_VIEWS
+        and pattern.callback.actions.get('get') in ('list', 'retrieve')
+    ]
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import CustomUser
+
+CLAIM_FIELDS = ('email', 'first_name', 'last_name')
+
+
+def _state_key(user_id):
+    return f'auth:state:{user_id}'
+
+
+def _build_state(is_active, password, *claims):
+    # Hanya hash password (sama dengan klaim REVOKE_TOKEN_CLAIM) yang disimpan, bukan password-nya.
+    return (is_active, get_md5_hash_password(password), *claims)
+
+
+def get_auth_state(user_id):
+    """
+    Status user yang di-cache: (is_active, hash password, email, first_name, last_name).
+    Hanya saat cache kosong database disentuh, itu pun satu SELECT kecil.
+    """
+    key = _state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = CustomUser.objects.filter(pk=user_id).values_list('is_active', 'password', *CLAIM_FIELDS).first()
+        if row is None:
+            return None
+        state = _build_state(*row)
+        cache.set(key, state, settings.AUTH_STATE_CACHE_TIMEOUT)
+    return state
+
+
+def refresh_auth_state(user):
+    cache.set(
+        _state_key(user.pk),
+        _build_state(user.is_active, user.password, *(getattr(user, field) for field in CLAIM_FIELDS)),
+        settings.AUTH_STATE_CACHE_TIMEOUT,
+    )
+
+
+def forget_auth_state(user_id):
+    cache.delete(_state_key(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Jalur cepat opsional untuk JWTAuthentication: request.user dibangun dari klaim token
+    (email, first_name, last_name) tanpa SELECT CustomUser per request.
+
+    User yang dihasilkan adalah instance CustomUser dengan field lain dalam keadaan
+    deferred, jadi baris user baru dimuat dari database ketika view benar-benar membaca
+    atribut khusus model (mis. password saat ganti password). Jika user dinonaktifkan,
+    request ditolak; jika klaim token sudah tidak cocok dengan data terkini (profil
+    diubah), autentikasi kembali ke jalur standar yang memuat user dari database.
+    Dengan CHECK_REVOKE_TOKEN, token yang diterbitkan sebelum password terakhir diganti
+    ditolak berdasarkan hash password di status yang di-cache. Worker lain baru melihat
+    perubahan itu setelah AUTH_STATE_CACHE_TIMEOUT, kecuali cache-nya dipakai bersama.
+    """
+
+    def get_user(self, validated_token):
+        if any(field not in validated_token for field in CLAIM_FIELDS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken('Token contained no recognizable user identification') from e
+
+        state = get_auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        is_active, password_hash, *claims = state
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        if claims != [validated_token[field] for field in CLAIM_FIELDS]:
+            return super().get_user(validated_token)
+
+        values = dict(zip(CLAIM_FIELDS, claims), id=CustomUser._meta.pk.to_python(user_id), is_active=is_active)
+        # from_db mengharapkan nilai sesuai urutan field model; sisanya otomatis deferred.
+        field_names = [field.attname for field in CustomUser._meta.concrete_fields if field.attname in values]
+        return CustomUser.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
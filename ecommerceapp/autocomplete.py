@@ -0,0 +1,303 @@
+"""
+Autocomplete produk dan kategori dari indeks prefix di memori proses.
+
+Nama produk yang tampil di katalog (aktif, stok > 0) dan nama kategori dipecah menjadi kata
+ternormalisasi (huruf kecil, tanpa diakritik). Setiap PrefixIndex menyimpan kosakata terurut
+dan, per kata, posting list berisi nomor baris (array int). Nama disimpan dalam satu blob
+UTF-8 sehingga jutaan produk tidak menjadi jutaan objek str. Prefix dicari dengan bisect
+pada kosakata.
+
+Indeks dibangun saat pertama dipakai. Perubahan Product/Category dari sinyal (dan dari jalur
+massal: checkout, impor) dicatat di delta kecil yang ikut dicari. Saat delta melewati
+AUTOCOMPLETE_DELTA_LIMIT, atau indeks lebih tua dari AUTOCOMPLETE_MAX_AGE (perubahan dari
+proses lain), indeks dibangun ulang di thread latar sementara indeks lama tetap melayani.
+"""
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections
+
+from .models import Category, Product
+from .search import search_terms
+
+# Batas kandidat yang diperiksa per query agar prefix satu huruf tetap cepat.
+MAX_SCAN = 2000
+# Token dengan rentang kosakata lebih lebar dari ini dicek lewat nama, bukan posting list.
+MAX_VERIFY_TERMS = 64
+# Irisan posting list dihitung per jendela nomor baris, dengan batas total entri yang disentuh.
+WINDOW_ROWS = 32768
+MAX_INTERSECT = 100_000
+# Cek lewat nama (~1 us per baris) lebih murah dari irisan (~30 ns per entri posting) bila
+# token paling selektif lebih kecil dari 1/NAME_CHECK_RATIO token berikutnya.
+NAME_CHECK_RATIO = 32
+
+
+def normalize_terms(text):
+    text = text or ''
+    if not text.isascii():
+        text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return search_terms(text)
+
+
+def _matches(terms, tokens):
+    return all(any(term.startswith(token) for term in terms) for token in tokens)
+
+
+def _name_matches(name, patterns):
+    """Cek awalan kata langsung pada nama; normalisasi penuh hanya untuk nama non-ASCII."""
+    text = name.lower()
+    if not text.isascii():
+        text = ' '.join(normalize_terms(name))
+    return all(pattern.search(text) for pattern in patterns)
+
+
+class PrefixIndex:
+    def __init__(self, rows, with_slug=False):
+        """``rows``: (id, name) atau (id, name, slug), terurut sesuai prioritas tampil."""
+        self.ids = array('q')
+        self.offsets = array('Q', [0])
+        self.slugs = [] if with_slug else None
+        blob = bytearray()
+        postings = {}
+        for row, item in enumerate(rows):
+            self.ids.append(item[0])
+            blob += item[1].encode()
+            self.offsets.append(len(blob))
+            if with_slug:
+                self.slugs.append(item[2])
+            for term in set(normalize_terms(item[1])):
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = array('i')
+                posting.append(row)
+        self.blob = bytes(blob)
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def name(self, row):
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].decode()
+
+    def term_range(self, prefix):
+        """Rentang [lo, hi) kosakata yang berawalan ``prefix``."""
+        return bisect_left(self.vocabulary, prefix), bisect_left(self.vocabulary, prefix + '\U0010ffff')
+
+    def range_size(self, term_range):
+        lo, hi = term_range
+        return sum(len(self.postings[self.vocabulary[index]]) for index in range(lo, hi))
+
+    def intersect(self, ranges):
+        """
+        Nomor baris yang ada di setiap rentang (terurut dari yang terkecil), terurut naik. Dihitung per jendela baris
+        (posting list terurut, jadi dipotong dengan bisect) agar query berhenti begitu hasil
+        cukup, dan berhenti setelah sekitar MAX_INTERSECT entri posting disentuh.
+        """
+        budget = MAX_INTERSECT
+        for start in range(0, len(self.ids), WINDOW_ROWS):
+            stop = start + WINDOW_ROWS
+            rows = None
+            for lo, hi in ranges:
+                found = set()
+                for index in range(lo, hi):
+                    posting = self.postings[self.vocabulary[index]]
+                    part = posting[bisect_left(posting, start):bisect_left(posting, stop)]
+                    budget -= len(part)
+                    found.update(part if rows is None else rows.intersection(part))
+                rows = found
+                if not rows:
+                    break
+            yield from sorted(rows)
+            if budget <= 0:
+                return
+
+    def search(self, tokens, limit, skip=()):
+        """
+        Baris yang setiap token-nya menjadi awalan salah satu kata nama. Posting list token
+        dengan rentang kosakata sempit diiris (lihat intersect); token pendek yang rentangnya
+        lebar dicek lewat nama pada kandidat yang tersisa.
+        """
+        narrow, wide = [], []
+        for token in tokens:
+            term_range = self.term_range(token)
+            if term_range[1] - term_range[0] <= MAX_VERIFY_TERMS:
+                narrow.append((self.range_size(term_range), token, term_range))
+            else:
+                wide.append((token, term_range))
+        narrow.sort()
+
+        if len(narrow) > 1 and narrow[0][0] * NAME_CHECK_RATIO < narrow[1][0]:
+            # Token paling selektif jauh lebih kecil: lebih murah mengecek token lain lewat nama kandidatnya.
+            wide += [(token, term_range) for _, token, term_range in narrow[1:]]
+            narrow = narrow[:1]
+        if len(narrow) > 1:
+            candidates = self.intersect([term_range for _, _, term_range in narrow])
+        else:
+            # Satu rentang saja: telusuri posting list-nya langsung, tanpa membangun set.
+            term_range = narrow[0][2] if narrow else wide.pop()[1]
+            candidates = (row for index in range(*term_range) for row in self.postings[self.vocabulary[index]])
+        patterns = [re.compile(r'\b' + re.escape(token)) for token, _ in wide]
+
+        results = []
+        seen = set()
+        for scanned, row in enumerate(candidates):
+            if scanned >= MAX_SCAN or len(results) >= limit:
+                break
+            pk = self.ids[row]
+            if pk in seen or pk in skip:
+                continue
+            seen.add(pk)
+            name = self.name(row)
+            if patterns and not _name_matches(name, patterns):
+                continue
+            if self.slugs is None:
+                results.append({'id': pk, 'name': name})
+            else:
+                results.append({'id': pk, 'name': name, 'slug': self.slugs[row]})
+        return results
+
+
+class Autocomplete:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.products = None
+        self.categories = None
+        self.built_at = 0.0
+        # Produk yang berubah sejak build: id -> nama (None jika tidak tampil lagi), plus
+        # pasangan (kata, id) terurut untuk pencarian prefix di atasnya.
+        self.changed = {}
+        self.delta = []
+        # Perubahan selama rebuild latar berjalan, diterapkan ulang ke indeks baru.
+        self.pending = None
+
+    @property
+    def ready(self):
+        return self.products is not None
+
+    def load(self, product_rows, category_rows):
+        products = PrefixIndex(product_rows)
+        categories = PrefixIndex(category_rows, with_slug=True)
+        with self._lock:
+            pending, self.pending = self.pending, None
+            self.products, self.categories = products, categories
+            self.changed, self.delta = {}, []
+            self.built_at = time.monotonic()
+            for pk, name in (pending or {}).items():
+                self._apply(pk, name)
+
+    def rebuild(self):
+        with self._lock:
+            self.pending = {}
+        self.load(
+            Product.objects.filter(is_active=True, stock__gt=0).order_by('-id')
+            .values_list('id', 'name').iterator(chunk_size=10000),
+            Category.objects.order_by('name').values_list('id', 'name', 'slug'),
+        )
+
+    def ensure_ready(self):
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self.rebuild()
+
+    def update_products(self, names):
+        """Terapkan {id: nama atau None}; diabaikan jika indeks belum pernah dibangun di proses ini."""
+        if not self.ready:
+            return
+        with self._lock:
+            if self.pending is not None:
+                self.pending.update(names)
+            for pk, name in names.items():
+                self._apply(pk, name)
+            stale = len(self.changed) > settings.AUTOCOMPLETE_DELTA_LIMIT
+        if stale:
+            self.rebuild_in_background()
+
+    def refresh_categories(self):
+        if not self.ready:
+            return
+        categories = PrefixIndex(Category.objects.order_by('name').values_list('id', 'name', 'slug'), with_slug=True)
+        with self._lock:
+            self.categories = categories
+
+    def _apply(self, pk, name):
+        old = self.changed.get(pk)
+        if old:
+            for term in set(normalize_terms(old)):
+                del self.delta[bisect_left(self.delta, (term, pk))]
+        self.changed[pk] = name
+        if name:
+            for term in set(normalize_terms(name)):
+                insort(self.delta, (term, pk))
+
+    def rebuild_in_background(self):
+        if not self._build_lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.rebuild()
+            finally:
+                connections.close_all()
+                self._build_lock.release()
+
+        threading.Thread(target=run, name='autocomplete-rebuild', daemon=True).start()
+
+    def suggest(self, text, limit):
+        tokens = normalize_terms(text)
+        if not tokens:
+            return [], []
+        self.ensure_ready()
+        if time.monotonic() - self.built_at > settings.AUTOCOMPLETE_MAX_AGE:
+            self.rebuild_in_background()
+
+        with self._lock:
+            products = self._search_delta(tokens, limit)
+            if len(products) < limit:
+                products += self.products.search(tokens, limit - len(products), skip=self.changed)
+            categories = self.categories.search(tokens, limit)
+        return products, categories
+
+    def _search_delta(self, tokens, limit):
+        results = []
+        prefix = tokens[-1]
+        index = bisect_left(self.delta, (prefix,))
+        seen = set()
+        while index < len(self.delta) and len(results) < limit:
+            term, pk = self.delta[index]
+            index += 1
+            if not term.startswith(prefix):
+                break
+            if pk in seen:
+                continue
+            seen.add(pk)
+            name = self.changed[pk]
+            if len(tokens) == 1 or _matches(normalize_terms(name), tokens[:-1]):
+                results.append({'id': pk, 'name': name})
+        return results
+
+
+index = Autocomplete()
+
+
+def suggest(text, limit):
+    return index.suggest(text, limit)
+
+
+def refresh_products(product_ids):
+    """Baca ulang produk yang diubah lewat UPDATE/bulk_create (tanpa sinyal) ke indeks proses ini."""
+    if not index.ready or not product_ids:
+        return
+    names = dict.fromkeys(product_ids)
+    names.update(
+        Product.objects.filter(id__in=product_ids, is_active=True, stock__gt=0).values_list('id', 'name')
+    )
+    index.update_products(names)
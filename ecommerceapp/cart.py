@@ -0,0 +1,177 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .db_utils import increment_or_create
+from .models import CartItem, Product
+from .reservations import ReservationError, reservations_enabled, sync_holds
+
+
+PRICE_VERSION_KEY = 'cart:prices:version'
+
+
+class CartError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _summary_key(user_id):
+    return f'cart:summary:{user_id}'
+
+
+def invalidate_cart_summary(user_id):
+    transaction.on_commit(lambda: cache.delete(_summary_key(user_id)))
+
+
+def bump_cart_prices():
+    # Perubahan harga memengaruhi keranjang banyak user; ringkasan yang tersimpan dengan
+    # versi harga lama otomatis dihitung ulang saat dibaca.
+    try:
+        cache.incr(PRICE_VERSION_KEY)
+    except ValueError:
+        cache.add(PRICE_VERSION_KEY, time.time_ns(), None)
+
+
+def cart_summary(user):
+    """
+    Jumlah baris, unit, dan subtotal keranjang per penjual (sama seperti pemecahan order
+    di CheckoutView), dihitung dengan satu query agregat dan di-cache per user.
+    """
+    state = cache.get_many([_summary_key(user.pk), PRICE_VERSION_KEY])
+    price_version = state.get(PRICE_VERSION_KEY)
+    if price_version is None:
+        cache.add(PRICE_VERSION_KEY, time.time_ns(), None)
+        price_version = cache.get(PRICE_VERSION_KEY)
+    cached = state.get(_summary_key(user.pk))
+    if cached is not None and cached[0] == price_version:
+        return cached[1]
+
+    rows = (
+        CartItem.objects.filter(user=user)
+        .values('product__seller_id', 'product__seller__email', 'product__seller__first_name')
+        .annotate(
+            item_count=Count('id'),
+            units=Sum('quantity'),
+            subtotal=Sum(F('quantity') * F('product__price'), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        )
+        .order_by('product__seller_id')
+    )
+    sellers = [
+        {
+            'seller': {
+                'id': row['product__seller_id'],
+                'email': row['product__seller__email'],
+                'first_name': row['product__seller__first_name'],
+            } if row['product__seller_id'] else None,
+            'item_count': row['item_count'],
+            'units': row['units'],
+            'subtotal': row['subtotal'],
+        }
+        for row in rows
+    ]
+    summary = {
+        'item_count': sum(seller['item_count'] for seller in sellers),
+        'units': sum(seller['units'] for seller in sellers),
+        'subtotal': sum((seller['subtotal'] for seller in sellers), Decimal('0')),
+        'sellers': sellers,
+    }
+    cache.set(_summary_key(user.pk), (price_version, summary), settings.CART_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def add_to_cart(user, product_id, quantity):
+    # Upsert atomik: baris baru dibuat, atau quantity lama ditambah di database (bukan get lalu save).
+    if reservations_enabled():
+        with transaction.atomic():
+            increment_or_create(
+                CartItem, ('user', 'product'), {(user.pk, product_id): {'quantity': quantity}},
+                insert_only={'added_at': timezone.now()},
+            )
+            hold_cart_items(user, [product_id])
+    else:
+        increment_or_create(
+            CartItem, ('user', 'product'), {(user.pk, product_id): {'quantity': quantity}},
+            insert_only={'added_at': timezone.now()},
+        )
+    invalidate_cart_summary(user.pk)
+
+
+def hold_cart_items(user, product_ids):
+    """Dalam mode reservasi, samakan hold stok dengan isi keranjang; gagal -> CartError per produk."""
+    if not reservations_enabled():
+        return
+    try:
+        sync_holds(user, product_ids)
+    except ReservationError as e:
+        raise CartError(e.shortages)
+
+
+def apply_cart_operations(user, lines):
+    """
+    Terapkan banyak operasi keranjang (add/set/remove) sekaligus. Stok semua produk dan
+    isi keranjang saat ini dibaca dalam satu query, lalu perubahan ditulis dalam paling
+    banyak tiga statement: DELETE, upsert nilai absolut, dan upsert increment.
+    """
+    product_ids = {line['product'] for line in lines}
+    products = {
+        product['id']: product
+        for product in Product.objects.filter(id__in=product_ids)
+        .annotate(in_cart=Subquery(
+            CartItem.objects.filter(user=user, product=OuterRef('pk')).values('quantity')[:1]
+        ))
+        .values('id', 'name', 'stock', 'is_active', 'in_cart')
+    }
+
+    errors = {}
+    final = {}
+    absolute = set()
+    for index, line in enumerate(lines):
+        product = products.get(line['product'])
+        if product is None or not product['is_active']:
+            errors[index] = 'Produk tidak ditemukan atau tidak aktif.'
+            continue
+        current = final.get(product['id'], product['in_cart'] or 0)
+        if line['op'] == 'add':
+            final[product['id']] = current + line['quantity']
+        else:
+            final[product['id']] = line['quantity'] if line['op'] == 'set' else 0
+            absolute.add(product['id'])
+
+    for index, line in enumerate(lines):
+        product = products.get(line['product'])
+        if index not in errors and final[product['id']] > product['stock']:
+            errors[index] = f"Stok {product['name']} hanya tersisa {product['stock']}."
+    if errors:
+        raise CartError(errors)
+
+    removed = [pid for pid in absolute if final[pid] <= 0]
+    replaced = [CartItem(user=user, product_id=pid, quantity=final[pid]) for pid in absolute if final[pid] > 0]
+    increments = {
+        (user.pk, pid): {'quantity': quantity - (products[pid]['in_cart'] or 0)}
+        for pid, quantity in final.items()
+        if pid not in absolute
+    }
+
+    with transaction.atomic():
+        if removed:
+            CartItem.objects.filter(user=user, product_id__in=removed).delete()
+        if replaced:
+            CartItem.objects.bulk_create(
+                replaced, update_conflicts=True, unique_fields=['user', 'product'], update_fields=['quantity'],
+            )
+        increment_or_create(CartItem, ('user', 'product'), increments, insert_only={'added_at': timezone.now()})
+        try:
+            hold_cart_items(user, final)
+        except CartError as e:
+            raise CartError({
+                index: e.errors[line['product']]
+                for index, line in enumerate(lines)
+                if line['product'] in e.errors
+            })
+        invalidate_cart_summary(user.pk)
@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, urlencode
+from rest_framework.response import Response
+
+from .db_router import pin_to_primary
+
+VERSION_KEY = 'catalog:version'
+MODIFIED_KEY = 'catalog:modified'
+
+
+def catalog_state():
+    """
+    Kembalikan (versi, waktu perubahan terakhir) katalog. Versi awal diambil dari jam
+    dalam nanodetik sehingga jika kunci versi ter-evict, versi baru tidak pernah
+    bertabrakan dengan entri lama yang masih tersimpan.
+    """
+    state = cache.get_many([VERSION_KEY, MODIFIED_KEY])
+    if VERSION_KEY not in state or MODIFIED_KEY not in state:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        cache.add(MODIFIED_KEY, int(time.time()), None)
+        state = cache.get_many([VERSION_KEY, MODIFIED_KEY])
+    return state.get(VERSION_KEY, 0), state.get(MODIFIED_KEY, int(time.time()))
+
+
+async def acatalog_state():
+    """Versi async dari catalog_state() untuk view ASGI."""
+    state = await cache.aget_many([VERSION_KEY, MODIFIED_KEY])
+    if VERSION_KEY not in state or MODIFIED_KEY not in state:
+        await cache.aadd(VERSION_KEY, time.time_ns(), None)
+        await cache.aadd(MODIFIED_KEY, int(time.time()), None)
+        state = await cache.aget_many([VERSION_KEY, MODIFIED_KEY])
+    return state.get(VERSION_KEY, 0), state.get(MODIFIED_KEY, int(time.time()))
+
+
+def bump_catalog_version():
+    # Semua entri versi lama otomatis tidak terpakai lagi dan dibuang oleh TTL/LRU cache.
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+    cache.set(MODIFIED_KEY, int(time.time()), None)
+    # Selama replica mungkin tertinggal, isi cache versi baru dibaca dari primary.
+    pin_to_primary('catalog')
+
+
+class CatalogCacheMixin:
+    """
+    Cache respons list/retrieve katalog publik per versi katalog, dan jawab 304
+    lewat ETag/Last-Modified tanpa menyentuh database.
+    """
+    cache_query_params = ('page', 'search', 'category__slug', 'cursor', 'count', 'fields', 'expand')
+
+    def replica_scopes(self, request):
+        return [*super().replica_scopes(request), 'catalog']
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def normalized_query(self, request):
+        params = []
+        for name in self.cache_query_params:
+            # Parameter kosong tetap dihitung: ``?cursor=`` memilih mode keyset.
+            if name not in request.query_params:
+                continue
+            value = ' '.join(request.query_params[name].split())
+            if name == 'search':
+                value = value.lower()
+            if name == 'page' and value in ('', '1'):
+                continue
+            params.append((name, value))
+        return urlencode(params)
+
+    def catalog_validators(self, request, kwargs, state):
+        """Kembalikan (kunci cache, waktu perubahan, header ETag/Last-Modified) untuk request ini."""
+        version, modified = state
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field, '')
+        raw_key = f'{version}:{self.basename}:{self.action}:{lookup}:{self.normalized_query(request)}'
+        digest = hashlib.md5(raw_key.encode()).hexdigest()
+        headers = {'ETag': f'"{digest}"', 'Last-Modified': http_date(modified)}
+        return f'catalog:response:{digest}', modified, headers
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache_key, modified, headers = self.catalog_validators(request, kwargs, catalog_state())
+        not_modified = get_conditional_response(request, etag=headers['ETag'], last_modified=modified)
+        if not_modified is not None:
+            return not_modified
+
+        data = cache.get(cache_key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cache.set(cache_key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """Padanan cached_response() untuk view async; kunci cache dan ETag-nya sama."""
+        cache_key, modified, headers = self.catalog_validators(request, kwargs, await acatalog_state())
+        not_modified = get_conditional_response(request, etag=headers['ETag'], last_modified=modified)
+        if not_modified is not None:
+            return not_modified
+
+        data = await cache.aget(cache_key)
+        if data is None:
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            await cache.aset(cache_key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+
+        for name, value in headers.items():
+            response[name] = value
+        return response
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+
+from .analytics import record_new_orders
+from .autocomplete import refresh_products
+from .cart import invalidate_cart_summary
+from .catalog_cache import bump_catalog_version
+from .models import CartItem, Order, OrderItem, Product, StockHold
+from .order_summary import summarize
+from .outbox import ORDER_CREATED, enqueue
+from .reservations import reservations_enabled
+
+
+class CheckoutError(Exception):
+    pass
+
+
+def place_orders(user, cart_items, shipping_address):
+    """
+    Ubah isi keranjang menjadi satu Order per penjual dengan jumlah query yang tetap,
+    berapa pun banyaknya baris di keranjang.
+    """
+    quantities = defaultdict(int)
+    for item in cart_items:
+        quantities[item.product_id] += item.quantity
+    product_ids = sorted(quantities)
+
+    with transaction.atomic():
+        # Hold stok milik user sendiri (mode reservasi) dikunci lebih dulu; tidak ada user
+        # lain yang memperebutkan baris ini.
+        held = dict(
+            StockHold.objects.select_for_update()
+            .filter(user=user, product_id__in=product_ids)
+            .values_list('product_id', 'quantity')
+        ) if reservations_enabled() else {}
+        # Jika semua item sudah ditahan penuh, stoknya terjamin dan produk cukup dibaca tanpa
+        # lock. Selain itu semua checkout mengunci produk dengan urutan id yang sama agar
+        # tidak saling deadlock.
+        products = Product.objects.filter(id__in=product_ids).order_by('id')
+        if any(held.get(pid, 0) < qty for pid, qty in quantities.items()):
+            products = products.select_for_update()
+        products = list(products)
+        if len(products) != len(product_ids):
+            raise CheckoutError('Beberapa produk di keranjang sudah tidak tersedia.')
+
+        for product in products:
+            if product.seller_id is None:
+                raise CheckoutError(f"Produk '{product.name}' tidak memiliki penjual dan tidak dapat dibeli.")
+            # Unit yang ditahan user lain tidak boleh dibeli.
+            if product.stock - (product.reserved - held.get(product.id, 0)) < quantities[product.id]:
+                raise CheckoutError(f'Stok untuk {product.name} tidak mencukupi.')
+
+        # Pengurangan stok bersyarat dalam satu UPDATE, sekaligus melepas hold user ini;
+        # jumlah baris yang berubah harus sama dengan jumlah produk, jika tidak berarti ada
+        # stok yang sudah habis duluan.
+        updated = Product.objects.filter(
+            reduce(or_, (
+                Q(id=pid, stock__gte=F('reserved') - held.get(pid, 0) + qty)
+                for pid, qty in quantities.items()
+            ))
+        ).update(
+            stock=F('stock') - Case(
+                *(When(id=pid, then=Value(qty)) for pid, qty in quantities.items()),
+                default=Value(0),
+            ),
+            **({'reserved': F('reserved') - Case(
+                *(When(id=pid, then=Value(qty)) for pid, qty in held.items()),
+                default=Value(0),
+            )} if held else {}),
+        )
+        if updated != len(product_ids):
+            raise CheckoutError('Stok berubah selama checkout, silakan coba lagi.')
+        if held:
+            StockHold.objects.filter(user=user, product_id__in=list(held)).delete()
+        # UPDATE massal tidak memicu sinyal post_save, jadi cache katalog dan indeks
+        # autocomplete (produk yang stoknya habis) diperbarui manual.
+        transaction.on_commit(bump_catalog_version)
+        transaction.on_commit(lambda: refresh_products(product_ids))
+
+        seller_groups = defaultdict(list)
+        for product in products:
+            seller_groups[product.seller_id].append(product)
+
+        orders = Order.objects.bulk_create([
+            Order(
+                user=user,
+                seller_id=seller_id,
+                total_amount=sum(product.price * quantities[product.id] for product in group),
+                shipping_address=shipping_address,
+                status='PENDING',
+                # Urutan sama dengan OrderItem di bawah, jadi produk pratinjau = item pertama.
+                **summarize((product.name, product.image.name, quantities[product.id]) for product in group),
+            )
+            for seller_id, group in seller_groups.items()
+        ])
+
+        items = OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=product,
+                quantity=quantities[product.id],
+                price=product.price,
+            )
+            for order, group in zip(orders, seller_groups.values())
+            for product in group
+        ])
+        record_new_orders(orders, items)
+        # Efek samping lain (notifikasi, email) dikerjakan worker outbox setelah commit.
+        enqueue(
+            (
+                ORDER_CREATED,
+                {'order_id': order.pk, 'user_id': user.pk, 'seller_id': order.seller_id, 'total_amount': str(order.total_amount)},
+                f'{ORDER_CREATED}:{order.pk}',
+            )
+            for order in orders
+        )
+
+        CartItem.objects.filter(user=user, product_id__in=product_ids).delete()
+        invalidate_cart_summary(user.pk)
+
+    return orders
@@ -0,0 +1,149 @@
+"""
+Routing primary/replica.
+
+Semua query diarahkan ke database ``default`` (primary), kecuali selama view yang memakai
+ReplicaReadMixin menjalankan aksi baca (list/retrieve); saat itu SELECT dikirim ke salah
+satu alias replica. Setelah user melakukan request tulis, atau setelah katalog berubah,
+pembacaan terkait dipaku ke primary selama REPLICA_STICKY_SECONDS (perkiraan jeda
+replikasi) agar perubahan sendiri langsung terlihat (read-your-writes).
+
+Paku user dikirim sebagai cookie bertanda tangan (PIN_COOKIE), sehingga berlaku di worker mana
+pun yang melayani request berikutnya, dan juga disimpan di cache. Klien yang tidak menyimpan
+cookie (mis. frontend lintas origin tanpa credentials) serta paku ``catalog`` yang berlaku untuk
+semua user hanya bergantung pada cache, jadi dengan lebih dari satu worker CACHE_URL wajib
+menunjuk cache bersama; LocMemCache hanya terlihat oleh worker yang menulis.
+
+Tanpa DATABASE_REPLICA_URLS router ini tidak mengubah apa pun. Untuk mencoba secara lokal,
+pakai file SQLite kedua sebagai replica tiruan::
+
+    DATABASE_REPLICA_URLS=sqlite:///db-replica.sqlite3 python manage.py migrate --database=replica1
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_use_replica = ContextVar('use_replica', default=False)
+
+PIN_COOKIE = 'primary_pin'
+_PIN_SALT = 'ecommerceapp.db_router.pin'
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def _pin_key(scope):
+    return f'db:primary:{scope}'
+
+
+def pin_to_primary(scope):
+    if replica_aliases():
+        cache.set(_pin_key(scope), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(*scopes):
+    return bool(scopes) and bool(cache.get_many([_pin_key(scope) for scope in scopes]))
+
+
+def pin_response(response, user_id):
+    if replica_aliases():
+        response.set_signed_cookie(
+            PIN_COOKIE, str(user_id), salt=_PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True, samesite='Lax',
+        )
+
+
+def is_request_pinned(request):
+    # max_age diperiksa dari stempel waktu tanda tangan, jadi cookie yang ditahan klien tetap kedaluwarsa.
+    user_id = request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=_PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS,
+    )
+    return user_id is not None and request.user.is_authenticated and user_id == str(request.user.pk)
+
+
+@contextmanager
+def replica_read_scope():
+    """Pilihan replica yang dibuat di dalam blok (ReplicaReadMixin.initial) berlaku sampai blok selesai saja."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica berisi data yang sama dengan primary, jadi relasi lintas alias tetap sah.
+        return True
+
+
+class ReplicaReadMixin:
+    """
+    Izinkan aksi baca viewset dilayani replica. Scope di replica_scopes (default: user
+    yang sedang login) yang baru saja menulis membuat request tetap dibaca dari primary.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def replica_scopes(self, request):
+        if request.user.is_authenticated:
+            return [f'user:{request.user.pk}']
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_read_scope():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and replica_aliases():
+            _use_replica.set(not (is_request_pinned(request) or is_pinned(*self.replica_scopes(request))))
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Setelah request tulis yang berhasil (POST/PUT/PATCH/DELETE), paku pembacaan user
+    tersebut ke primary lewat cache dan cookie PIN_COOKIE. request.user sudah diisi DRF
+    saat autentikasi JWT di view.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.pin_after_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.pin_after_write(request, response)
+        return response
+
+    def pin_after_write(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(f'user:{user.pk}')
+                pin_response(response, user.pk)
@@ -0,0 +1,46 @@
+from django.db import connection
+
+UPSERT_BATCH_SIZE = 500
+
+
+def increment_or_create(model, key_fields, rows, insert_only=None, coalesce_keys=()):
+    """
+    Tambahkan delta ke banyak baris sekaligus dengan INSERT ... ON CONFLICT DO UPDATE,
+    tanpa read-modify-write. ``rows`` memetakan tuple kunci ke dict {field: delta};
+    ``insert_only`` berisi nilai field yang hanya dipakai saat baris baru dibuat
+    (mis. kolom auto_now_add yang wajib diisi). Kunci di ``coalesce_keys`` yang boleh NULL
+    ditulis sebagai ``COALESCE(kolom, 0)`` pada target ON CONFLICT, sesuai indeks unik
+    ekspresi pada model (lihat SellerProductSalesRollup).
+    """
+    if not rows:
+        return
+    opts = model._meta
+    qn = connection.ops.quote_name
+    value_fields = list(next(iter(rows.values())))
+    insert_only = insert_only or {}
+    fields = [opts.get_field(name) for name in (*key_fields, *value_fields, *insert_only)]
+    columns = ', '.join(qn(field.column) for field in fields)
+    conflict = ', '.join(
+        f'COALESCE({qn(opts.get_field(name).column)}, 0)' if name in coalesce_keys else qn(opts.get_field(name).column)
+        for name in key_fields
+    )
+    table = qn(opts.db_table)
+    assignments = ', '.join(
+        f'{qn(field.column)} = {table}.{qn(field.column)} + excluded.{qn(field.column)}'
+        for field in fields[len(key_fields):len(key_fields) + len(value_fields)]
+    )
+    placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+
+    items = list(rows.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            batch = items[start:start + UPSERT_BATCH_SIZE]
+            params = []
+            for key, values in batch:
+                for field, value in zip(fields, (*key, *values.values(), *insert_only.values())):
+                    params.append(field.get_db_prep_value(value, connection))
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {", ".join([placeholder] * len(batch))} '
+                f'ON CONFLICT ({conflict}) DO UPDATE SET {assignments}',
+                params,
+            )
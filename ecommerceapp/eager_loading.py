@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+_plans = {}
+
+
+def _loading_plan(serializer):
+    """
+    Susun kebutuhan relasi sebuah serializer: relasi tunggal (serializer bersarang)
+    menjadi select_related, relasi many=True menjadi Prefetch dengan rencananya sendiri.
+    Serializer juga bisa menambah kebutuhan lewat Meta.select_related / Meta.prefetch_related
+    (mis. untuk SerializerMethodField yang membaca relasi).
+
+    Kembalikan (selects, prefetches, columns). ``columns`` adalah kolom yang dibaca field
+    serializer (untuk only()), atau None jika ada field yang kolomnya tidak diketahui;
+    field non-kolom mendaftarkan kolomnya lewat Meta.field_dependencies.
+    """
+    meta = getattr(serializer, 'Meta', None)
+    selects = list(getattr(meta, 'select_related', ()))
+    prefetches = [(path, None, None, ()) for path in getattr(meta, 'prefetch_related', ())]
+    dependencies = getattr(meta, 'field_dependencies', {})
+    model = getattr(meta, 'model', None)
+    columns = None
+    if model is not None and not selects and not prefetches:
+        columns = [model._meta.pk.name]
+    concrete = {field.name for field in model._meta.concrete_fields} if model is not None else set()
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        many = isinstance(field, serializers.ListSerializer)
+        child = field.child if many else field
+        if isinstance(child, serializers.ModelSerializer) and field.source != '*' and '.' not in field.source:
+            child_selects, child_prefetches, child_columns = _loading_plan(child)
+            if many:
+                # Prefetch mencocokkan baris lewat FK balik (item -> order), jadi kolom itu ikut dibaca.
+                try:
+                    relation = model._meta.get_field(field.source)
+                except (AttributeError, FieldDoesNotExist):
+                    relation = None
+                related = (relation.field.name,) if relation is not None and relation.one_to_many else ()
+                prefetches.append((field.source, child.Meta.model, (child_selects, child_prefetches, child_columns), related))
+                continue
+            selects.append(field.source)
+            selects.extend(f'{field.source}__{path}' for path in child_selects)
+            prefetches.extend(
+                (f'{field.source}__{path}', nested_model, plan, related)
+                for path, nested_model, plan, related in child_prefetches
+            )
+            if columns is not None and child_columns is not None:
+                columns.append(field.source)
+                columns.extend(f'{field.source}__{column}' for column in child_columns)
+            else:
+                columns = None
+        elif columns is None:
+            continue
+        elif field.source in concrete:
+            columns.append(field.source)
+        elif field.field_name in dependencies:
+            columns.extend(dependencies[field.field_name])
+        else:
+            columns = None
+
+    return selects, prefetches, columns
+
+
+def _class_plan(serializer_class):
+    if serializer_class not in _plans:
+        _plans[serializer_class] = _loading_plan(serializer_class())
+    return _plans[serializer_class]
+
+
+@lru_cache(maxsize=256)
+def _shaped_plan(serializer_class, fieldset):
+    # Menyusun field serializer untuk rencana butuh ratusan mikrodetik; bentuk ?fields= yang
+    # dipakai klien biasanya sedikit, jadi rencananya disimpan per (serializer, FieldSet).
+    return _loading_plan(serializer_class(context={'fieldset': fieldset}))
+
+
+def _apply_plan(queryset, plan, trim, columns=()):
+    selects, prefetches, needed = plan
+    if selects:
+        queryset = queryset.select_related(*selects)
+    for path, model, nested, related in prefetches:
+        if model is None:
+            queryset = queryset.prefetch_related(path)
+        else:
+            queryset = queryset.prefetch_related(
+                Prefetch(path, queryset=_apply_plan(model._default_manager.all(), nested, trim, related))
+            )
+    if trim and needed is not None:
+        queryset = queryset.only(*dict.fromkeys([*needed, *columns]))
+    return queryset
+
+
+def eager_load(serializer_class, queryset, fieldset=None, columns=()):
+    """
+    Terapkan rencana eager loading serializer ke queryset. Dengan ``fieldset`` (dari
+    ?fields=/?expand=) rencana disusun dari field yang tersisa dan hanya kolom yang dibaca
+    field tersebut diambil (only()); ``columns`` adalah kolom tambahan yang tetap dibaca,
+    mis. kunci keyset untuk cursor.
+    """
+    if fieldset is None:
+        return _apply_plan(queryset, _class_plan(serializer_class), trim=False)
+    return _apply_plan(queryset, _shaped_plan(serializer_class, fieldset), trim=True, columns=columns)
+
+
+class EagerLoadingMixin:
+    """
+    Terapkan rencana eager loading dari serializer aktif ke queryset viewset,
+    baik untuk list maupun retrieve (keduanya melewati filter_queryset).
+    """
+    eager_loading = True
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.eager_loading:
+            return queryset
+        return eager_load(
+            self.get_serializer_class(), queryset, getattr(self, 'fieldset', None),
+            columns=getattr(self.paginator, 'keyset_fields', ()),
+        )
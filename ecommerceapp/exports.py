@@ -0,0 +1,150 @@
+"""
+Ekspor data seller (CSV atau NDJSON) secara streaming.
+
+Baris dibaca dengan satu query values_list() datar lewat .iterator(chunk_size=...) dan
+ditulis per blok ke StreamingHttpResponse, jadi memori tetap konstan berapa pun jumlah
+barisnya dan tidak ada serializer bersarang yang dijalankan per baris.
+"""
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Order, OrderItem, Product
+
+CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# (nama kolom, lookup values_list); satu baris per item order agar bisa dicocokkan per produk.
+SALES_COLUMNS = (
+    ('order_id', 'order_id'),
+    ('created_at', 'order__created_at'),
+    ('status', 'order__status'),
+    ('buyer_email', 'order__user__email'),
+    ('shipping_address', 'order__shipping_address'),
+    ('order_total', 'order__total_amount'),
+    ('product_id', 'product_id'),
+    ('product_name', 'product__name'),
+    ('quantity', 'quantity'),
+    ('price', 'price'),
+)
+PRODUCT_COLUMNS = (
+    ('id', 'id'),
+    ('sku', 'sku'),
+    ('name', 'name'),
+    # Slug, bukan nama, agar file ekspor bisa langsung diimpor ulang (product_import).
+    ('category', 'category__slug'),
+    ('price', 'price'),
+    ('stock', 'stock'),
+    ('is_active', 'is_active'),
+    ('created_at', 'created_at'),
+)
+ORDER_STATUSES = [value for value, _ in Order.STATUS_CHOICES]
+PRODUCT_STATUSES = {'active': True, 'inactive': False}
+
+
+class ExportError(Exception):
+    pass
+
+
+def parse_filters(params, statuses):
+    """Baca ?start=&end= (YYYY-MM-DD, inklusif) dan ?status=a,b dari query string."""
+    try:
+        start = date.fromisoformat(params['start']) if params.get('start') else None
+        end = date.fromisoformat(params['end']) if params.get('end') else None
+    except ValueError:
+        raise ExportError('Format tanggal harus YYYY-MM-DD.')
+    if start and end and start > end:
+        raise ExportError('Tanggal start tidak boleh setelah end.')
+
+    selected = [value.strip() for value in params.get('status', '').split(',') if value.strip()]
+    unknown = [value for value in selected if value not in statuses]
+    if unknown:
+        raise ExportError(f"Status tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(statuses)}.")
+    return {'start': start, 'end': end, 'statuses': selected}
+
+
+def _date_range(queryset, field, start, end):
+    # Batas dihitung sebagai datetime agar indeks created_at tetap terpakai (tanpa __date).
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': timezone.make_aware(datetime.combine(start, time.min))})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lt': timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))})
+    return queryset
+
+
+def sales_rows(seller, start=None, end=None, statuses=()):
+    queryset = _date_range(OrderItem.objects.filter(order__seller=seller), 'order__created_at', start, end)
+    if statuses:
+        queryset = queryset.filter(order__status__in=statuses)
+    queryset = queryset.order_by('order__created_at', 'order_id', 'id')
+    return queryset.values_list(*(lookup for _, lookup in SALES_COLUMNS)).iterator(chunk_size=CHUNK_SIZE)
+
+
+def product_rows(seller, start=None, end=None, statuses=()):
+    queryset = _date_range(Product.objects.filter(seller=seller), 'created_at', start, end)
+    if statuses:
+        queryset = queryset.filter(is_active__in=[PRODUCT_STATUSES[status] for status in statuses])
+    queryset = queryset.order_by('id')
+    return queryset.values_list(*(lookup for _, lookup in PRODUCT_COLUMNS)).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _csv_cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Cegah formula injection saat file dibuka di spreadsheet (nama produk/alamat diisi pengguna).
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return f"'{value}"
+    return value
+
+
+def csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(value) for value in row])
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(columns, rows):
+    names = [name for name, _ in columns]
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(names, row))))
+        if len(lines) == CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+async def _async_chunks(chunks):
+    # Di ASGI iterator sinkron akan dikumpulkan seluruhnya dulu oleh Django; ambil per blok
+    # lewat thread request (thread_sensitive) agar cursor database tetap di thread yang sama.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def streaming_export(request, columns, rows, fmt, name):
+    chunks = csv_chunks(columns, rows) if fmt == 'csv' else ndjson_chunks(columns, rows)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{name}-{timezone.localdate().isoformat()}.{fmt}"'
+    return response
+
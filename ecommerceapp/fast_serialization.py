@@ -0,0 +1,414 @@
+"""
+Serialisasi cepat (read-only) untuk jalur baca katalog dan riwayat order.
+
+ModelSerializer DRF membuat instance model lalu memanggil to_representation() field demi
+field, termasuk untuk setiap serializer bersarang. Di sini view list/retrieve memakai
+``values()`` berisi kolom yang dibutuhkan saja (relasi tunggal ikut di-JOIN dengan prefix
+``relasi__``), dan setiap FastSerializer menyusun dict langsung dari baris tersebut.
+Relasi many (item order) diambil dengan satu query values() untuk semua baris halaman,
+setara prefetch_related pada jalur DRF.
+
+Output harus byte-for-byte sama dengan serializer DRF yang ditiru (``serializer_class``):
+urutan kunci sama, Decimal diformat dengan quantize yang sama, datetime dengan aturan
+DateTimeField, URL gambar lewat storage dan request yang sama. Jika field serializer DRF
+berubah dan FastSerializer belum mengikutinya, jalur cepat otomatis tidak dipakai (dengan
+peringatan di log) sehingga respons tetap benar. Dimatikan seluruhnya lewat
+FAST_SERIALIZATION=0.
+
+FastJSONRenderer merender dengan orjson (ada di requirements.txt; jika tidak terpasang
+dipakai JSONRenderer biasa dan peringatan dicatat sekali di log) dan kembali ke encoder
+DRF untuk tipe yang tidak dikenal orjson, indentasi, atau pengaturan JSON DRF yang tidak
+standar.
+"""
+import decimal
+import logging
+from functools import cache, cached_property
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .images import srcset
+from .instrumentation import InstrumentedJSONRenderer
+from .models import Order, OrderItem, Product
+from .serializers import (
+    CategorySerializer, OrderItemSerializer, OrderListSerializer, OrderSerializer, ProductSerializer, UserPublicSerializer,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_supported = {}
+_fields = {}
+
+
+def drf_fields(serializer_class):
+    """Field serializer DRF (dibuat sekali per class; membuat field DRF relatif mahal)."""
+    if serializer_class not in _fields:
+        _fields[serializer_class] = serializer_class().fields
+    return _fields[serializer_class]
+
+
+def decimal_converter(field):
+    """Padanan DecimalField.to_representation untuk Decimal (bukan None) dari database."""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.decimal_places is None or field.normalize_output or field.localize or not coerce_to_string:
+        return field.to_representation
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def convert(value):
+        return f'{value.quantize(quantum, rounding=rounding, context=context):f}'
+    return convert
+
+
+def datetime_converter(field):
+    """Padanan DateTimeField.to_representation (format ISO 8601) untuk datetime aware dari database."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or not settings.USE_TZ or hasattr(field, 'timezone'):
+        return field.to_representation
+
+    def convert(value):
+        text = value.astimezone(timezone.get_current_timezone()).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+class FastSerializer:
+    """
+    Serializer read-only dari baris values(). Subclass mendefinisikan ``serializer_class``,
+    ``field_names`` (urutan field serializer DRF), ``nested`` (field -> (FastSerializer, kolom
+    FK) untuk relasi tunggal) dan ``compile()`` yang mengembalikan, untuk setiap field lain,
+    (kolom values() yang dibaca, fungsi baris -> nilai).
+
+    Dipakai seperti serializer DRF: ``FastSerializer(instance, many=..., context=...).data``.
+    FieldSet dari context['fieldset'] (atau dari serializer induk) memilih field yang disusun
+    dan kolom yang diambil, dengan aturan yang sama seperti FieldSetSerializerMixin.
+    """
+    serializer_class = None
+    field_names = ()
+    nested = {}
+    # Field relasi many; isinya disiapkan subclass lewat attach().
+    many_fields = ()
+
+    def __init__(self, instance=None, many=False, context=None, prefix='', fieldset=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.request = self.context.get('request')
+        self.prefix = prefix
+        # Serializer bersarang selalu menerima FieldSet dari induknya jika induknya punya.
+        self.fieldset = fieldset if fieldset is not None else self.context.get('fieldset')
+        if self.fieldset is None:
+            self.selected = [(name, True) for name in self.field_names]
+        else:
+            self.selected = self.fieldset.select(self.field_names, {*self.nested, *self.many_fields})
+        plan = self.compile(drf_fields(self.serializer_class))
+
+        columns = []
+        getters = []
+        for name, expanded in self.selected:
+            if name not in self.nested:
+                field_columns, getter = plan[name]
+                columns.extend(prefix + column for column in field_columns)
+            elif expanded:
+                child_class, fk = self.nested[name]
+                child = child_class(
+                    context=self.context, prefix=f'{prefix}{name}__',
+                    fieldset=None if self.fieldset is None else self.fieldset.child(name),
+                )
+                columns.append(prefix + fk)
+                columns.extend(child.values())
+                getter = self.nested_getter(child, prefix + fk)
+            else:
+                # Tidak di-embed: nilai FK saja, sama dengan PrimaryKeyRelatedField.
+                fk = prefix + self.nested[name][1]
+                columns.append(fk)
+                getter = itemgetter(fk)
+            getters.append((name, getter))
+        self.columns = list(dict.fromkeys(columns))
+        self.getters = getters
+
+    @classmethod
+    def supported(cls):
+        """True jika field yang disusun sama (dan berurutan sama) dengan serializer_class."""
+        if cls not in _supported:
+            expected = list(drf_fields(cls.serializer_class))
+            ok = expected == list(cls.field_names) and all(child.supported() for child, _ in cls.nested.values())
+            if not ok:
+                logger.warning('%s tidak sesuai dengan field %s; jalur cepat tidak dipakai.', cls.__name__, cls.serializer_class.__name__)
+            _supported[cls] = ok
+        return _supported[cls]
+
+    def compile(self, fields):
+        """
+        Peta field -> (kolom, fungsi baris -> nilai) untuk field selain ``nested``. Konverter
+        dari field DRF (Decimal, datetime) disiapkan di sini, sekali per serializer.
+        """
+        raise NotImplementedError
+
+    def plain(self, *names):
+        """Field yang nilainya kolom bernama sama, tanpa konversi."""
+        return {name: ((name,), itemgetter(self.prefix + name)) for name in names}
+
+    def converted(self, name, convert):
+        key = self.prefix + name
+        return (name,), lambda row: convert(row[key])
+
+    def file_url(self, storage, name):
+        # Sama dengan FileField/ImageField.to_representation: nama kosong -> None, URL absolut jika ada request.
+        if not name:
+            return None
+        url = storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def nested_getter(self, child, fk):
+        build = child.build
+        return lambda row: None if row[fk] is None else build(row)
+
+    def values(self):
+        """Semua kolom values() yang dibutuhkan field terpilih, termasuk kolom relasi bersarang."""
+        return self.columns
+
+    def wants(self, name):
+        return any(selected == name for selected, _ in self.selected)
+
+    def build(self, row):
+        return {name: get(row) for name, get in self.getters}
+
+    def attach(self, rows):
+        """Ambil relasi many untuk baris-baris ini (override jika ada); dipanggil sebelum build()."""
+
+    async def aattach(self, rows):
+        """Padanan attach() untuk view async."""
+
+    @cached_property
+    def data(self):
+        rows = self.rows()
+        self.attach(rows)
+        return self.represent(rows)
+
+    async def adata(self):
+        rows = self.rows()
+        await self.aattach(rows)
+        return self.represent(rows)
+
+    def rows(self):
+        if self.many:
+            return list(self.instance)
+        return [self.instance]
+
+    def represent(self, rows):
+        if self.many:
+            return [self.build(row) for row in rows]
+        return self.build(rows[0])
+
+
+class CategoryFastSerializer(FastSerializer):
+    serializer_class = CategorySerializer
+    field_names = ('id', 'name', 'slug')
+
+    def compile(self, fields):
+        return self.plain('id', 'name', 'slug')
+
+
+class ProductFastSerializer(FastSerializer):
+    serializer_class = ProductSerializer
+    field_names = ('id', 'name', 'description', 'price', 'stock', 'available_stock', 'image', 'image_srcset', 'category')
+    nested = {'category': (CategoryFastSerializer, 'category_id')}
+
+    def compile(self, fields):
+        storage = Product._meta.get_field('image').storage
+        stock, reserved = self.prefix + 'stock', self.prefix + 'reserved'
+        return {
+            **self.plain('id', 'name', 'description'),
+            'price': self.converted('price', decimal_converter(fields['price'])),
+            **self.plain('stock'),
+            'available_stock': (('stock', 'reserved'), lambda row: max(row[stock] - row[reserved], 0)),
+            'image': self.converted('image', lambda name: self.file_url(storage, name)),
+            'image_srcset': self.converted('image_variants', lambda variants: srcset(variants, self.request)),
+        }
+
+
+class UserPublicFastSerializer(FastSerializer):
+    serializer_class = UserPublicSerializer
+    field_names = ('id', 'email', 'first_name')
+
+    def compile(self, fields):
+        return self.plain('id', 'email', 'first_name')
+
+
+class OrderItemFastSerializer(FastSerializer):
+    serializer_class = OrderItemSerializer
+    field_names = ('product', 'quantity', 'price')
+    nested = {'product': (ProductFastSerializer, 'product_id')}
+
+    def compile(self, fields):
+        return {**self.plain('quantity'), 'price': self.converted('price', decimal_converter(fields['price']))}
+
+
+class OrderListFastSerializer(FastSerializer):
+    serializer_class = OrderListSerializer
+    field_names = (
+        'id', 'user', 'seller', 'created_at', 'total_amount', 'status', 'shipping_address',
+        'item_count', 'total_units', 'preview_product_name', 'preview_image',
+    )
+    nested = {'user': (UserPublicFastSerializer, 'user_id'), 'seller': (UserPublicFastSerializer, 'seller_id')}
+
+    def compile(self, fields):
+        storage = Order._meta.get_field('preview_image').storage
+        return {
+            **self.plain('id'),
+            'created_at': self.converted('created_at', datetime_converter(fields['created_at'])),
+            'total_amount': self.converted('total_amount', decimal_converter(fields['total_amount'])),
+            **self.plain('status', 'shipping_address', 'item_count', 'total_units', 'preview_product_name'),
+            'preview_image': self.converted('preview_image', lambda name: self.file_url(storage, name)),
+        }
+
+
+class OrderFastSerializer(OrderListFastSerializer):
+    serializer_class = OrderSerializer
+    field_names = (*OrderListFastSerializer.field_names, 'items')
+    many_fields = ('items',)
+
+    def compile(self, fields):
+        self.items = {}
+        self.item_serializer = OrderItemFastSerializer(
+            context=self.context, fieldset=None if self.fieldset is None else self.fieldset.child('items'),
+        )
+        pk = self.prefix + 'id'
+        return {**super().compile(fields), 'items': (('id',), lambda row: self.items.get(row[pk], []))}
+
+    @classmethod
+    def supported(cls):
+        return super().supported() and OrderItemFastSerializer.supported()
+
+    def item_rows(self, rows):
+        # Query yang sama dengan Prefetch('items') jalur DRF (tanpa order_by), jadi urutan item juga sama.
+        return OrderItem._default_manager.filter(
+            order_id__in=[row[self.prefix + 'id'] for row in rows]
+        ).values('order_id', *self.item_serializer.values())
+
+    def group_items(self, items):
+        self.items = {}
+        build = self.item_serializer.build
+        for item in items:
+            self.items.setdefault(item['order_id'], []).append(build(item))
+
+    def attach(self, rows):
+        # Tanpa field items (?fields=...) query item tidak dijalankan sama sekali.
+        if rows and self.wants('items'):
+            self.group_items(self.item_rows(rows))
+
+    async def aattach(self, rows):
+        if rows and self.wants('items'):
+            self.group_items([item async for item in self.item_rows(rows)])
+
+
+class FastSerializationMixin:
+    """
+    Untuk aksi list/retrieve, pakai FastSerializer dari ``fast_serializer_classes`` yang meniru
+    serializer aktif view: queryset diubah menjadi values() (setelah filter, paginasi membaca
+    baris dict) dan get_serializer() mengembalikan FastSerializer.
+    """
+    fast_serializer_classes = ()
+    fast_actions = ('list', 'retrieve')
+
+    @cached_property
+    def fast_serializer_class(self):
+        serializer_class = self.get_serializer_class()
+        for fast_class in self.fast_serializer_classes:
+            if fast_class.serializer_class is serializer_class:
+                return fast_class
+        return None
+
+    @cached_property
+    def fast_serialization(self):
+        return bool(
+            settings.FAST_SERIALIZATION
+            and self.action in self.fast_actions
+            and self.fast_serializer_class is not None
+            and self.fast_serializer_class.supported()
+        )
+
+    @property
+    def eager_loading(self):
+        # values() tidak memakai select_related/prefetch, jadi rencana eager loading tidak perlu disusun.
+        return not self.fast_serialization
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.fast_serialization:
+            return queryset
+        # Kolom kunci keyset ikut diambil walau tidak tampil, untuk membuat cursor.
+        columns = self.fast_serializer_class(context=self.get_serializer_context()).values()
+        extra = [name for name in getattr(self.paginator, 'keyset_fields', ()) if name not in columns]
+        return queryset.prefetch_related(None).values(*columns, *extra)
+
+    def get_serializer(self, *args, **kwargs):
+        if not self.fast_serialization:
+            return super().get_serializer(*args, **kwargs)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return self.fast_serializer_class(*args, **kwargs)
+
+
+def _unsupported(value):
+    raise TypeError
+
+
+@cache
+def _warn_missing_orjson():
+    logger.warning('FAST_SERIALIZATION aktif tetapi orjson tidak terpasang; dirender dengan JSONRenderer biasa.')
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer lewat orjson. Untuk data yang hanya berisi dict/list/str/int/bool/None
+    (Decimal dan datetime sudah berupa string, seperti keluaran serializer di view katalog
+    dan order), hasilnya identik dengan JSONRenderer: pemisah ringkas, UTF-8 tanpa escape
+    non-ASCII, U+2028/U+2029 di-escape. Float tidak dipakai di view tersebut karena orjson
+    menulis eksponennya berbeda (1e16 vs 1e+16).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None and settings.FAST_SERIALIZATION:
+            _warn_missing_orjson()
+        if (
+            orjson is None or not settings.FAST_SERIALIZATION or data is None
+            or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=_unsupported, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except TypeError:
+            # Tipe di luar JSON dasar (Decimal, datetime, lazy string, int > 64 bit): encoder DRF.
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONRenderer(InstrumentedJSONRenderer, OrjsonRenderer):
+    """OrjsonRenderer dengan pencatatan waktu render seperti renderer default."""
+
+
+# Renderer default dengan InstrumentedJSONRenderer diganti FastJSONRenderer (Browsable API tetap).
+FAST_RENDERER_CLASSES = tuple(
+    FastJSONRenderer if renderer is InstrumentedJSONRenderer else renderer
+    for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+)
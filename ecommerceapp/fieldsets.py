@@ -0,0 +1,172 @@
+"""
+Sparse fieldset dan bentuk respons lewat query ``?fields=`` dan ``?expand=`` (list/retrieve).
+
+``fields`` memilih field yang dikirim, dipisah koma. Path bertitik memilih sub-field relasi
+bersarang (``fields=id,status,items.quantity,items.product.name``); nama relasi tanpa
+sub-field berarti seluruh objeknya.
+
+``expand`` memilih relasi tunggal yang di-embed sebagai objek (``expand=user,items.product``).
+Jika ``expand`` dikirim, relasi tunggal yang tidak disebut dikirim sebagai primary key saja
+(``"category": 3``); ``expand=`` kosong berarti tidak ada yang di-embed. Tanpa ``expand``
+semua relasi di-embed seperti biasa. Relasi many (item order) selalu berupa daftar objek.
+
+Tanpa kedua parameter respons tidak berubah. Field yang tidak dikirim juga tidak dibaca dari
+database: jalur serialisasi cepat hanya memilih kolom values() milik field yang tersisa
+(query item order dilewati jika ``items`` tidak diminta), jalur DRF memakai only() dan
+select_related/prefetch sesuai field yang tersisa (lihat eager_load).
+"""
+from functools import cached_property
+
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+
+
+class FieldSetError(APIException):
+    status_code = 400
+
+    def __init__(self, message):
+        super().__init__({'error': message})
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _tree(paths):
+    """``['id', 'items.product.name']`` -> ``{'id': None, 'items': {'product': {'name': None}}}``."""
+    tree = {}
+    for path in paths:
+        node = tree
+        *parents, leaf = path.split('.')
+        for name in parents:
+            if name in node and node[name] is None:
+                # Relasi yang sudah diminta utuh tidak dipersempit oleh sub-field-nya.
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+class FieldSet:
+    """
+    Bentuk respons untuk satu level serializer. ``fields``: nama -> dict sub-field (hasil
+    _tree) atau None (utuh); None berarti semua field. ``expand``: path relasi yang di-embed,
+    relatif terhadap level ini; None berarti semua.
+    """
+
+    def __init__(self, fields=None, expand=None, path=''):
+        self.fields = fields
+        self.expand = expand
+        self.path = path
+
+    @classmethod
+    def from_query(cls, params):
+        """FieldSet dari query string, atau None jika ``fields`` dan ``expand`` tidak dikirim."""
+        fields = _tree(_split(params['fields'])) if params.get('fields', '').strip() else None
+        expand = set(_split(params['expand'])) if 'expand' in params else None
+        if fields is None and expand is None:
+            return None
+        return cls(fields, expand)
+
+    @cached_property
+    def key(self):
+        def freeze(tree):
+            return None if tree is None else tuple(sorted((name, freeze(sub)) for name, sub in tree.items()))
+        return freeze(self.fields), None if self.expand is None else tuple(sorted(self.expand)), self.path
+
+    def __eq__(self, other):
+        return isinstance(other, FieldSet) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def child(self, name):
+        fields = None if self.fields is None else self.fields.get(name)
+        expand = None
+        if self.expand is not None:
+            expand = {path[len(name) + 1:] for path in self.expand if path.startswith(name + '.')}
+        return FieldSet(fields, expand, f'{self.path}{name}.')
+
+    @cached_property
+    def expanded(self):
+        return None if self.expand is None else {path.split('.')[0] for path in self.expand}
+
+    def select(self, names, nested):
+        """
+        Daftar (nama, di-embed) field yang dikirim, urut sesuai ``names`` (field serializer).
+        ``nested``: nama field yang berupa serializer bersarang. Nama yang tidak dikenal
+        menghasilkan FieldSetError.
+        """
+        for name, subfields in (self.fields or {}).items():
+            if name not in names:
+                raise FieldSetError(f'Field tidak dikenal: {self.path}{name}.')
+            if subfields is not None and name not in nested:
+                raise FieldSetError(f'Field {self.path}{name} tidak punya sub-field.')
+        for name in self.expanded or ():
+            if name not in nested:
+                raise FieldSetError(f'Relasi tidak dikenal di expand: {self.path}{name}.')
+
+        selected = []
+        for name in names:
+            if self.fields is not None and name not in self.fields:
+                continue
+            # Memilih sub-field sebuah relasi berarti relasi itu di-embed.
+            expanded = self.expanded is None or name in self.expanded or bool(self.fields and self.fields[name])
+            selected.append((name, expanded))
+        return selected
+
+
+class FieldSetSerializerMixin:
+    """
+    Pangkas field ModelSerializer sesuai FieldSet: dari context['fieldset'] untuk serializer
+    teratas, atau dari serializer induknya untuk serializer bersarang. Relasi tunggal yang
+    tidak di-embed menjadi PrimaryKeyRelatedField.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return fields
+
+        nested = {
+            name for name, field in fields.items()
+            if isinstance(getattr(field, 'child', field), serializers.BaseSerializer)
+        }
+        shaped = {}
+        for name, expanded in fieldset.select(list(fields), nested):
+            field = fields[name]
+            if isinstance(field, serializers.ListSerializer):
+                field.child._fieldset = fieldset.child(name)
+            elif name in nested and expanded:
+                field._fieldset = fieldset.child(name)
+            elif name in nested:
+                field = serializers.PrimaryKeyRelatedField(read_only=True, source=field.source)
+            shaped[name] = field
+        return shaped
+
+    def get_fieldset(self):
+        if hasattr(self, '_fieldset'):
+            return self._fieldset
+        parent = getattr(self, 'parent', None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = getattr(parent, 'parent', None)
+        return self.context.get('fieldset') if parent is None else None
+
+
+class FieldSetMixin:
+    """Baca ``?fields=``/``?expand=`` untuk aksi ``fieldset_actions`` dan teruskan ke serializer lewat context."""
+    fieldset_actions = ('list', 'retrieve')
+
+    @cached_property
+    def fieldset(self):
+        if self.action not in self.fieldset_actions:
+            return None
+        return FieldSet.from_query(self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.fieldset is not None:
+            context['fieldset'] = self.fieldset
+        return context
@@ -0,0 +1,114 @@
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .catalog_cache import bump_catalog_version
+from .models import Product
+
+FORMATS = {
+    # format: (ekstensi, opsi simpan Pillow)
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PIPELINE_WORKERS, thread_name_prefix='image-variants'
+        )
+    return _executor
+
+
+def _run_in_worker(product_id):
+    close_old_connections()
+    try:
+        generate_variants(product_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(product_id):
+    """Buat varian gambar di worker pool setelah transaksi upload selesai di-commit."""
+    if settings.IMAGE_PIPELINE_WORKERS <= 0:
+        transaction.on_commit(lambda: generate_variants(product_id))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, product_id))
+
+
+def _variant_name(product, width, extension):
+    stem = posixpath.splitext(posixpath.basename(product.image.name))[0]
+    return f'products/variants/{product.pk}/{stem}-{width}w.{extension}'
+
+
+def generate_variants(product_id):
+    product = Product.objects.only('id', 'image', 'image_variants').filter(pk=product_id).first()
+    if product is None:
+        return {}
+    old_names = {name for sizes in product.image_variants.values() for name in sizes.values()}
+
+    variants = {}
+    if product.image:
+        with product.image.open('rb') as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+        widths = [width for width in settings.IMAGE_VARIANT_WIDTHS if width < image.width] or [image.width]
+        for key, (extension, options) in FORMATS.items():
+            variants[key] = {}
+            for width in widths:
+                resized = image.copy()
+                resized.thumbnail((width, width * 10), Image.LANCZOS)
+                if key == 'jpeg' and resized.mode != 'RGB':
+                    resized = resized.convert('RGB')
+                # Gambar disimpan ulang tanpa exif/icc, sehingga metadata (mis. lokasi GPS) terbuang.
+                buffer = BytesIO()
+                resized.save(buffer, **options)
+                name = _variant_name(product, width, extension)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                variants[key][str(width)] = default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    # Jika gambar sudah diganti lagi selama proses, hasil ini dibuang dan job berikutnya yang menang.
+    current = Product.objects.filter(pk=product_id)
+    if product.image:
+        current = current.filter(image=product.image.name)
+    else:
+        current = current.filter(Q(image='') | Q(image__isnull=True))
+    updated = current.update(image_variants=variants)
+    if not updated:
+        return {}
+    new_names = {name for sizes in variants.values() for name in sizes.values()}
+    for name in old_names - new_names:
+        default_storage.delete(name)
+    bump_catalog_version()
+    return variants
+
+
+def variant_srcset(product, request=None):
+    return srcset(product.image_variants, request)
+
+
+def srcset(variants, request=None):
+    """Atribut srcset per format dari nilai kolom image_variants."""
+    srcset = {}
+    for key, sizes in (variants or {}).items():
+        entries = []
+        for width, name in sorted(sizes.items(), key=lambda item: int(item[0])):
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            entries.append(f'{url} {width}w')
+        srcset[key] = ', '.join(entries)
+    return srcset
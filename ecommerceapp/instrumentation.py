@@ -0,0 +1,267 @@
+"""
+Instrumentasi performa per request.
+
+InstrumentationMiddleware mencatat waktu total setiap request per view (ViewSet.aksi),
+beserta daftar query-nya (SQL dan durasi) lewat execute_wrapper yang dipasang sekali per
+koneksi, sehingga log request lambat selalu menyertakan query terlambat. Sebagian request
+yang terpilih sampling (INSTRUMENTATION_SAMPLE_RATE) juga dianalisis lebih jauh: query
+duplikat (indikasi N+1) dan metrik DB per view. Waktu DB, view, dan render
+(InstrumentedJSONRenderer) dikirim di header ``Server-Timing`` bila
+INSTRUMENTATION_SERVER_TIMING aktif, dan dikumpulkan untuk endpoint metrics format teks
+Prometheus.
+
+Metrik disimpan di memori per proses (tiap worker punya angka sendiri). Jika
+INSTRUMENTATION_ENABLED mati, middleware melepas diri saat startup (MiddlewareNotUsed)
+sehingga tidak ada biaya per request sama sekali.
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Method di luar daftar ini dicatat sebagai OTHER agar label metrik tidak bisa dibanjiri klien.
+METHODS = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('view', 'started', 'view_started', 'view_ms', 'render_ms', 'queries')
+
+    def __init__(self):
+        self.view = 'unmatched'
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_ms = None
+        self.render_ms = 0.0
+        self.queries = []
+
+    @property
+    def db_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self, threshold):
+        # SQL di sini masih berisi placeholder, jadi query yang sama dengan parameter berbeda terhitung sama.
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter()
+        self.buckets = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self.duration_sum = defaultdict(float)
+        self.sampled = Counter()
+        self.queries = Counter()
+        self.db_seconds = defaultdict(float)
+        self.n_plus_one = Counter()
+        self.slow = Counter()
+
+    def observe(self, stats, method, status, seconds, sampled, duplicates, slow):
+        with self.lock:
+            self.requests[(stats.view, method, str(status))] += 1
+            self.buckets[stats.view][bisect_left(DURATION_BUCKETS, seconds)] += 1
+            self.duration_sum[stats.view] += seconds
+            if sampled:
+                self.sampled[stats.view] += 1
+                self.queries[stats.view] += len(stats.queries)
+                self.db_seconds[stats.view] += stats.db_ms / 1000
+                if duplicates:
+                    self.n_plus_one[stats.view] += 1
+            if slow:
+                self.slow[stats.view] += 1
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels)
+                lines.append(f'{name}{{{label_text}}} {value}')
+
+        with self.lock:
+            family('http_requests_total', 'counter', 'Jumlah request per view.', [
+                ((('view', view), ('method', method), ('status', status)), count)
+                for (view, method, status), count in sorted(self.requests.items())
+            ])
+            histogram = []
+            for view, counts in sorted(self.buckets.items()):
+                total = 0
+                for bound, count in zip((*DURATION_BUCKETS, '+Inf'), counts):
+                    total += count
+                    histogram.append(((('view', view), ('le', bound)), total))
+            lines.append('# HELP http_request_duration_seconds Waktu total request per view.')
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            for labels, value in histogram:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels)
+                lines.append(f'http_request_duration_seconds_bucket{{{label_text}}} {value}')
+            for view, seconds in sorted(self.duration_sum.items()):
+                lines.append(f'http_request_duration_seconds_sum{{view="{view}"}} {seconds:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{view="{view}"}} {sum(self.buckets[view])}')
+            for name, help_text, values in (
+                ('http_sampled_requests_total', 'Request yang dianalisis N+1 dan metrik DB-nya (sampling).', self.sampled),
+                ('db_queries_total', 'Jumlah query pada request tersampling.', self.queries),
+                ('db_query_seconds_total', 'Waktu DB pada request tersampling.', self.db_seconds),
+                ('db_n_plus_one_requests_total', 'Request tersampling dengan query duplikat (indikasi N+1).', self.n_plus_one),
+                ('http_slow_requests_total', 'Request yang melewati INSTRUMENTATION_SLOW_REQUEST_MS.', self.slow),
+            ):
+                family(name, 'counter', help_text, [((('view', view),), value) for view, value in sorted(values.items())])
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def record_query(execute, sql, params, many, context):
+    # Request aktif dibaca dari ContextVar, yang ikut terbawa ke thread sync_to_async pada request async.
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def view_label(view_func, method):
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    name = cls.__name__ if cls else getattr(view_func, '__name__', 'view')
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    return f'{name}.{action}' if action else name
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Koneksi baru mendapat wrapper lewat sinyal; koneksi yang sudah terbuka di thread ini dipasang langsung.
+        connection_created.connect(install_query_recorder, dispatch_uid='instrumentation_query_recorder')
+        for alias in connections:
+            install_query_recorder(connections[alias])
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Di handler ASGI, process_view sinkron akan dibungkus sync_to_async (pindah thread tiap request).
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        sampled = random.random() < settings.INSTRUMENTATION_SAMPLE_RATE
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, sampled)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        sampled = random.random() < settings.INSTRUMENTATION_SAMPLE_RATE
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, sampled)
+
+    def finish(self, request, response, stats, sampled):
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        slow = total_ms >= settings.INSTRUMENTATION_SLOW_REQUEST_MS
+        duplicates = stats.duplicates(settings.INSTRUMENTATION_DUPLICATE_QUERY_THRESHOLD) if sampled else {}
+        method = request.method if request.method in METHODS else 'OTHER'
+        metrics.observe(stats, method, response.status_code, total_ms / 1000, sampled, duplicates, slow)
+
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            timings = [f'total;dur={total_ms:.1f}', f'db;dur={stats.db_ms:.1f};desc="{len(stats.queries)} queries"']
+            if stats.view_ms is not None:
+                # Serializer DRF berjalan di dalam view, jadi "app" = waktu view di luar DB (serialisasi + logika).
+                timings.append(f'app;dur={max(stats.view_ms - stats.db_ms, 0):.1f}')
+            if stats.render_ms:
+                timings.append(f'render;dur={stats.render_ms:.1f}')
+            response['Server-Timing'] = ', '.join(timings)
+
+        for sql, count in duplicates.items():
+            logger.warning('Kemungkinan N+1 di %s: query dijalankan %dx: %s', stats.view, count, sql)
+        if slow:
+            self.log_slow(request, stats, total_ms)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _current.get()
+        if stats is not None:
+            stats.view = view_label(view_func, request.method)
+            stats.view_started = time.perf_counter()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        InstrumentationMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    def log_slow(self, request, stats, total_ms):
+        message = [
+            f'Request lambat {request.method} {request.path} ({stats.view}): {total_ms:.1f}ms, '
+            f'{len(stats.queries)} query, DB {stats.db_ms:.1f}ms'
+        ]
+        slowest = sorted(stats.queries, key=lambda query: query[1], reverse=True)
+        message.extend(f'  {duration:.1f}ms {sql}' for sql, duration in slowest[:10])
+        logger.warning('\n'.join(message))
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    """JSONRenderer yang mencatat waktu render; awal render juga menandai akhir waktu view."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        if stats.view_started is not None and stats.view_ms is None:
+            stats.view_ms = (started - stats.view_started) * 1000
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            stats.render_ms += (time.perf_counter() - started) * 1000
+
+
+def metrics_view(request):
+    """
+    Metrik dalam format teks Prometheus. Jika INSTRUMENTATION_METRICS_TOKEN diisi,
+    scraper harus mengirim header ``Authorization: Bearer <token>``; tanpa token,
+    endpoint hanya terbuka saat DEBUG.
+    """
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            raise PermissionDenied
+    elif not settings.DEBUG:
+        raise PermissionDenied
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,158 @@
+import math
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from ecommerceapp.analytics import rebuild_rollups
+from ecommerceapp.models import Category, CustomUser, Order, OrderItem, Product
+from ecommerceapp.order_summary import summarize
+from ecommerceapp.search import rebuild_index
+
+BENCH_PASSWORD = 'bench-password-123'
+WORDS = (
+    'kopi teh gula beras sabun kaos sepatu tas buku lampu kabel meja kursi madu susu roti '
+    'jaket topi botol piring gelas sendok bantal selimut handuk payung dompet jam kamera'
+).split()
+ORDER_STATUSES = (('DELIVERED', 50), ('SHIPPED', 15), ('PROCESSING', 15), ('PENDING', 12), ('CANCELLED', 8))
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def zipf_weights(count, exponent=1.1):
+    # Peringkat pertama paling sering dipilih, ekor panjang jarang: mirip popularitas produk/toko sungguhan.
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def generate_dataset(rng, users=500, sellers=25, categories=15, products=3000, orders=5000, days=90):
+    """
+    Isi database dengan data sintetis yang condong (skewed): sebagian kecil toko punya
+    sebagian besar produk, sebagian kecil produk dan pembeli menyumbang sebagian besar
+    order. Semua akun memakai password BENCH_PASSWORD. Rollup penjualan dan indeks
+    pencarian dibangun ulang karena bulk_create tidak memicu signal.
+    """
+    password = make_password(BENCH_PASSWORD)
+    CustomUser.objects.bulk_create(
+        [CustomUser(email=f'bench-seller-{i}@example.com', first_name=f'Toko {i}', password=password) for i in range(sellers)]
+        + [CustomUser(email=f'bench-buyer-{i}@example.com', first_name=f'Pembeli {i}', password=password) for i in range(users)]
+    )
+    seller_list = list(CustomUser.objects.filter(email__startswith='bench-seller-').order_by('id'))
+    buyer_list = list(CustomUser.objects.filter(email__startswith='bench-buyer-').order_by('id'))
+
+    for i in range(categories):
+        Category.objects.get_or_create(name=f'Kategori Bench {i}')
+    category_list = list(Category.objects.filter(name__startswith='Kategori Bench ').order_by('id'))
+
+    seller_weights = zipf_weights(len(seller_list))
+    category_weights = zipf_weights(len(category_list), 0.8)
+    word_weights = zipf_weights(len(WORDS))
+    Product.objects.bulk_create(
+        (
+            Product(
+                seller=rng.choices(seller_list, seller_weights)[0],
+                category=rng.choices(category_list, category_weights)[0],
+                name=' '.join(rng.choices(WORDS, word_weights, k=3)).title(),
+                description=' '.join(rng.choices(WORDS, word_weights, k=20)),
+                price=Decimal(rng.randint(10, 5000)) * 100,
+                stock=0 if rng.random() < 0.08 else rng.randint(50, 1000),
+                is_active=rng.random() > 0.05,
+            )
+            for _ in range(products)
+        ),
+        batch_size=1000,
+    )
+    product_list = list(Product.objects.filter(seller__in=seller_list).only('id', 'seller_id', 'price').order_by('id'))
+    rng.shuffle(product_list)
+    product_weights = zipf_weights(len(product_list))
+    buyer_weights = zipf_weights(len(buyer_list), 0.7)
+
+    now = timezone.now()
+    order_rows = []
+    for _ in range(orders):
+        lines = {product.id: product for product in rng.choices(product_list, product_weights, k=rng.randint(1, 4))}
+        by_seller = {}
+        for product in lines.values():
+            by_seller.setdefault(product.seller_id, []).append((product, rng.randint(1, 3)))
+        buyer = rng.choices(buyer_list, buyer_weights)[0]
+        created_at = now - timedelta(days=days * rng.random() ** 2)
+        status = rng.choices([name for name, _ in ORDER_STATUSES], [weight for _, weight in ORDER_STATUSES])[0]
+        for seller_id, items in by_seller.items():
+            order = Order(
+                user=buyer, seller_id=seller_id, status=status, shipping_address='Jl. Benchmark 1',
+                total_amount=sum(product.price * quantity for product, quantity in items),
+                **summarize((product.name, product.image.name, quantity) for product, quantity in items),
+            )
+            order_rows.append((order, created_at, items))
+
+    created = Order.objects.bulk_create([order for order, _, _ in order_rows], batch_size=1000)
+    # auto_now_add menimpa created_at saat insert; sebarkan ulang ke belakang lewat bulk_update.
+    for order, (_, created_at, _) in zip(created, order_rows):
+        order.created_at = created_at
+    Order.objects.bulk_update(created, ['created_at'], batch_size=1000)
+    OrderItem.objects.bulk_create(
+        (
+            OrderItem(order=order, product=product, quantity=quantity, price=product.price)
+            for order, (_, _, items) in zip(created, order_rows)
+            for product, quantity in items
+        ),
+        batch_size=1000,
+    )
+
+    rebuild_rollups()
+    if connection.vendor == 'sqlite':
+        rebuild_index()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {
+        'sellers': seller_list,
+        'buyers': buyer_list,
+        'categories': category_list,
+        'products': product_list,
+        'product_weights': product_weights,
+        'buyer_weights': buyer_weights,
+    }
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Jalankan benchmark di database uji terpisah agar data asli tidak tersentuh.
+    SQLite memakai file sementara (bukan in-memory) supaya bisa diakses banyak thread.
+    """
+    settings_dict = connection.settings_dict
+    tmp_path = None
+    if connection.vendor == 'sqlite':
+        fd, tmp_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        settings_dict.setdefault('TEST', {})['NAME'] = tmp_path
+        options = settings_dict.setdefault('OPTIONS', {})
+        options.setdefault('transaction_mode', 'IMMEDIATE')
+        options.setdefault('timeout', 30)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    for alias in connections:
+        if alias != connection.alias:
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        # Benchmark mengirim ribuan request dari satu user/IP; rate limit diukur terpisah (bench_throttle).
+        with override_settings(RATE_LIMIT_ENABLED=False):
+            yield
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ecommerceapp.order_summary import backfill_summaries
+
+
+class Command(BaseCommand):
+    help = 'Isi kolom ringkasan item Order (jumlah item, unit, produk pratinjau) dari OrderItem secara bertahap.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', help='Hitung ulang juga order yang sudah punya ringkasan.')
+
+    def handle(self, *args, **options):
+        processed = backfill_summaries(chunk_size=options['chunk_size'], only_missing=not options['all'])
+        self.stdout.write(self.style.SUCCESS(f'{processed} order diproses.'))
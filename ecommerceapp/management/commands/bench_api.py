@@ -0,0 +1,289 @@
+import json
+import random
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ecommerceapp.models import Category, CustomUser, Product
+
+from ._bench import BENCH_PASSWORD, WORDS, generate_dataset, percentile, throwaway_database, zipf_weights
+
+BASELINE_PATH = Path(settings.BASE_DIR) / 'benchmarks' / 'api_baseline.json'
+
+# Selisih latensi di bawah ambang ini dianggap noise, berapa pun persentasenya.
+LATENCY_NOISE_MS = 1.0
+
+
+# Setiap skenario menghasilkan langkah (endpoint, aktor, method, path, body).
+def browse(ctx):
+    yield 'product-list', None, 'get', '/api/v1/products/', None
+    yield 'product-list-page', None, 'get', f'/api/v1/products/?page={ctx.rng.randint(2, 5)}', None
+    yield 'product-list-keyset', None, 'get', '/api/v1/products/?cursor=', None
+    yield 'product-detail', None, 'get', f'/api/v1/products/{ctx.product()}/', None
+    yield 'category-list', None, 'get', '/api/v1/categories/', None
+
+
+def search(ctx):
+    term = ctx.rng.choices(WORDS, ctx.word_weights)[0]
+    slug = ctx.rng.choices(ctx.category_slugs, ctx.category_weights)[0]
+    yield 'product-search', None, 'get', f'/api/v1/products/?search={term}', None
+    yield 'product-filter', None, 'get', f'/api/v1/products/?category__slug={slug}', None
+    yield 'product-search-filter', None, 'get', f'/api/v1/products/?search={term}&category__slug={slug}', None
+
+
+def cart(ctx):
+    product = ctx.product()
+    yield 'cart-add', 'buyer', 'post', '/api/v1/cart/', {'product': product, 'quantity': 1}
+    yield 'cart-list', 'buyer', 'get', '/api/v1/cart/', None
+    yield 'cart-summary', 'buyer', 'get', '/api/v1/cart/summary/', None
+    yield 'cart-remove', 'buyer', 'post', '/api/v1/cart/bulk/', {'items': [{'product': product, 'op': 'remove'}]}
+
+
+def checkout(ctx):
+    items = [{'product': ctx.product(), 'quantity': ctx.rng.randint(1, 2), 'op': 'set'} for _ in range(ctx.rng.randint(1, 3))]
+    yield 'cart-bulk', 'buyer', 'post', '/api/v1/cart/bulk/', {'items': items}
+    yield 'checkout', 'buyer', 'post', '/api/v1/checkout/', {'shipping_address': 'Jl. Benchmark 1'}
+    yield 'order-list', 'buyer', 'get', '/api/v1/orders/', None
+
+
+def seller_dashboard(ctx):
+    yield 'seller-product-list', 'seller', 'get', '/api/v1/dashboard/products/', None
+    yield 'seller-sales-list', 'seller', 'get', '/api/v1/dashboard/sales/', None
+    yield 'seller-sales-keyset', 'seller', 'get', '/api/v1/dashboard/sales/?cursor=', None
+    yield 'seller-analytics', 'seller', 'get', '/api/v1/dashboard/analytics/?period=week', None
+
+
+SCENARIOS = {
+    'browse': browse,
+    'search': search,
+    'cart': cart,
+    'checkout': checkout,
+    'seller': seller_dashboard,
+}
+
+
+class Context:
+    def __init__(self, rng, buyers, sellers, products, categories):
+        self.rng = rng
+        self.buyers, self.buyer_weights = buyers, zipf_weights(len(buyers), 0.7)
+        self.sellers, self.seller_weights = sellers, zipf_weights(len(sellers))
+        self.products, self.product_weights = products, zipf_weights(len(products))
+        self.category_slugs, self.category_weights = categories, zipf_weights(len(categories), 0.8)
+        self.word_weights = zipf_weights(len(WORDS))
+        self.actors = {}
+
+    def product(self):
+        return self.rng.choices(self.products, self.product_weights)[0]
+
+    def next_actors(self):
+        self.actors = {
+            'buyer': self.rng.choices(self.buyers, self.buyer_weights)[0],
+            'seller': self.rng.choices(self.sellers, self.seller_weights)[0],
+        }
+
+
+class InProcessTransport:
+    """Jalankan request lewat URLconf asli di proses yang sama; jumlah query ikut diukur."""
+
+    def __init__(self):
+        self.clients = {}
+
+    def client(self, user):
+        key = user.pk if user else None
+        if key not in self.clients:
+            self.clients[key] = APIClient()
+            if user is not None:
+                self.clients[key].force_authenticate(user)
+        return self.clients[key]
+
+    def request(self, user, method, path, data):
+        client = self.client(user)
+        with ExitStack() as stack:
+            captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, format='json') if data else getattr(client, method)(path)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, sum(len(queries) for queries in captures)
+
+
+class HttpTransport:
+    """Kirim request ke server yang sedang berjalan (mis. runserver/gunicorn) memakai token JWT."""
+
+    def __init__(self, base_url):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.tokens = {}
+
+    def headers(self, user):
+        if user is None:
+            return {}
+        if user.pk not in self.tokens:
+            response = self.session.post(
+                f'{self.base_url}/api/v1/auth/token/', json={'email': user.email, 'password': BENCH_PASSWORD},
+            )
+            if response.status_code != 200:
+                raise CommandError(f'Login {user.email} gagal ({response.status_code}). Sudah menjalankan seed_bench_data?')
+            self.tokens[user.pk] = response.json()['access']
+        return {'Authorization': f'Bearer {self.tokens[user.pk]}'}
+
+    def request(self, user, method, path, data):
+        headers = self.headers(user)
+        started = time.perf_counter()
+        response = self.session.request(method.upper(), f'{self.base_url}{path}', json=data, headers=headers)
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Jalankan skenario beban (browse, search, cart, checkout, seller) terhadap /api/v1, '
+        'laporkan throughput, latensi p50/p95/p99 dan jumlah query per endpoint, lalu bandingkan dengan baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Skenario yang dijalankan, dipisah koma.')
+        parser.add_argument('--iterations', type=int, default=40, help='Putaran per skenario yang diukur.')
+        parser.add_argument('--warmup', type=int, default=3, help='Putaran pemanasan per skenario (tidak diukur).')
+        parser.add_argument('--seed', type=int, default=2024)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--sellers', type=int, default=25)
+        parser.add_argument('--categories', type=int, default=15)
+        parser.add_argument('--products', type=int, default=3000)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument(
+            '--base-url',
+            help='Uji server yang sedang berjalan (database-nya harus sudah diisi seed_bench_data) alih-alih in-process.',
+        )
+        parser.add_argument('--baseline', default=str(BASELINE_PATH), help='File baseline JSON.')
+        parser.add_argument('--save-baseline', action='store_true', help='Simpan hasil run ini sebagai baseline baru.')
+        parser.add_argument('--no-compare', action='store_true', help='Jangan bandingkan dengan baseline.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help='Kenaikan latensi p50 yang masih diterima, relatif terhadap baseline (0.5 = 50%%).',
+        )
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Skenario tidak dikenal: {', '.join(sorted(unknown))}")
+
+        rng = random.Random(options['seed'])
+        if options['base_url']:
+            ctx = self.load_context(rng)
+            results = self.run(ctx, HttpTransport(options['base_url']), names, options)
+        else:
+            with throwaway_database():
+                generate_dataset(
+                    rng, users=options['users'], sellers=options['sellers'], categories=options['categories'],
+                    products=options['products'], orders=options['orders'],
+                )
+                cache.clear()
+                results = self.run(self.load_context(rng), InProcessTransport(), names, options)
+
+        report = {
+            'mode': 'http' if options['base_url'] else 'in-process',
+            'settings': {
+                key: options[key]
+                for key in ('scenarios', 'iterations', 'warmup', 'users', 'sellers', 'categories', 'products', 'orders', 'seed')
+            },
+            'endpoints': results,
+        }
+        self.print_report(results)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline disimpan ke {baseline_path}'))
+        elif not options['no_compare']:
+            self.compare(report, baseline_path, options['tolerance'])
+
+    def load_context(self, rng):
+        buyers = list(CustomUser.objects.filter(email__startswith='bench-buyer-').order_by('id'))
+        sellers = list(CustomUser.objects.filter(email__startswith='bench-seller-', products__isnull=False).distinct().order_by('id'))
+        if not buyers or not sellers:
+            raise CommandError('Data benchmark tidak ditemukan. Jalankan seed_bench_data terlebih dahulu.')
+        products = list(
+            Product.objects.filter(seller__in=sellers, is_active=True, stock__gt=0).order_by('id').values_list('id', flat=True)
+        )
+        # Urutan popularitas produk diacak sekali dengan seed yang sama agar tiap run identik.
+        random.Random(0).shuffle(products)
+        categories = list(Category.objects.filter(name__startswith='Kategori Bench ').order_by('id').values_list('slug', flat=True))
+        return Context(rng, buyers, sellers, products, categories)
+
+    def run(self, ctx, transport, names, options):
+        samples = {}
+        for name in names:
+            for iteration in range(options['warmup'] + options['iterations']):
+                ctx.next_actors()
+                for endpoint, actor, method, path, data in SCENARIOS[name](ctx):
+                    code, elapsed, queries = transport.request(ctx.actors.get(actor), method, path, data)
+                    if iteration < options['warmup']:
+                        continue
+                    bucket = samples.setdefault(endpoint, {'latency': [], 'queries': [], 'errors': 0})
+                    bucket['latency'].append(elapsed * 1000)
+                    if queries is not None:
+                        bucket['queries'].append(queries)
+                    if code >= 400:
+                        bucket['errors'] += 1
+
+        results = {}
+        for endpoint, bucket in samples.items():
+            latency = bucket['latency']
+            results[endpoint] = {
+                'requests': len(latency),
+                'errors': bucket['errors'],
+                'rps': round(len(latency) / (sum(latency) / 1000), 1),
+                'p50': round(percentile(latency, 50), 2),
+                'p95': round(percentile(latency, 95), 2),
+                'p99': round(percentile(latency, 99), 2),
+                'queries': round(sum(bucket['queries']) / len(bucket['queries']), 2) if bucket['queries'] else None,
+            }
+        return results
+
+    def print_report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<24} {'req':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+        )
+        for endpoint, row in results.items():
+            queries = '-' if row['queries'] is None else f"{row['queries']:.2f}"
+            self.stdout.write(
+                f"{endpoint:<24} {row['requests']:>5} {row['errors']:>4} {row['rps']:>8.0f} "
+                f"{row['p50']:>8.2f} {row['p95']:>8.2f} {row['p99']:>8.2f} {queries:>8}"
+            )
+
+    def compare(self, report, path, tolerance):
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f'Baseline {path} belum ada; jalankan dengan --save-baseline.'))
+            return
+        baseline = json.loads(path.read_text())
+        if baseline.get('mode') != report['mode'] or baseline.get('settings') != report['settings']:
+            self.stdout.write(self.style.WARNING('Mode atau pengaturan run berbeda dari baseline; perbandingan kurang akurat.'))
+
+        regressions = []
+        for endpoint, old in baseline['endpoints'].items():
+            new = report['endpoints'].get(endpoint)
+            if new is None:
+                continue
+            if old['queries'] is not None and new['queries'] is not None and new['queries'] > old['queries'] + 0.5:
+                regressions.append(f"{endpoint}: query {old['queries']} -> {new['queries']}")
+            if new['p50'] > old['p50'] * (1 + tolerance) and new['p50'] - old['p50'] > LATENCY_NOISE_MS:
+                regressions.append(f"{endpoint}: p50 {old['p50']}ms -> {new['p50']}ms")
+            if new['errors'] > old['errors']:
+                regressions.append(f"{endpoint}: error {old['errors']} -> {new['errors']}")
+
+        if regressions:
+            for line in regressions:
+                self.stderr.write(f'  {line}')
+            raise CommandError(f'{len(regressions)} regresi dibanding baseline {path}.')
+        self.stdout.write(self.style.SUCCESS('Tidak ada regresi dibanding baseline.'))
@@ -0,0 +1,195 @@
+import asyncio
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ecommerceapp.models import Category, Product
+
+from ._bench import generate_dataset, percentile, throwaway_database, zipf_weights
+
+
+@contextmanager
+def injected_latency(seconds):
+    """
+    Tambahkan jeda tetap ke setiap query di semua koneksi, termasuk koneksi yang baru
+    dibuka thread lain, untuk meniru database di jaringan (mis. managed Postgres lintas AZ).
+    """
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install)
+    for alias in connections:
+        install(None, connections[alias])
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for alias in connections:
+            if delay in connections[alias].execute_wrappers:
+                connections[alias].execute_wrappers.remove(delay)
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan throughput request baca konkuren antara deployment WSGI (view DRF, thread '
+        'worker) dan ASGI (view async) dengan latensi database buatan per query.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Jumlah request per mode.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Request yang berjalan bersamaan.')
+        parser.add_argument(
+            '--wsgi-threads', type=int, default=4,
+            help='Thread per proses WSGI (mis. gunicorn --threads); request di luar itu mengantre.',
+        )
+        parser.add_argument('--db-latency-ms', type=float, default=5.0, help='Latensi buatan per query.')
+        parser.add_argument(
+            '--catalog-cache', action='store_true',
+            help='Biarkan cache respons katalog aktif (default mati agar setiap request membaca database).',
+        )
+        parser.add_argument('--seed', type=int, default=2024)
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=3000)
+
+    def handle(self, *args, **options):
+        from ecommerce.asgi import application as asgi_application
+        from ecommerce.wsgi import application as wsgi_application
+
+        rng = random.Random(options['seed'])
+        with throwaway_database():
+            data = generate_dataset(rng, users=200, sellers=20, products=options['products'], orders=options['orders'])
+            workload = self.build_workload(rng, data, options['requests'])
+
+            results = []
+            cache_timeout = settings.CATALOG_CACHE_TIMEOUT if options['catalog_cache'] else 0
+            with injected_latency(options['db_latency_ms'] / 1000), override_settings(CATALOG_CACHE_TIMEOUT=cache_timeout):
+                for label, runner in (
+                    (f"WSGI ({options['wsgi_threads']} thread)", lambda: self.run_wsgi(wsgi_application, workload, options['wsgi_threads'])),
+                    (f"ASGI (konkurensi {options['concurrency']})", lambda: self.run_asgi(asgi_application, workload, options['concurrency'])),
+                ):
+                    runner()  # pemanasan (import, rencana eager loading)
+                    cache.clear()
+                    started = time.perf_counter()
+                    latencies, errors = runner()
+                    results.append((label, time.perf_counter() - started, latencies, errors))
+
+        self.stdout.write(
+            f"{len(workload)} request, latensi DB buatan {options['db_latency_ms']:g}ms/query, "
+            f"cache katalog {'aktif' if options['catalog_cache'] else 'mati'}."
+        )
+        self.stdout.write(f"{'mode':<26}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>6}")
+        for label, elapsed, latencies, errors in results:
+            self.stdout.write(
+                f'{label:<26}{len(latencies) / elapsed:>9.1f}{percentile(latencies, 50):>9.1f}'
+                f'{percentile(latencies, 95):>9.1f}{percentile(latencies, 99):>9.1f}{errors:>6}'
+            )
+        (_, wsgi_elapsed, *_), (_, asgi_elapsed, *_) = results
+        self.stdout.write(f'ASGI / WSGI throughput: {wsgi_elapsed / asgi_elapsed:.2f}x')
+
+    def build_workload(self, rng, data, count):
+        buyers = data['buyers']
+        buyer_weights = zipf_weights(len(buyers), 0.7)
+        products = list(Product.objects.filter(is_active=True, stock__gt=0).values_list('id', flat=True))
+        product_weights = zipf_weights(len(products))
+        slugs = list(Category.objects.values_list('slug', flat=True))
+        tokens = {}
+
+        def auth(buyer):
+            if buyer.pk not in tokens:
+                tokens[buyer.pk] = f'Bearer {AccessToken.for_user(buyer)}'
+            return tokens[buyer.pk]
+
+        workload = []
+        for _ in range(count):
+            kind = rng.choice(('list', 'page', 'filter', 'detail', 'categories', 'orders'))
+            if kind == 'list':
+                workload.append(('/api/v1/products/', '', None))
+            elif kind == 'page':
+                workload.append(('/api/v1/products/', f'page={rng.randint(2, 20)}', None))
+            elif kind == 'filter':
+                workload.append(('/api/v1/products/', f'category__slug={rng.choice(slugs)}', None))
+            elif kind == 'detail':
+                workload.append((f'/api/v1/products/{rng.choices(products, product_weights)[0]}/', '', None))
+            elif kind == 'categories':
+                workload.append(('/api/v1/categories/', '', None))
+            else:
+                workload.append(('/api/v1/orders/', 'cursor=', auth(rng.choices(buyers, buyer_weights)[0])))
+        return workload
+
+    def run_wsgi(self, application, workload, threads):
+        def call(item):
+            path, query, authorization = item
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'testserver', 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+            if authorization:
+                environ['HTTP_AUTHORIZATION'] = authorization
+            status = []
+            started = time.perf_counter()
+            body = application(environ, lambda code, headers, exc_info=None: status.append(int(code.split()[0])))
+            try:
+                b''.join(body)
+            finally:
+                body.close()
+            return (time.perf_counter() - started) * 1000, status[0]
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = list(pool.map(call, workload))
+        return [elapsed for elapsed, _ in outcomes], sum(code >= 400 for _, code in outcomes)
+
+    def run_asgi(self, application, workload, concurrency):
+        async def call(item, limit):
+            path, query, authorization = item
+            headers = [(b'host', b'testserver')]
+            if authorization:
+                headers.append((b'authorization', authorization.encode()))
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+                'root_path': '', 'headers': headers, 'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+            }
+            body_sent = asyncio.Event()
+            status = []
+
+            async def receive():
+                if not body_sent.is_set():
+                    body_sent.set()
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Klien tetap terhubung sampai respons selesai dikirim.
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            async with limit:
+                started = time.perf_counter()
+                await application(scope, receive, send)
+                return (time.perf_counter() - started) * 1000, status[0]
+
+        async def main():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(call(item, limit) for item in workload))
+
+        outcomes = asyncio.run(main())
+        return [elapsed for elapsed, _ in outcomes], sum(code >= 400 for _, code in outcomes)
@@ -0,0 +1,58 @@
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ecommerceapp.authentication import ClaimsJWTAuthentication
+from ecommerceapp.models import CartItem, CustomUser, Product
+from ecommerceapp.serializers import MyTokenObtainPairSerializer
+
+from ._bench import throwaway_database
+
+ENDPOINTS = ['/api/v1/profile/', '/api/v1/cart/', '/api/v1/orders/', '/api/v1/dashboard/sales/']
+
+
+class Command(BaseCommand):
+    help = 'Bandingkan throughput endpoint terautentikasi dengan JWTAuthentication dan ClaimsJWTAuthentication.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Jumlah request per endpoint per mode.')
+
+    def handle(self, *args, **options):
+        modes = [('standard', JWTAuthentication), ('claims', ClaimsJWTAuthentication)]
+        results = []
+        original = APIView.authentication_classes
+        with throwaway_database():
+            user = CustomUser.objects.create_user(email='bench-auth@example.com', password=None, first_name='Bench')
+            product = Product.objects.create(seller=user, name='bench', price=Decimal('1000.00'), stock=5)
+            CartItem.objects.create(user=user, product=product, quantity=1)
+            token = MyTokenObtainPairSerializer.get_token(user).access_token
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            try:
+                for endpoint in ENDPOINTS:
+                    for name, auth_class in modes:
+                        APIView.authentication_classes = [auth_class]
+                        cache.clear()
+                        client.get(endpoint)
+                        with CaptureQueriesContext(connection) as queries:
+                            client.get(endpoint)
+                        query_count = len(queries)
+                        started = time.perf_counter()
+                        for _ in range(options['requests']):
+                            response = client.get(endpoint)
+                        elapsed = time.perf_counter() - started
+                        assert response.status_code == 200, response.status_code
+                        results.append((endpoint, name, options['requests'] / elapsed, query_count))
+            finally:
+                APIView.authentication_classes = original
+
+        self.stdout.write(f"{'endpoint':<28} {'mode':<9} {'req/s':>9} {'queries':>8}")
+        for endpoint, name, throughput, query_count in results:
+            self.stdout.write(f'{endpoint:<28} {name:<9} {throughput:>9.0f} {query_count:>8}')
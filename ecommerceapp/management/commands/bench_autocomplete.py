@@ -0,0 +1,82 @@
+import gc
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from ecommerceapp.autocomplete import Autocomplete, normalize_terms
+
+from ._bench import WORDS, percentile
+
+SYLLABLES = ('ka', 'ri', 'mo', 'su', 'ta', 'na', 'pe', 'lo', 'gu', 'da', 'ne', 'bi', 'ra', 'yo', 'me', 'sa')
+VARIANTS = ('mini', 'jumbo', 'premium', 'original', 'organik', 'hitam', 'putih', 'merah', '250g', '1kg', '500ml')
+
+
+class Command(BaseCommand):
+    help = 'Ukur waktu build, memori, dan latensi query indeks autocomplete untuk katalog sintetis besar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1_000_000)
+        parser.add_argument('--categories', type=int, default=200)
+        parser.add_argument('--queries', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=2024)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = WORDS
+        brands = [
+            ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            for _ in range(max(options['products'] // 50, 10))
+        ]
+
+        def product_rows():
+            # Dibuat ulang dengan seed yang sama untuk setiap pengukuran.
+            row_rng = random.Random(options['seed'])
+            for pk in range(options['products'], 0, -1):
+                name = f'{row_rng.choice(brands).title()} {row_rng.choice(words).title()} {row_rng.choice(VARIANTS)}'
+                yield pk, name
+
+        category_rows = [(pk, f'{words[pk % len(words)].title()} {pk}', f'{words[pk % len(words)]}-{pk}') for pk in range(1, options['categories'] + 1)]
+
+        index = Autocomplete()
+        gc.collect()
+        started = time.perf_counter()
+        index.load(product_rows(), category_rows)
+        build_seconds = time.perf_counter() - started
+
+        # Memori diukur di build kedua: tracemalloc memperlambat build sehingga tidak dipakai untuk waktu.
+        measured = Autocomplete()
+        gc.collect()
+        tracemalloc.start()
+        measured.load(product_rows(), category_rows)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del measured
+
+        products = index.products
+        self.stdout.write(
+            f"{len(products):,} produk, {len(products.vocabulary):,} kata unik, "
+            f"{sum(len(posting) for posting in products.postings.values()):,} posting."
+        )
+        self.stdout.write(f'build: {build_seconds:.2f} s')
+        self.stdout.write(f'memori indeks: {current / 2**20:.1f} MiB (puncak saat build {peak / 2**20:.1f} MiB)')
+
+        queries = []
+        for _ in range(options['queries']):
+            terms = normalize_terms(products.name(rng.randrange(len(products))))
+            count = rng.choice((1, 1, 2))
+            text = ' '.join(terms[:count])
+            queries.append(text[:rng.randint(max(1, len(text) - len(terms[count - 1]) + 1), len(text))])
+
+        latencies = []
+        empty = 0
+        for text in queries:
+            started = time.perf_counter()
+            found, _ = index.suggest(text, 8)
+            latencies.append((time.perf_counter() - started) * 1e6)
+            empty += not found
+        self.stdout.write(
+            f'query ({len(queries)} prefix acak): p50 {percentile(latencies, 50):.1f} us, '
+            f'p99 {percentile(latencies, 99):.1f} us, maks {max(latencies):.1f} us, tanpa hasil {empty}'
+        )
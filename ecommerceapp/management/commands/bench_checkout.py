@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Sum
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ecommerceapp.models import CartItem, CustomUser, OrderItem, Product
+from ecommerceapp.views import CheckoutView
+
+from ._bench import percentile, throwaway_database
+
+
+class Command(BaseCommand):
+    help = 'Benchmark checkout paralel: memastikan tidak ada oversell dan mengukur latensi p50/p99 per ukuran keranjang.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cart-sizes', default='1,5,10,30', help='Daftar ukuran keranjang, dipisah koma.')
+        parser.add_argument('--buyers', type=int, default=40, help='Jumlah pembeli yang checkout bersamaan per ukuran keranjang.')
+        parser.add_argument('--stock', type=int, default=15, help='Stok awal tiap produk (sengaja lebih kecil dari jumlah pembeli).')
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        cart_sizes = [int(size) for size in options['cart_sizes'].split(',')]
+        with throwaway_database():
+            seller = CustomUser.objects.create_user(email='bench-seller@example.com', password=None)
+            rows = []
+            oversold = 0
+            for cart_size in cart_sizes:
+                result = self.run_round(seller, cart_size, options)
+                oversold += result['oversold']
+                rows.append(result)
+
+        self.stdout.write(f"{'cart':>5} {'ok':>5} {'rejected':>9} {'oversold':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['cart_size']:>5} {row['ok']:>5} {row['rejected']:>9} {row['oversold']:>9} "
+                f"{row['p50']:>9.2f} {row['p99']:>9.2f}"
+            )
+        if oversold:
+            self.stderr.write(self.style.ERROR(f'Oversell terdeteksi: {oversold} unit.'))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS('Tidak ada oversell.'))
+
+    def run_round(self, seller, cart_size, options):
+        stock = options['stock']
+        products = Product.objects.bulk_create([
+            Product(seller=seller, name=f'bench-{cart_size}-{i}', price=Decimal('10000.00'), stock=stock)
+            for i in range(cart_size)
+        ])
+        buyers = CustomUser.objects.bulk_create([
+            CustomUser(email=f'bench-{cart_size}-{i}@example.com')
+            for i in range(options['buyers'])
+        ])
+        CartItem.objects.bulk_create([
+            CartItem(user=buyer, product=product, quantity=1)
+            for buyer in buyers
+            for product in products
+        ])
+        connections.close_all()
+
+        factory = APIRequestFactory()
+        view = CheckoutView.as_view()
+
+        def checkout(buyer):
+            request = factory.post('/api/v1/checkout/', {'shipping_address': 'Jl. Benchmark 1'}, format='json')
+            force_authenticate(request, user=buyer)
+            started = time.perf_counter()
+            try:
+                response = view(request)
+                return response.status_code, (time.perf_counter() - started) * 1000
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(checkout, buyers))
+
+        product_ids = [product.id for product in products]
+        sold = dict(
+            OrderItem.objects.filter(product_id__in=product_ids)
+            .values_list('product_id')
+            .annotate(total=Sum('quantity'))
+        )
+        oversold = 0
+        for product in Product.objects.filter(id__in=product_ids):
+            units = sold.get(product.id, 0)
+            oversold += max(0, units - stock)
+            if product.stock < 0 or product.stock != stock - units:
+                oversold += abs(product.stock - (stock - units))
+
+        latencies = [latency for _, latency in results]
+        return {
+            'cart_size': cart_size,
+            'ok': sum(1 for code, _ in results if code == 201),
+            'rejected': sum(1 for code, _ in results if code != 201),
+            'oversold': oversold,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+        }
@@ -0,0 +1,75 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from ecommerceapp.models import Order, Product
+
+from ._bench import generate_dataset, throwaway_database
+
+VARIANTS = {
+    'webp': {'200': 'products/variants/bench-200w.webp', '400': 'products/variants/bench-400w.webp'},
+    'jpeg': {'200': 'products/variants/bench-200w.jpg', '400': 'products/variants/bench-400w.jpg'},
+}
+
+# (label, aktor, path, query ?fields=/?expand= yang dipakai halaman frontend)
+CASES = (
+    ('katalog', None, '/api/v1/products/?cursor=', 'fields=id,name,price,stock,image,category.name,category.slug'),
+    ('riwayat-order', 'buyer', '/api/v1/orders/?cursor=',
+     'fields=id,created_at,status,total_amount,shipping_address,item_count,total_units,preview_product_name,preview_image'),
+    ('penjualan', 'seller', '/api/v1/dashboard/sales/?cursor=', 'fields=id,user.email,total_amount,status'),
+    ('penjualan-pk', 'seller', '/api/v1/dashboard/sales/?cursor=', 'fields=id,user,total_amount,status&expand='),
+)
+
+
+class Command(BaseCommand):
+    help = 'Bandingkan ukuran respons dan latensi endpoint list utuh dengan ?fields=/?expand= yang dipakai frontend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        results = []
+        with throwaway_database(), override_settings(CATALOG_CACHE_TIMEOUT=0):
+            data = generate_dataset(
+                random.Random(options['seed']), users=200, sellers=10, categories=8, products=3000, orders=3000,
+            )
+            Product.objects.annotate(mod=F('id') % 3).filter(mod=0).update(image='products/bench.jpg', image_variants=VARIANTS)
+            buyer = Order.objects.values('user').order_by('-user__id').first()['user']
+            clients = {None: APIClient(), 'buyer': APIClient(), 'seller': APIClient()}
+            clients['buyer'].force_authenticate(next(user for user in data['buyers'] if user.pk == buyer))
+            clients['seller'].force_authenticate(data['sellers'][0])
+
+            for fast in (True, False):
+                with override_settings(FAST_SERIALIZATION=fast):
+                    for label, actor, path, shape in CASES:
+                        full = self.measure(clients[actor], path, options['repeat'])
+                        shaped = self.measure(clients[actor], f'{path}&{shape}', options['repeat'])
+                        results.append(('cepat' if fast else 'DRF', label, full, shaped))
+
+        self.stdout.write(f'Median dari {options["repeat"]} request per baris (cache katalog mati).')
+        self.stdout.write(
+            f"{'jalur':<7}{'endpoint':<15}{'bytes utuh':>12}{'bytes fields':>14}{'hemat':>8}"
+            f"{'ms utuh':>10}{'ms fields':>11}{'hemat':>8}"
+        )
+        for mode, label, (full_bytes, full_ms), (shaped_bytes, shaped_ms) in results:
+            self.stdout.write(
+                f'{mode:<7}{label:<15}{full_bytes:>12,}{shaped_bytes:>14,}{1 - shaped_bytes / full_bytes:>8.0%}'
+                f'{full_ms:>10.2f}{shaped_ms:>11.2f}{1 - shaped_ms / full_ms:>8.0%}'
+            )
+
+    def measure(self, client, url, repeat):
+        client.get(url)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise CommandError(f'{url}: status {response.status_code} {response.content[:200]!r}')
+        return len(response.content), statistics.median(timings)
@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from ecommerceapp.models import Order
+
+from ._bench import generate_dataset, throwaway_database
+
+SALES_FIELDS = 'fields=id,user.email,total_amount,status'
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan mengubah status N order lewat PATCH per order + muat ulang dashboard '
+        'dengan satu POST /dashboard/sales/status/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batches', default='1,10,50,200', help='Daftar jumlah order per putaran, dipisah koma.')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        batches = [int(size) for size in options['batches'].split(',')]
+        rows = []
+        with throwaway_database(), override_settings(CATALOG_CACHE_TIMEOUT=0):
+            data = generate_dataset(
+                random.Random(options['seed']), users=100, sellers=1, categories=4, products=300,
+                orders=sum(batches) * 2,
+            )
+            Order.objects.update(status='PENDING')
+            client = APIClient()
+            client.force_authenticate(data['sellers'][0])
+            pending = list(Order.objects.order_by('id').values_list('id', flat=True))
+            for size in batches:
+                one_by_one, pending = pending[:size], pending[size:]
+                bulk, pending = pending[:size], pending[size:]
+                rows.append((size, self.patch_each(client, one_by_one), self.bulk(client, bulk)))
+
+        self.stdout.write(f"{'order':>6}{'ms PATCH':>11}{'query':>8}{'ms bulk':>10}{'query':>8}{'lebih cepat':>13}")
+        for size, (patch_ms, patch_queries), (bulk_ms, bulk_queries) in rows:
+            self.stdout.write(
+                f'{size:>6}{patch_ms:>11.1f}{patch_queries:>8}{bulk_ms:>10.1f}{bulk_queries:>8}'
+                f'{patch_ms / bulk_ms:>12.1f}x'
+            )
+
+    def patch_each(self, client, ids):
+        # Alur dashboard lama: PATCH satu order lalu muat ulang penjualan dan produk.
+        def run():
+            for pk in ids:
+                self.expect_ok(client.patch(f'/api/v1/dashboard/sales/{pk}/', {'status': 'PROCESSING'}, format='json'))
+                self.expect_ok(client.get(f'/api/v1/dashboard/sales/?{SALES_FIELDS}'))
+                self.expect_ok(client.get('/api/v1/dashboard/products/'))
+        return self.measure(run)
+
+    def bulk(self, client, ids):
+        def run():
+            response = client.post(
+                f'/api/v1/dashboard/sales/status/?{SALES_FIELDS}', {'ids': ids, 'status': 'PROCESSING'}, format='json',
+            )
+            self.expect_ok(response)
+            if len(response.json()['orders']) != len(ids):
+                raise CommandError(f'Hanya {len(response.json()["orders"])} dari {len(ids)} order yang berubah.')
+        return self.measure(run)
+
+    def measure(self, run):
+        with CaptureQueriesContext(connections['default']) as queries:
+            started = time.perf_counter()
+            run()
+            elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, len(queries)
+
+    def expect_ok(self, response):
+        if response.status_code != 200:
+            raise CommandError(f'Status {response.status_code}: {response.content[:200]!r}')
@@ -0,0 +1,89 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ecommerceapp.models import Category, CustomUser, Product
+from ecommerceapp.search import index_products, search_products
+
+from ._bench import percentile, throwaway_database
+
+SYLLABLES = 'ka ko ri ta mu na so pe lu di ra ge bo si wa ne ju ha'.split()
+
+
+def build_vocabulary(rng, size=5000):
+    words = []
+    seen = set()
+    while len(words) < size:
+        word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+class Command(BaseCommand):
+    help = 'Bandingkan pencarian icontains lama dengan indeks full-text pada beberapa ukuran katalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000', help='Ukuran katalog, dipisah koma.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        rng = random.Random(42)
+        vocabulary = build_vocabulary(rng)
+        # Frekuensi kata mengikuti distribusi Zipf, jadi kueri mencakup kata umum hingga langka.
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        queries = [
+            vocabulary[0], vocabulary[30], vocabulary[400], vocabulary[3000],
+            vocabulary[120][:3], f'{vocabulary[5]} {vocabulary[60]}',
+        ]
+        rows = []
+        with throwaway_database():
+            seller = CustomUser.objects.create_user(email='bench-search@example.com', password=None)
+            categories = [Category.objects.create(name=f'Kategori {i}') for i in range(20)]
+            seeded = 0
+            for size in sizes:
+                self.seed(seller, categories, rng, vocabulary, weights, seeded, size)
+                seeded = size
+                base = Product.objects.filter(is_active=True, stock__gt=0)
+                for query in queries:
+                    rows.append((size, query, self.measure(base, query, 'icontains', options['repeat']),
+                                 self.measure(base, query, 'fts', options['repeat'])))
+
+        self.stdout.write(f"{'products':>9} {'query':<20} {'icontains p50':>14} {'fts p50':>9} {'speedup':>8}")
+        for size, query, old, new in rows:
+            self.stdout.write(f'{size:>9} {query:<20} {old:>12.2f}ms {new:>7.2f}ms {old / max(new, 1e-6):>7.1f}x')
+
+    def seed(self, seller, categories, rng, vocabulary, weights, start, end, batch_size=5000):
+        for offset in range(start, end, batch_size):
+            products = Product.objects.bulk_create([
+                Product(
+                    seller=seller,
+                    category=rng.choice(categories),
+                    name=' '.join(rng.choices(vocabulary, weights, k=3)).title(),
+                    description=' '.join(rng.choices(vocabulary, weights, k=25)),
+                    price=Decimal(rng.randint(10, 5000)) * 100,
+                    stock=rng.randint(0, 50),
+                )
+                for _ in range(offset, min(offset + batch_size, end))
+            ])
+            index_products(products)
+
+    def measure(self, base, query, mode, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            if mode == 'fts':
+                queryset = search_products(base, query)
+            else:
+                queryset = base
+                for term in query.split():
+                    queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+            queryset.count()
+            list(queryset[:12])
+            samples.append((time.perf_counter() - started) * 1000)
+        return percentile(samples, 50)
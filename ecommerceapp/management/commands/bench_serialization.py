@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ecommerceapp.eager_loading import eager_load
+from ecommerceapp.fast_serialization import FastJSONRenderer, OrderFastSerializer, OrderListFastSerializer, ProductFastSerializer
+from ecommerceapp.instrumentation import InstrumentedJSONRenderer
+from ecommerceapp.models import Order, Product
+
+from ._bench import generate_dataset, throwaway_database
+
+VARIANTS = {
+    'webp': {'200': 'products/variants/bench-200w.webp', '400': 'products/variants/bench-400w.webp'},
+    'jpeg': {'200': 'products/variants/bench-200w.jpg', '400': 'products/variants/bench-400w.jpg'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Bandingkan µs per objek serializer DRF dengan jalur serialisasi cepat (values() + orjson), dan cek outputnya identik.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objects', type=int, default=500, help='Jumlah objek per putaran.')
+        parser.add_argument('--repeat', type=int, default=7)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        count = options['objects']
+        request = Request(APIRequestFactory().get('/api/v1/products/'))
+        context = {'request': request}
+        results = []
+        with throwaway_database():
+            generate_dataset(
+                random.Random(options['seed']), users=200, sellers=10, categories=8,
+                products=max(count * 2, 1000), orders=max(count * 2, 1000),
+            )
+            # Sepertiga produk punya gambar dan varian agar URL dan srcset ikut diukur.
+            Product.objects.annotate(mod=F('id') % 3).filter(mod=0).update(image='products/bench.jpg', image_variants=VARIANTS)
+            cases = (
+                ('produk', ProductFastSerializer, Product.objects.filter(is_active=True, stock__gt=0).order_by('-created_at', '-id')),
+                ('order', OrderFastSerializer, Order.objects.order_by('-created_at', '-id')),
+                ('daftar', OrderListFastSerializer, Order.objects.order_by('-created_at', '-id')),
+            )
+            for label, fast_class, queryset in cases:
+                drf = self.measure(options['repeat'], lambda: self.run_drf(fast_class.serializer_class, queryset[:count], context))
+                fast = self.measure(options['repeat'], lambda: self.run_fast(fast_class, queryset, count, context))
+                if drf[1] != fast[1]:
+                    raise CommandError(f'Output jalur cepat untuk {label} tidak identik dengan serializer DRF.')
+                results.append((label, drf[0], fast[0]))
+
+        self.stdout.write(f'{count} objek per putaran, median dari {options["repeat"]} putaran; output DRF dan jalur cepat identik.')
+        self.stdout.write(f"{'objek':<8}{'jalur':<7}{'query':>10}{'serialisasi':>13}{'render':>10}{'total':>10}  (us/objek)")
+        for label, drf, fast in results:
+            for name, timings in (('DRF', drf), ('cepat', fast)):
+                per_object = [value / count * 1e6 for value in timings]
+                self.stdout.write(
+                    f'{label:<8}{name:<7}{per_object[0]:>10.1f}{per_object[1]:>13.1f}{per_object[2]:>10.1f}{sum(per_object):>10.1f}'
+                )
+            self.stdout.write(
+                f'{"":<8}serialisasi+render {(drf[1] + drf[2]) / (fast[1] + fast[2]):.1f}x lebih cepat, '
+                f'total {sum(drf) / sum(fast):.1f}x'
+            )
+
+    def measure(self, repeat, run):
+        samples = [run() for _ in range(repeat)]
+        timings = [statistics.median(sample[index] for sample, _ in samples) for index in range(3)]
+        return timings, samples[-1][1]
+
+    def run_drf(self, serializer_class, queryset, context):
+        started = time.perf_counter()
+        rows = list(eager_load(serializer_class, queryset))
+        loaded = time.perf_counter()
+        data = serializer_class(rows, many=True, context=context).data
+        serialized = time.perf_counter()
+        body = InstrumentedJSONRenderer().render(data)
+        rendered = time.perf_counter()
+        return (loaded - started, serialized - loaded, rendered - serialized), body
+
+    def run_fast(self, fast_class, queryset, count, context):
+        started = time.perf_counter()
+        serializer = fast_class(many=True, context=context)
+        rows = list(queryset.values(*serializer.values())[:count])
+        # Relasi many (item order) diambil di sini agar kolom "query" setara prefetch jalur DRF.
+        serializer.attach(rows)
+        loaded = time.perf_counter()
+        data = serializer.represent(rows)
+        serialized = time.perf_counter()
+        body = FastJSONRenderer().render(data)
+        rendered = time.perf_counter()
+        return (loaded - started, serialized - loaded, rendered - serialized), body
@@ -0,0 +1,77 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from ecommerceapp.throttling import get_store
+
+STORES = (
+    ('lokal', 'ecommerceapp.throttling.LocalMemoryBucketStore'),
+    ('cache', 'ecommerceapp.throttling.CacheBucketStore'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Ukur overhead throttle token bucket per request untuk setiap store, dan cek perilaku burst/refill.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50000)
+        parser.add_argument('--users', type=int, default=1000, help='Jumlah user berbeda (kunci bucket) yang digilir.')
+
+    def handle(self, *args, **options):
+        throttles = [throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES]
+        factory = APIRequestFactory()
+        requests = []
+        for pk in range(options['users']):
+            request = Request(factory.get('/api/v1/products/'))
+            request.user = SimpleNamespace(pk=pk, is_authenticated=True)
+            requests.append(request)
+
+        self.stdout.write(f"{options['iterations']} request, {len(throttles)} throttle default per request.")
+        baseline = None
+        for label, path, enabled in (('tanpa throttle', STORES[0][1], False), *((label, path, True) for label, path in STORES)):
+            # Rate besar agar yang diukur jalur "diizinkan", bukan penolakan.
+            with override_settings(RATE_LIMIT_ENABLED=enabled, RATE_LIMIT_STORE=path):
+                get_store().clear()
+                elapsed = self.run(throttles, requests, options['iterations'])
+            per_request = elapsed / options['iterations'] * 1e6
+            if baseline is None:
+                baseline = per_request
+                self.stdout.write(f'{label:<16}{per_request:>8.2f} us/request')
+            else:
+                self.stdout.write(f'{label:<16}{per_request:>8.2f} us/request (+{per_request - baseline:.2f} us)')
+
+        for label, path in STORES:
+            with override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_STORE=path):
+                get_store().clear()
+                self.check_bucket(label)
+        self.stdout.write(self.style.SUCCESS('Burst dan refill sesuai rate.'))
+
+    def run(self, throttles, requests, iterations):
+        rates = {**api_settings.DEFAULT_THROTTLE_RATES, 'user': f'{iterations * 10}/s'}
+        with override_settings(REST_FRAMEWORK={**api_settings.user_settings, 'DEFAULT_THROTTLE_RATES': rates}):
+            count = len(requests)
+            started = time.perf_counter()
+            for index in range(iterations):
+                request = requests[index % count]
+                for throttle in throttles:
+                    if not throttle.allow_request(request, None):
+                        raise CommandError('Request ditolak saat pengukuran overhead.')
+            return time.perf_counter() - started
+
+    def check_bucket(self, label):
+        rates = {**api_settings.DEFAULT_THROTTLE_RATES, 'user': '20/s'}
+        with override_settings(REST_FRAMEWORK={**api_settings.user_settings, 'DEFAULT_THROTTLE_RATES': rates}):
+            throttle = api_settings.DEFAULT_THROTTLE_CLASSES[1]()
+            request = Request(APIRequestFactory().get('/'))
+            request.user = SimpleNamespace(pk=f'check-{label}', is_authenticated=True)
+            burst = sum(throttle.allow_request(request, None) for _ in range(30))
+            time.sleep(0.26)
+            refilled = sum(throttle.allow_request(request, None) for _ in range(30))
+        self.stdout.write(f'{label}: burst {burst}/30 diizinkan, setelah 0.26s {refilled} token terisi ulang.')
+        if burst != 20 or refilled != 5:
+            raise CommandError(f'Bucket {label} tidak sesuai: burst {burst} (harus 20), refill {refilled} (harus 5).')
@@ -0,0 +1,109 @@
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ecommerceapp.models import CartItem, Category, CustomUser, Order, OrderItem, Product
+
+from ._bench import throwaway_database
+
+# (nama, url, pemilik request, jumlah query yang diharapkan)
+# Jumlah ini harus sama baik halaman berisi 1 baris maupun halaman penuh.
+ENDPOINTS = [
+    ('product-list', '/api/v1/products/', None, 2),
+    ('product-list-keyset', '/api/v1/products/?cursor=', None, 1),
+    ('product-detail', '/api/v1/products/{product}/', None, 1),
+    ('product-list-fields', '/api/v1/products/?cursor=&fields=id,name,available_stock,image_srcset&expand=', None, 1),
+    ('category-list', '/api/v1/categories/', None, 2),
+    ('cart-list', '/api/v1/cart/', 'buyer', 2),
+    ('order-list', '/api/v1/orders/', 'buyer', 2),
+    ('order-list-keyset', '/api/v1/orders/?cursor=', 'buyer', 1),
+    ('order-list-fields', '/api/v1/orders/?cursor=&fields=id,status,total_amount', 'buyer', 1),
+    ('order-detail', '/api/v1/orders/{order}/', 'buyer', 2),
+    ('order-detail-fields', '/api/v1/orders/{order}/?fields=id,items.product.name', 'buyer', 2),
+    ('seller-product-list', '/api/v1/dashboard/products/', 'seller', 2),
+    ('seller-sales-list', '/api/v1/dashboard/sales/', 'seller', 2),
+    ('seller-sales-keyset', '/api/v1/dashboard/sales/?cursor=', 'seller', 1),
+    ('seller-sales-export', '/api/v1/dashboard/sales/export/csv/', 'seller', 1),
+    ('seller-product-export', '/api/v1/dashboard/products/export/ndjson/', 'seller', 1),
+]
+
+
+def create_users():
+    return {
+        'buyer': CustomUser.objects.create_user(email='qc-buyer@example.com', password=None),
+        'seller': CustomUser.objects.create_user(email='qc-seller@example.com', password=None),
+    }
+
+
+def seed(users, count):
+    """Tambah ``count`` produk, item keranjang, dan order berisi dua item untuk pembeli/penjual uji."""
+    buyer, seller = users['buyer'], users['seller']
+    start = Product.objects.count()
+    for i in range(start, start + count):
+        category = Category.objects.create(name=f'qc-category-{i}')
+        product = Product.objects.create(
+            seller=seller, category=category, name=f'qc-product-{i}',
+            price=Decimal('1500.00'), stock=100,
+        )
+        CartItem.objects.create(user=buyer, product=product, quantity=2)
+        order = Order.objects.create(
+            user=buyer, seller=seller, total_amount=Decimal('3000.00'), shipping_address='Jl. Uji 1',
+        )
+        OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+        OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+
+
+def url_ids():
+    return {
+        'product': Product.objects.values_list('id', flat=True).first(),
+        'order': Order.objects.values_list('id', flat=True).first(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Pastikan setiap endpoint list/detail memakai jumlah query tetap, berapa pun isi halamannya.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=12, help='Jumlah baris untuk putaran "halaman penuh".')
+
+    def handle(self, *args, **options):
+        failures = []
+        with throwaway_database():
+            users = create_users()
+            seed(users, 1)
+            small = self.measure(users)
+            seed(users, options['rows'] - 1)
+            full = self.measure(users)
+
+        self.stdout.write(f"{'endpoint':<22} {'expected':>8} {'1 row':>6} {'full':>6}")
+        for name, _, _, expected in ENDPOINTS:
+            self.stdout.write(f'{name:<22} {expected:>8} {small[name]:>6} {full[name]:>6}')
+            if small[name] != expected or full[name] != expected:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Jumlah query berubah/tidak sesuai untuk: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('Semua endpoint memakai jumlah query tetap.'))
+
+    def measure(self, users):
+        ids = url_ids()
+        counts = {}
+        for name, url, owner, _ in ENDPOINTS:
+            client = APIClient()
+            if owner:
+                client.force_authenticate(users[owner])
+            # Hitung query di semua alias, termasuk replica yang dipakai view baca.
+            with ExitStack() as stack:
+                captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+                response = client.get(url.format(**ids))
+                if response.streaming:
+                    # Query ekspor baru berjalan saat isi respons dibaca.
+                    b''.join(response.streaming_content)
+            counts[name] = sum(len(queries) for queries in captures)
+            if response.status_code != 200:
+                raise CommandError(f'{name} mengembalikan status {response.status_code}')
+        return counts
@@ -0,0 +1,167 @@
+import random
+import re
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from rest_framework.test import APIClient
+
+from ecommerceapp.models import CartItem, Category, CustomUser, Order, OrderItem, Product
+from ecommerceapp.search import rebuild_index
+
+from ._bench import throwaway_database
+
+# Tabel besar yang tidak boleh dibaca dengan full table scan oleh endpoint mana pun.
+HOT_TABLES = {'ecommerceapp_product', 'ecommerceapp_order', 'ecommerceapp_orderitem', 'ecommerceapp_cartitem'}
+
+# (nama, url, pemilik request)
+ENDPOINTS = [
+    ('product-list', '/api/v1/products/', None),
+    ('product-list-keyset', '/api/v1/products/?cursor=', None),
+    ('product-list-category', '/api/v1/products/?category__slug={category}', None),
+    ('product-search', '/api/v1/products/?search=kopi', None),
+    ('product-detail', '/api/v1/products/{product}/', None),
+    ('cart-list', '/api/v1/cart/', 'buyer'),
+    ('order-list', '/api/v1/orders/', 'buyer'),
+    ('order-list-keyset', '/api/v1/orders/?cursor=', 'buyer'),
+    ('order-detail', '/api/v1/orders/{order}/', 'buyer'),
+    ('seller-product-list', '/api/v1/dashboard/products/', 'seller'),
+    ('seller-sales-list', '/api/v1/dashboard/sales/', 'seller'),
+    ('seller-sales-keyset', '/api/v1/dashboard/sales/?cursor=', 'seller'),
+    ('seller-sales-export', '/api/v1/dashboard/sales/export/csv/?status=DELIVERED,SHIPPED', 'seller'),
+    ('seller-product-export', '/api/v1/dashboard/products/export/ndjson/', 'seller'),
+]
+
+WORDS = ['kopi', 'teh', 'gula', 'beras', 'sabun', 'kaos', 'sepatu', 'tas', 'buku', 'lampu', 'kabel', 'meja']
+
+
+class Command(BaseCommand):
+    help = 'Jalankan EXPLAIN untuk setiap query endpoint pada data berskala dan gagal jika ada full table scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=5000, help='Jumlah produk yang di-seed.')
+        parser.add_argument('--orders', type=int, default=5000, help='Jumlah order yang di-seed.')
+        parser.add_argument('--verbose-plans', action='store_true', help='Cetak seluruh rencana query.')
+
+    def handle(self, *args, **options):
+        failures = []
+        with throwaway_database():
+            ids, users = self.seed(options['products'], options['orders'])
+            for name, url, owner in ENDPOINTS:
+                for sql, plan, scans in self.explain_endpoint(url.format(**ids), users.get(owner)):
+                    if options['verbose_plans'] or scans:
+                        self.stdout.write(f'-- {name}: {sql[:160]}')
+                        for line in plan:
+                            self.stdout.write(f'   {line}')
+                    if scans:
+                        failures.append(f"{name} ({', '.join(sorted(scans))})")
+                if not any(failure.startswith(f'{name} ') for failure in failures):
+                    self.stdout.write(f'{name:<24} OK')
+
+        if failures:
+            raise CommandError(f"Full table scan ditemukan di: {'; '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('Semua query endpoint memakai indeks.'))
+
+    def seed(self, product_count, order_count):
+        rng = random.Random(12)
+        buyer = CustomUser.objects.create_user(email='plan-buyer@example.com', password=None)
+        seller = CustomUser.objects.create_user(email='plan-seller@example.com', password=None)
+        CustomUser.objects.bulk_create(
+            CustomUser(email=f'plan-user-{i}@example.com', password='!') for i in range(200)
+        )
+        others = list(CustomUser.objects.exclude(pk__in=[buyer.pk, seller.pk]))
+
+        for i in range(20):
+            Category.objects.create(name=f'plan-category-{i}')
+        categories = list(Category.objects.all())
+
+        Product.objects.bulk_create(
+            Product(
+                seller=seller if i % 25 == 0 else rng.choice(others),
+                category=rng.choice(categories),
+                name=f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+                price=Decimal(rng.randint(1, 500) * 1000),
+                # Sekitar 10% nonaktif dan 10% stok habis, seperti katalog sungguhan.
+                stock=0 if i % 10 == 0 else rng.randint(1, 100),
+                is_active=i % 10 != 5,
+            )
+            for i in range(product_count)
+        )
+        products = list(Product.objects.only('id', 'price'))
+        if connection.vendor == 'sqlite':
+            rebuild_index()
+
+        orders = Order.objects.bulk_create(
+            Order(
+                user=buyer if i % 50 == 0 else rng.choice(others),
+                seller=seller if i % 20 == 0 else rng.choice(others),
+                total_amount=Decimal('1000.00'),
+                shipping_address='Jl. Uji 1',
+            )
+            for i in range(order_count)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for order in orders
+            for product in rng.sample(products, 2)
+        )
+        CartItem.objects.bulk_create(
+            CartItem(user=user, product=product, quantity=1)
+            for user in [buyer, *others]
+            for product in rng.sample(products, 3)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        ids = {
+            'product': Product.objects.filter(is_active=True, stock__gt=0).values_list('id', flat=True).first(),
+            'order': Order.objects.filter(user=buyer).values_list('id', flat=True).first(),
+            'category': categories[0].slug,
+        }
+        return ids, {'buyer': buyer, 'seller': seller}
+
+    def explain_endpoint(self, url, user):
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            if not many and sql.lstrip().upper().startswith('SELECT'):
+                statements.append((context['connection'], sql, params))
+            return execute(sql, params, many, context)
+
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        cache.clear()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(capture))
+            response = client.get(url)
+            if response.streaming:
+                # Query ekspor baru berjalan saat isi respons dibaca.
+                b''.join(response.streaming_content)
+        if response.status_code != 200:
+            raise CommandError(f'{url} mengembalikan status {response.status_code}')
+
+        for conn, sql, params in statements:
+            plan = self.explain(conn, sql, params)
+            yield sql, plan, self.full_scans(conn, plan)
+
+    def explain(self, conn, sql, params):
+        with conn.cursor() as cursor:
+            if conn.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return [row[3] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def full_scans(self, conn, plan):
+        # SQLite: "SCAN tabel" tanpa "USING ... INDEX"; PostgreSQL: "Seq Scan on tabel".
+        pattern = r'^SCAN (\S+)$' if conn.vendor == 'sqlite' else r'Seq Scan on (\S+)'
+        scans = set()
+        for line in plan:
+            match = re.search(pattern, line.strip())
+            if match and match.group(1).strip('"') in HOT_TABLES:
+                scans.add(match.group(1).strip('"'))
+        return scans
@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ecommerceapp.images import generate_variants
+from ecommerceapp.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Backfill varian thumbnail untuk gambar produk yang sudah ada, secara paralel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--all', action='store_true', help='Proses ulang juga produk yang sudah punya varian.')
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            products = products.filter(image_variants={})
+        product_ids = list(products.values_list('id', flat=True))
+
+        def process(product_id):
+            try:
+                return product_id, bool(generate_variants(product_id)), None
+            except Exception as e:
+                return product_id, False, e
+            finally:
+                connections.close_all()
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for product_id, ok, error in pool.map(process, product_ids):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'Produk {product_id}: {error}')
+                elif ok:
+                    done += 1
+        self.stdout.write(self.style.SUCCESS(f'{done} produk diproses, {failed} gagal.'))
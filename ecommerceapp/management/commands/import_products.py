@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerceapp.models import CustomUser
+from ecommerceapp.product_import import FORMATS, ProductImportError, detect_format, import_products, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Impor atau perbarui produk seller secara massal dari file CSV, NDJSON atau JSON (upsert per SKU).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('seller', help='Email seller pemilik produk.')
+        parser.add_argument('path', help='File yang diimpor.')
+        parser.add_argument('--format', choices=sorted(set(FORMATS.values())), help='Default: dari ekstensi file.')
+        parser.add_argument('--batch-size', type=int, help='Baris per transaksi (default PRODUCT_IMPORT_BATCH_SIZE).')
+        parser.add_argument('--max-errors', type=int, default=50, help='Jumlah error per baris yang ditampilkan.')
+
+    def handle(self, *args, **options):
+        try:
+            seller = CustomUser.objects.get(email=options['seller'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Seller {options['seller']} tidak ditemukan.")
+
+        try:
+            fmt = options['format'] or detect_format('', options['path'])
+            with open(options['path'], 'rb') as lines:
+                result = import_products(
+                    seller, read_rows(lines, fmt),
+                    batch_size=options['batch_size'], max_errors=options['max_errors'],
+                )
+        except (OSError, ProductImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"baris {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} produk baru, {result['updated']} diperbarui, {result['failed']} gagal."
+        ))
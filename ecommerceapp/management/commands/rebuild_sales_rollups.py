@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ecommerceapp.analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang rollup penjualan penjual dari riwayat OrderItem secara bertahap.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seller', type=int, help='Hanya bangun ulang untuk id penjual ini.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        processed = rebuild_rollups(seller_id=options['seller'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'{processed} order diproses.'))
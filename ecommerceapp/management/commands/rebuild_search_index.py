@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ecommerceapp.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang indeks full-text produk (SQLite FTS5; Postgres memakai kolom generated).'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Indeks pencarian produk selesai dibangun ulang.'))
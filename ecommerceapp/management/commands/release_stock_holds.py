@@ -0,0 +1,32 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ecommerceapp.reservations import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Lepas hold stok keranjang yang sudah kedaluwarsa dan kembalikan unitnya ke stok tersedia.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Hold yang dilepas per transaksi.')
+        parser.add_argument('--poll-interval', type=float, default=30.0, help='Jeda (detik) antar penyapuan.')
+        parser.add_argument('--once', action='store_true', help='Sapu sekali lalu berhenti (untuk cron/CI).')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        total = 0
+        while not stop.is_set():
+            close_old_connections()
+            released = release_expired_holds(options['batch_size'])
+            total += released
+            if released < options['batch_size']:
+                if options['once']:
+                    break
+                stop.wait(options['poll_interval'])
+        self.stdout.write(f'{total} hold kedaluwarsa dilepas.')
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from ecommerceapp.outbox import drain, purge_completed
+
+
+class Command(BaseCommand):
+    help = 'Jalankan worker outbox: klaim job dari database dan jalankan handler-nya dengan retry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Jumlah proses worker.')
+        parser.add_argument('--threads', type=int, default=2, help='Jumlah thread per proses.')
+        parser.add_argument('--batch-size', type=int, default=10, help='Job yang diklaim per putaran.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Jeda (detik) saat antrian kosong.')
+        parser.add_argument('--once', action='store_true', help='Kosongkan antrian lalu berhenti (untuk cron/CI).')
+        parser.add_argument('--purge-days', type=int, help='Hapus job DONE yang lebih tua dari N hari sebelum mulai.')
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            deleted = purge_completed(options['purge_days'])
+            self.stdout.write(f'{deleted} job selesai dihapus.')
+
+        stop = multiprocessing.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        if options['processes'] <= 1:
+            self.run_process(stop, options)
+            return
+
+        # Koneksi database tidak boleh diwariskan ke proses anak hasil fork.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=self.run_process, args=(stop, options), daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    def run_process(self, stop, options):
+        threads = [
+            threading.Thread(target=self.run_thread, args=(stop, options, index), name=f'outbox-{index}')
+            for index in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_thread(self, stop, options, index):
+        worker = f'{socket.gethostname()}:{os.getpid()}:{index}'
+        processed = 0
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                claimed = drain(worker, options['batch_size'])
+                processed += claimed
+                if not claimed:
+                    if options['once']:
+                        break
+                    stop.wait(options['poll_interval'])
+        finally:
+            connections.close_all()
+        self.stdout.write(f'{worker}: {processed} job diproses.')
@@ -0,0 +1,31 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerceapp.models import CustomUser
+
+from ._bench import BENCH_PASSWORD, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Isi database aktif dengan data benchmark, untuk menjalankan bench_api --base-url terhadap server lokal.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--sellers', type=int, default=25)
+        parser.add_argument('--categories', type=int, default=15)
+        parser.add_argument('--products', type=int, default=3000)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=2024, help='Seed random agar data bisa direproduksi.')
+
+    def handle(self, *args, **options):
+        if CustomUser.objects.filter(email__startswith='bench-').exists():
+            raise CommandError('Data benchmark sudah ada di database ini.')
+        dataset = generate_dataset(
+            random.Random(options['seed']), users=options['users'], sellers=options['sellers'],
+            categories=options['categories'], products=options['products'], orders=options['orders'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(dataset['buyers'])} pembeli, {len(dataset['sellers'])} penjual, "
+            f"{len(dataset['products'])} produk dibuat. Password semua akun: {BENCH_PASSWORD}"
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:30
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_null_product_rows(apps, schema_editor):
+    # Baris product NULL yang dulu lolos dari unique_together digabung dulu sebelum indeks baru dibuat.
+    Rollup = apps.get_model('ecommerceapp', 'SellerProductSalesRollup')
+    duplicates = (
+        Rollup.objects.filter(product=None).values('seller', 'day', 'status')
+        .annotate(rows=Count('id'), keep=Min('id'), total_units=Sum('units'), total_revenue=Sum('revenue'))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        Rollup.objects.filter(pk=group['keep']).update(units=group['total_units'], revenue=group['total_revenue'])
+        Rollup.objects.filter(
+            product=None, seller=group['seller'], day=group['day'], status=group['status'],
+        ).exclude(pk=group['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerceapp', '0013_order_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_null_product_rows, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='sellerproductsalesrollup',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='sellerproductsalesrollup',
+            constraint=models.UniqueConstraint(models.F('seller'), django.db.models.functions.comparison.Coalesce('product', models.Value(0)), models.F('day'), models.F('status'), name='product_rollup_uniq'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin, Group, Permission
 
 class CustomUserManager(BaseUserManager):
@@ -53,20 +55,77 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
 class Product(models.Model):
     seller = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
+    # Kode produk milik seller, kunci upsert impor massal; NULL untuk produk yang dibuat tanpa SKU.
+    sku = models.CharField(max_length=64, null=True, blank=True)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2) 
     stock = models.IntegerField(default=0)
+    # Jumlah unit yang sedang ditahan keranjang (total StockHold.quantity), dijaga oleh ecommerceapp.reservations.
+    reserved = models.IntegerField(default=0)
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     category = models.ForeignKey('Category', on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
 
+    class Meta:
+        # Indeks parsial: hanya produk yang tampil di katalog (aktif dan stok > 0), sesuai filter ProductViewSet.
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='product_listed_created_idx',
+                condition=models.Q(is_active=True, stock__gt=0),
+            ),
+            models.Index(
+                fields=['category', '-created_at', '-id'], name='product_listed_category_idx',
+                condition=models.Q(is_active=True, stock__gt=0),
+            ),
+            # Untuk COUNT halaman katalog: SQLite tidak menghitung lewat indeks berurutan di atas.
+            models.Index(fields=['stock'], name='product_active_stock_idx', condition=models.Q(is_active=True)),
+        ]
+        # Tanpa kondisi agar bisa dipakai sebagai target ON CONFLICT; NULL tidak saling bentrok.
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'sku'], name='product_seller_sku_uniq'),
+        ]
+
     def __str__(self):
         return self.name
 
+    # Kolom yang hanya ditulis lewat UPDATE sendiri: reserved oleh UPDATE F() di reservations,
+    # image_variants oleh worker gambar (ecommerceapp.images). Simpan biasa (form seller, admin)
+    # tidak boleh menimpanya dengan nilai lama yang terbaca saat instance dimuat.
+    WORKER_FIELDS = ('reserved', 'image_variants')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.WORKER_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def available_stock(self):
+        return max(self.stock - self.reserved, 0)
+
+class ProductSearchIndex(models.Model):
+    # Tabel virtual FTS5 dari migrasi 0006 (hanya SQLite), diisi ecommerceapp.search; rowid = id produk.
+    # Didaftarkan sebagai model agar pencarian bisa JOIN lewat ORM, bukan QuerySet.extra().
+    product = models.OneToOneField(
+        Product, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', db_constraint=False,
+        related_name='search_index',
+    )
+    name = models.TextField()
+    description = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'ecommerceapp_product_fts'
+
 class CartItem(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='cart_items') 
+    # Tanpa indeks FK terpisah: unique (user, product) sudah diawali kolom user.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='cart_items', db_index=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
@@ -80,6 +139,19 @@ class CartItem(models.Model):
     def __str__(self):
         return f'{self.quantity} x {self.product.name} by {self.user.email}'
 
+class StockHold(models.Model):
+    # Tanpa indeks FK terpisah: unique (user, product) sudah diawali kolom user.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='stock_holds', db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='holds')
+    quantity = models.IntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'product')
+
+    def __str__(self):
+        return f'{self.quantity} x {self.product_id} ditahan untuk {self.user_id} s/d {self.expires_at}'
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending'),
@@ -89,12 +161,25 @@ class Order(models.Model):
         ('CANCELLED', 'Cancelled'),
     )
     
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='orders')
-    seller = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='sales')
+    # Indeks FK tunggal diganti indeks komposit di Meta yang diawali kolom yang sama.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='orders', db_index=False)
+    seller = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='sales', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='PENDING')
     shipping_address = models.TextField()
+    # Ringkasan item (lihat ecommerceapp.order_summary): ditulis sekali saat checkout agar daftar
+    # order tidak perlu memuat OrderItem dan Product. Nama/gambar produk adalah snapshot saat beli.
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    total_units = models.PositiveIntegerField(default=0, editable=False)
+    preview_product_name = models.CharField(max_length=255, blank=True, editable=False)
+    preview_image = models.ImageField(upload_to='products/', blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_id_idx'),
+            models.Index(fields=['seller', '-created_at', '-id'], name='order_seller_created_id_idx'),
+        ]
     
     def __str__(self):
         return f'Order {self.id} by {self.user.email}'
@@ -123,4 +208,69 @@ class Category(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class SellerSalesRollup(models.Model):
+    seller = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sales_rollups')
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('seller', 'day', 'status')
+
+    def __str__(self):
+        return f'{self.seller_id} {self.day} {self.status}'
+
+
+class SellerProductSalesRollup(models.Model):
+    seller = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='product_sales_rollups')
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True)
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            # product NULL (produk sudah dihapus) dipetakan ke 0: NULL selalu dianggap berbeda oleh
+            # indeks unik biasa, sehingga ON CONFLICT tidak pernah cocok dan baris terus bertambah.
+            models.UniqueConstraint(
+                'seller', Coalesce('product', models.Value(0)), 'day', 'status',
+                name='product_rollup_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.seller_id} {self.product_id} {self.day} {self.status}'
+
+
+class OutboxJob(models.Model):
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+
+    event = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # Kunci unik per kejadian: enqueue ganda diabaikan, dan handler bisa meneruskannya ke layanan luar.
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['available_at', 'id'], name='outbox_pending_idx', condition=models.Q(status='PENDING')),
+        ]
+
+    def __str__(self):
+        return f'{self.event} {self.idempotency_key} ({self.status})'
@@ -0,0 +1,27 @@
+"""
+Handler event order dari outbox, dijalankan oleh worker di luar request checkout.
+Efek samping baru (email, notifikasi penjual, integrasi luar) ditambahkan di sini
+dengan @handles; gunakan job.idempotency_key saat memanggil layanan luar agar retry
+tidak mengirim dua kali.
+"""
+import logging
+
+from .outbox import ORDER_CREATED, ORDER_STATUS_CHANGED, handles
+
+logger = logging.getLogger(__name__)
+
+
+@handles(ORDER_CREATED)
+def log_new_order(payload, job):
+    logger.info(
+        'Order #%s baru untuk penjual %s dari user %s, total %s.',
+        payload['order_id'], payload['seller_id'], payload['user_id'], payload['total_amount'],
+    )
+
+
+@handles(ORDER_STATUS_CHANGED)
+def log_status_change(payload, job):
+    logger.info(
+        'Status order #%s berubah dari %s menjadi %s.',
+        payload['order_id'], payload['old_status'], payload['new_status'],
+    )
@@ -0,0 +1,137 @@
+"""
+State machine status order dan perubahan status oleh penjual, satu order maupun banyak sekaligus.
+
+Transisi yang sah (lihat TRANSITIONS)::
+
+    PENDING -> PROCESSING -> SHIPPED -> DELIVERED
+       |            |
+       +------------+--> CANCELLED
+
+DELIVERED dan CANCELLED adalah status akhir. Pembatalan mengembalikan stok item ke produknya;
+order yang sudah dikirim tidak bisa dibatalkan, jadi setiap pembatalan selalu mengembalikan stok.
+
+transition_orders() mengunci order yang diminta, lalu memindahkan semua order yang sah dengan
+satu UPDATE bersyarat (``WHERE id IN (...) AND status IN (...)``), mengembalikan stok pembatalan
+dengan satu UPDATE produk, memindahkan rollup penjualan, dan menulis job outbox
+order.status_changed, semuanya dalam satu transaksi.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from .analytics import record_status_changes
+from .autocomplete import refresh_products
+from .catalog_cache import bump_catalog_version
+from .models import Order, OrderItem, Product
+from .outbox import ORDER_STATUS_CHANGED, enqueue
+
+TRANSITIONS = {
+    'PENDING': ('PROCESSING', 'CANCELLED'),
+    'PROCESSING': ('SHIPPED', 'CANCELLED'),
+    'SHIPPED': ('DELIVERED',),
+    'DELIVERED': (),
+    'CANCELLED': (),
+}
+
+# Batas jumlah order per permintaan perubahan massal.
+MAX_BATCH = 500
+
+
+class TransitionError(Exception):
+    pass
+
+
+def can_transition(old_status, new_status):
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def sources(new_status):
+    """Status asal yang boleh berpindah ke ``new_status``."""
+    return [status for status, targets in TRANSITIONS.items() if new_status in targets]
+
+
+def transition_error(old_status, new_status):
+    return f'Status {old_status} tidak bisa diubah menjadi {new_status}.'
+
+
+def transition_orders(seller, order_ids, new_status):
+    """
+    Pindahkan order milik ``seller`` ke ``new_status``. Order yang tidak ditemukan atau yang
+    statusnya tidak boleh berpindah dilewati, sisanya tetap diproses.
+
+    Kembalikan (id order yang berubah, daftar {'id', 'status', 'error'} yang dilewati,
+    {id produk: unit yang dikembalikan ke stok}).
+    """
+    if new_status not in TRANSITIONS:
+        raise TransitionError(f'Status tidak dikenal: {new_status}.')
+    order_ids = list(dict.fromkeys(order_ids))
+    allowed = sources(new_status)
+
+    with transaction.atomic():
+        # Lock dengan urutan id yang sama agar perubahan massal paralel tidak saling deadlock;
+        # status lama yang terbaca di sini dipakai untuk rollup dan payload event.
+        orders = {
+            order.pk: order for order in Order.objects.select_for_update()
+            .filter(seller=seller, id__in=order_ids).order_by('id')
+            .only('id', 'seller_id', 'created_at', 'status')
+        }
+        skipped = []
+        for pk in order_ids:
+            order = orders.get(pk)
+            if order is None:
+                skipped.append({'id': pk, 'status': None, 'error': 'Order tidak ditemukan.'})
+            elif order.status not in allowed:
+                skipped.append({'id': pk, 'status': order.status, 'error': transition_error(order.status, new_status)})
+                del orders[pk]
+        if not orders:
+            return [], skipped, {}
+
+        updated = Order.objects.filter(id__in=list(orders), status__in=allowed).update(status=new_status)
+        if updated != len(orders):
+            raise TransitionError('Status order berubah selama pemrosesan, silakan coba lagi.')
+
+        old_statuses = {pk: order.status for pk, order in orders.items()}
+        for order in orders.values():
+            order.status = new_status
+        items = list(
+            OrderItem.objects.filter(order_id__in=list(orders)).only('order_id', 'product_id', 'quantity', 'price')
+        )
+        record_status_changes(list(orders.values()), old_statuses, items)
+
+        restocked = {}
+        if new_status == 'CANCELLED':
+            restocked = _restock(items)
+
+        # TRANSITIONS tidak punya siklus, jadi (order, status lama, status baru) hanya terjadi sekali.
+        enqueue([
+            (
+                ORDER_STATUS_CHANGED,
+                {'order_id': pk, 'old_status': old_status, 'new_status': new_status},
+                f'{ORDER_STATUS_CHANGED}:{pk}:{old_status}:{new_status}',
+            )
+            for pk, old_status in old_statuses.items()
+        ])
+    return list(orders), skipped, restocked
+
+
+def _restock(items):
+    quantities = defaultdict(int)
+    for item in items:
+        # Item dari produk yang sudah dihapus (FK NULL) tidak punya stok untuk dikembalikan.
+        if item.product_id is not None:
+            quantities[item.product_id] += item.quantity
+    if not quantities:
+        return {}
+    # Satu UPDATE untuk semua produk; unit yang ditahan (reserved) tidak berubah.
+    Product.objects.filter(id__in=list(quantities)).update(
+        stock=F('stock') + Case(
+            *(When(id=pid, then=Value(qty)) for pid, qty in quantities.items()),
+            default=Value(0),
+        )
+    )
+    # UPDATE massal tidak memicu sinyal post_save (lihat checkout.place_orders).
+    product_ids = list(quantities)
+    transaction.on_commit(bump_catalog_version)
+    transaction.on_commit(lambda: refresh_products(product_ids))
+    return dict(quantities)
@@ -0,0 +1,55 @@
+"""
+Ringkasan item per order yang disimpan di kolom Order: jumlah baris item, total unit, serta
+nama dan gambar produk pertama sebagai baris pratinjau. Daftar order (riwayat pembeli dan
+penjualan seller) cukup membaca kolom ini, tanpa memuat OrderItem dan Product; item lengkap
+hanya dimuat di detail order.
+
+Kolom diisi sekali saat checkout (place_orders). Order yang dibuat sebelum kolom ini ada
+diisi lewat backfill_summaries() / ``manage.py backfill_order_summaries``.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Order, OrderItem
+
+SUMMARY_FIELDS = ['item_count', 'total_units', 'preview_product_name', 'preview_image']
+
+
+def summarize(lines):
+    """Nilai kolom ringkasan dari (nama produk, nama file gambar, jumlah) item order, urut sesuai item."""
+    lines = list(lines)
+    name, image = (lines[0][0], lines[0][1]) if lines else ('', '')
+    return {
+        'item_count': len(lines),
+        'total_units': sum(quantity for _, _, quantity in lines),
+        # Produk yang sudah dihapus (FK item NULL) tidak punya nama maupun gambar.
+        'preview_product_name': name or '',
+        'preview_image': image or '',
+    }
+
+
+def backfill_summaries(chunk_size=1000, only_missing=True):
+    """
+    Isi kolom ringkasan dari OrderItem, per potongan order berdasarkan id; setiap potongan satu
+    query item dan satu bulk_update dalam transaksinya sendiri. ``only_missing`` melewati
+    order yang sudah punya ringkasan (item_count > 0), sehingga aman dijalankan ulang.
+    """
+    orders = Order.objects.order_by('id')
+    if only_missing:
+        orders = orders.filter(item_count=0)
+
+    last_id = 0
+    processed = 0
+    while True:
+        ids = list(orders.filter(id__gt=last_id).values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return processed
+        lines = defaultdict(list)
+        items = OrderItem.objects.filter(order_id__in=ids).order_by('order_id', 'id')
+        for order_id, name, image, quantity in items.values_list('order_id', 'product__name', 'product__image', 'quantity'):
+            lines[order_id].append((name, image, quantity))
+        with transaction.atomic():
+            Order.objects.bulk_update([Order(pk=pk, **summarize(lines[pk])) for pk in ids], SUMMARY_FIELDS)
+        last_id = ids[-1]
+        processed += len(ids)
@@ -0,0 +1,125 @@
+"""
+Outbox/antrian job di database.
+
+Job ditulis dengan enqueue() di dalam transaksi yang sama dengan perubahan datanya
+(mis. Order baru), jadi job hanya ada jika transaksi itu commit. Worker
+(``manage.py run_outbox_worker``) mengklaim job dengan lease, menjalankan handler yang
+terdaftar lewat @handles(event), lalu menandai job selesai di transaksi yang sama
+dengan efek database handler tersebut. Handler yang gagal dicoba ulang dengan backoff
+eksponensial sampai OUTBOX_MAX_ATTEMPTS, setelah itu job ditandai FAILED. Job yang
+lease-nya habis tanpa hasil (worker mati di tengah handler) juga menghabiskan percobaan,
+dan ditandai FAILED oleh claim() agar tidak terus mematikan worker berikutnya.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxJob
+
+logger = logging.getLogger(__name__)
+
+ORDER_CREATED = 'order.created'
+ORDER_STATUS_CHANGED = 'order.status_changed'
+
+_handlers = defaultdict(list)
+
+
+def handles(event):
+    """Daftarkan fungsi ``handler(payload, job)`` untuk sebuah event."""
+    def register(func):
+        _handlers[event].append(func)
+        return func
+    return register
+
+
+def enqueue(jobs):
+    """
+    Simpan job (event, payload, idempotency_key) dalam satu INSERT. Kunci yang sudah
+    ada diabaikan, jadi enqueue ulang untuk kejadian yang sama tidak menggandakan job.
+    """
+    OutboxJob.objects.bulk_create(
+        [OutboxJob(event=event, payload=payload, idempotency_key=key) for event, payload, key in jobs],
+        ignore_conflicts=True,
+    )
+
+
+def claim(worker, batch_size=10):
+    now = timezone.now()
+    with transaction.atomic():
+        # skip_locked (PostgreSQL) membuat worker paralel mengambil job berbeda tanpa saling menunggu;
+        # di SQLite transaksi IMMEDIATE sudah membuat klaim berjalan bergantian.
+        claimable = (
+            OutboxJob.objects.filter(status='PENDING', available_at__lte=now)
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+        )
+        claimable.filter(attempts__gte=settings.OUTBOX_MAX_ATTEMPTS).update(
+            status='FAILED', locked_by='', locked_until=None,
+            last_error=f'Lease habis setelah {settings.OUTBOX_MAX_ATTEMPTS} percobaan.',
+        )
+        ids = list(
+            claimable.select_for_update(skip_locked=True)
+            .filter(attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            OutboxJob.objects.filter(id__in=ids).update(
+                locked_by=worker,
+                locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+                attempts=F('attempts') + 1,
+            )
+    return ids
+
+
+def run_job(job_id, worker):
+    try:
+        with transaction.atomic():
+            job = OutboxJob.objects.select_for_update().filter(pk=job_id, status='PENDING', locked_by=worker).first()
+            if job is None:
+                # Lease sudah diambil worker lain atau job selesai lebih dulu.
+                return False
+            for handler in _handlers[job.event]:
+                handler(job.payload, job)
+            job.status = 'DONE'
+            job.completed_at = timezone.now()
+            job.locked_until = None
+            job.last_error = ''
+            job.save(update_fields=['status', 'completed_at', 'locked_until', 'last_error'])
+        return True
+    except Exception as e:
+        logger.exception('Job outbox %s gagal', job_id)
+        _record_failure(job_id, worker, e)
+        return False
+
+
+def _record_failure(job_id, worker, error):
+    job = OutboxJob.objects.filter(pk=job_id, locked_by=worker).first()
+    if job is None:
+        return
+    job.last_error = f'{type(error).__name__}: {error}'
+    job.locked_by = ''
+    job.locked_until = None
+    if job.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        job.status = 'FAILED'
+    else:
+        job.available_at = timezone.now() + timedelta(seconds=min(2 ** job.attempts, 3600))
+    job.save(update_fields=['last_error', 'locked_by', 'locked_until', 'status', 'available_at'])
+
+
+def drain(worker, batch_size=10):
+    """Klaim dan jalankan satu batch; kembalikan jumlah job yang diklaim."""
+    ids = claim(worker, batch_size)
+    for job_id in ids:
+        run_job(job_id, worker)
+    return len(ids)
+
+
+def purge_completed(older_than_days):
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = OutboxJob.objects.filter(status='DONE', completed_at__lt=cutoff).delete()
+    return deleted
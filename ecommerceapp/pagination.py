@@ -0,0 +1,166 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+async def apaginate_page_number(pagination, queryset, request):
+    """
+    Padanan PageNumberPagination.paginate_queryset() dengan ORM async: COUNT dan SELECT
+    halaman dijalankan lewat acount()/async for, sisanya (validasi nomor halaman, link,
+    pesan error) tetap memakai Paginator Django agar hasilnya sama persis.
+    """
+    pagination.request = request
+    page_size = pagination.get_page_size(request)
+    if not page_size:
+        return None
+
+    paginator = pagination.django_paginator_class(queryset, page_size)
+    paginator.count = await queryset.acount()
+    page_number = pagination.get_page_number(request, paginator)
+    try:
+        number = paginator.validate_number(page_number)
+    except InvalidPage as exc:
+        msg = pagination.invalid_page_message.format(page_number=page_number, message=str(exc))
+        raise NotFound(msg)
+
+    bottom = (number - 1) * paginator.per_page
+    top = bottom + paginator.per_page
+    if top + paginator.orphans >= paginator.count:
+        top = paginator.count
+    rows = [row async for row in queryset[bottom:top]]
+    pagination.page = paginator._get_page(rows, number, paginator)
+    if paginator.num_pages > 1 and pagination.template is not None:
+        pagination.display_page_controls = True
+    return rows
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Paginasi keyset (terbaru lebih dulu) di atas kunci stabil (created_at, id), dengan
+    cursor opaque dan tanpa COUNT(*) kecuali diminta lewat ``?count=true``.
+
+    Mode keyset aktif jika request membawa parameter ``cursor`` (nilai kosong berarti
+    halaman pertama). Tanpa parameter itu, paginasi nomor halaman lama tetap dipakai
+    sehingga klien frontend lama tidak perlu diubah.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    keyset_fields = ('created_at', 'id')
+    invalid_cursor_message = 'Cursor tidak valid.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare(queryset, request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        if self.count_requested:
+            self.total = queryset.count()
+        return self.keyset_page(list(self.keyset_slice(queryset)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Padanan paginate_queryset() untuk view async: query yang sama lewat ORM async."""
+        queryset = self.prepare(queryset, request)
+        if not self.keyset:
+            return await apaginate_page_number(self, queryset, request)
+        if self.count_requested:
+            self.total = await queryset.acount()
+        return self.keyset_page([row async for row in self.keyset_slice(queryset)])
+
+    def prepare(self, queryset, request):
+        time_field, id_field = self.keyset_fields
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            # Urutan yang sudah ada (mis. relevansi pencarian) dipertahankan di mode nomor halaman.
+            if not queryset.ordered:
+                queryset = queryset.order_by(f'-{time_field}', f'-{id_field}')
+            return queryset
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.total = None
+        self.count_requested = request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+        token = request.query_params[self.cursor_query_param]
+        self.position = self.decode_cursor(token) if token else None
+        return queryset.order_by(f'-{time_field}', f'-{id_field}')
+
+    def keyset_slice(self, queryset):
+        time_field, id_field = self.keyset_fields
+        if self.position:
+            value, pk, reverse = self.position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{time_field}__gt': value}) | Q(**{time_field: value, f'{id_field}__gt': pk})
+                ).order_by(time_field, id_field)
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{time_field}__lt': value}) | Q(**{time_field: value, f'{id_field}__lt': pk})
+                )
+        return queryset[:self.page_size + 1]
+
+    def keyset_page(self, rows):
+        reverse = bool(self.position and self.position[2])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = bool(rows), has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        self.rows = rows
+        return rows
+
+    def encode_cursor(self, row, reverse=False):
+        time_field, id_field = self.keyset_fields
+        # Baris bisa berupa instance model atau dict values() (jalur serialisasi cepat).
+        if isinstance(row, dict):
+            value, pk = row[time_field], row[id_field]
+        else:
+            value, pk = getattr(row, time_field), getattr(row, id_field)
+        data = {'c': value.isoformat(), 'i': pk}
+        if reverse:
+            data['r'] = 1
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode()
+
+    def decode_cursor(self, token):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()))
+            return datetime.fromisoformat(data['c']), int(data['i']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_link(self, row, reverse):
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.build_link(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.rows:
+            return None
+        return self.build_link(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        payload = {}
+        if self.total is not None:
+            payload['count'] = self.total
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
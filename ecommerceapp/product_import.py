@@ -0,0 +1,181 @@
+"""
+Impor/pembaruan produk massal milik seller dari CSV, NDJSON atau JSON.
+
+Baris dibaca secara streaming dan divalidasi satu per satu dengan ProductImportRowSerializer;
+baris yang lolos dikumpulkan per batch PRODUCT_IMPORT_BATCH_SIZE lalu di-upsert dengan satu
+bulk_create(update_conflicts=True) pada (seller, sku), masing-masing dalam transaksinya
+sendiri. Kategori di-resolve dari slug dengan satu query di awal, dan jumlah query per batch
+tetap, sehingga waktu impor naik linier dengan jumlah baris. Baris yang gagal dilaporkan
+per nomor baris tanpa menggagalkan baris lain.
+
+CSV dan NDJSON adalah format streaming untuk file besar. Array JSON harus di-parse utuh di
+memori, jadi ukurannya dibatasi PRODUCT_IMPORT_MAX_JSON_BYTES.
+"""
+import codecs
+import csv
+import json
+import os
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
+from rest_framework import serializers
+
+from .autocomplete import refresh_products
+from .cart import bump_cart_prices
+from .catalog_cache import bump_catalog_version
+from .models import Category, Product
+from .search import index_products
+from .serializers import ProductImportRowSerializer
+
+FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/json': 'json',
+}
+REQUIRED_COLUMNS = ('sku', 'name', 'price')
+# Kolom yang ditimpa saat SKU sudah ada; gambar dan created_at tidak disentuh impor.
+UPDATE_FIELDS = ['name', 'description', 'price', 'stock', 'is_active', 'category']
+
+
+class ProductImportError(Exception):
+    pass
+
+
+def detect_format(content_type, filename=''):
+    """Tentukan format dari Content-Type, atau dari ekstensi nama file unggahan."""
+    fmt = FORMATS.get((content_type or '').split(';')[0].strip().lower())
+    if fmt is None:
+        fmt = os.path.splitext(filename)[1].lstrip('.').lower()
+    if fmt not in FORMATS.values():
+        raise ProductImportError('Format harus CSV (text/csv), NDJSON (application/x-ndjson) atau JSON (application/json).')
+    return fmt
+
+
+def read_rows(lines, fmt):
+    """
+    Hasilkan (nomor baris, data) dari iterable baris bytes (file, unggahan, atau body
+    request). data bernilai None untuk baris NDJSON yang bukan objek JSON.
+    """
+    if fmt == 'json':
+        lines = _limit_size(lines, settings.PRODUCT_IMPORT_MAX_JSON_BYTES)
+    text = codecs.iterdecode(lines, 'utf-8-sig')
+    try:
+        if fmt == 'csv':
+            yield from _csv_rows(text)
+        elif fmt == 'ndjson':
+            for number, line in enumerate(text, 1):
+                if line.strip():
+                    yield number, _json_object(line)
+        else:
+            data = json.loads(''.join(text))
+            if not isinstance(data, list):
+                raise ProductImportError('JSON harus berupa array objek produk.')
+            for number, item in enumerate(data, 1):
+                yield number, item if isinstance(item, dict) else None
+    except UnicodeDecodeError:
+        raise ProductImportError('File harus berenkode UTF-8.')
+    except csv.Error as e:
+        raise ProductImportError(f'CSV tidak valid: {e}')
+    except json.JSONDecodeError as e:
+        raise ProductImportError(f'JSON tidak valid: {e}')
+
+
+def _limit_size(lines, limit):
+    # File dan request dibaca per potongan tetap: satu baris JSON minified bisa sebesar seluruh body.
+    if hasattr(lines, 'read'):
+        lines = iter(partial(lines.read, 64 * 1024), b'')
+    total = 0
+    for line in lines:
+        total += len(line)
+        if total > limit:
+            raise ProductImportError(
+                f'JSON melebihi {filesizeformat(limit)}; gunakan NDJSON atau CSV untuk file besar.'
+            )
+        yield line
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(text)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or ()]
+    missing = [name for name in REQUIRED_COLUMNS if name not in reader.fieldnames]
+    if missing:
+        raise ProductImportError(f"Kolom wajib tidak ada: {', '.join(missing)}.")
+    for row in reader:
+        # Sel kosong dianggap tidak diisi agar nilai default serializer berlaku.
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ('', None)}
+
+
+def _json_object(line):
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def import_products(seller, rows, batch_size=None, max_errors=None):
+    """
+    Upsert produk seller dari hasil read_rows(). Kembalikan ringkasan jumlah produk baru,
+    diperbarui dan gagal, beserta paling banyak ``max_errors`` detail error per baris.
+    """
+    batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+    max_errors = settings.PRODUCT_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    serializer = ProductImportRowSerializer(context={'categories': dict(Category.objects.values_list('slug', 'id'))})
+    result = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    seen = {}
+    batch = []
+
+    for number, row in rows:
+        try:
+            if row is None:
+                raise serializers.ValidationError({'non_field_errors': ['Baris harus berupa objek JSON.']})
+            data = serializer.run_validation(row)
+            # ON CONFLICT tidak boleh mengenai baris yang sama dua kali dalam satu statement.
+            if data['sku'] in seen:
+                raise serializers.ValidationError({'sku': [f"SKU sudah dipakai di baris {seen[data['sku']]}."]})
+        except serializers.ValidationError as e:
+            result['failed'] += 1
+            if len(result['errors']) < max_errors:
+                result['errors'].append({'row': number, 'sku': (row or {}).get('sku'), 'errors': e.detail})
+            continue
+
+        seen[data['sku']] = number
+        batch.append(data)
+        if len(batch) >= batch_size:
+            _upsert(seller, batch, result)
+            batch = []
+    if batch:
+        _upsert(seller, batch, result)
+
+    # bulk_create tidak memicu sinyal post_save, jadi cache katalog dan harga keranjang diinvalidasi manual.
+    if result['created'] or result['updated']:
+        bump_catalog_version()
+        bump_cart_prices()
+    return result
+
+
+def _upsert(seller, batch, result):
+    skus = [data['sku'] for data in batch]
+    products = [
+        Product(
+            seller=seller, sku=data['sku'], name=data['name'], description=data['description'],
+            price=data['price'], stock=data['stock'], is_active=data['is_active'], category_id=data['category'],
+        )
+        for data in batch
+    ]
+    with transaction.atomic():
+        existing = set(Product.objects.filter(seller=seller, sku__in=skus).values_list('sku', flat=True))
+        Product.objects.bulk_create(
+            products, update_conflicts=True, unique_fields=['seller', 'sku'], update_fields=UPDATE_FIELDS,
+        )
+        # Backend tanpa RETURNING pada upsert tidak mengisi pk; ambil dari database.
+        if any(product.pk is None for product in products):
+            ids = dict(Product.objects.filter(seller=seller, sku__in=skus).values_list('sku', 'id'))
+            for product in products:
+                product.pk = ids[product.sku]
+        index_products(products)
+        transaction.on_commit(lambda: refresh_products([product.pk for product in products]))
+    result['created'] += len(batch) - len(existing)
+    result['updated'] += len(existing)
@@ -0,0 +1,135 @@
+"""
+Reservasi stok untuk keranjang (mode opsional, CART_RESERVATIONS_ENABLED).
+
+Saat aktif, setiap perubahan keranjang menyamakan StockHold user dengan quantity di
+keranjang: unit tambahan hanya ditahan jika ``stock - reserved`` masih cukup, dicek oleh
+UPDATE bersyarat pada counter Product.reserved (tanpa SUM atas tabel hold). Hold berlaku
+CART_RESERVATION_TTL_SECONDS sejak terakhir diubah; hold kedaluwarsa dilepas oleh
+``manage.py release_stock_holds``. Checkout (lihat checkout.place_orders) mengubah hold
+menjadi pengurangan stok tanpa mengunci baris produk lebih dulu.
+
+Invarian: Product.reserved selalu sama dengan jumlah quantity StockHold produk itu, karena
+keduanya hanya diubah bersama di transaksi yang sama.
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .catalog_cache import bump_catalog_version
+from .models import CartItem, Product, StockHold
+
+
+class ReservationError(Exception):
+    def __init__(self, shortages):
+        super().__init__(shortages)
+        # {product_id: pesan}
+        self.shortages = shortages
+
+
+def reservations_enabled():
+    return settings.CART_RESERVATIONS_ENABLED
+
+
+def adjust_reserved(deltas, guard=True):
+    """
+    Tambah/kurangi counter reserved banyak produk dalam satu UPDATE. Dengan ``guard``,
+    penambahan hanya berlaku jika stok tersedia cukup; kembalikan False jika ada produk
+    yang tidak memenuhi (pemanggil harus membatalkan transaksinya).
+    """
+    if not deltas:
+        return True
+    condition = reduce(or_, (
+        Q(id=pid, stock__gte=F('reserved') + delta) if guard and delta > 0 else Q(id=pid)
+        for pid, delta in deltas.items()
+    ))
+    updated = Product.objects.filter(condition).update(
+        reserved=F('reserved') + Case(
+            *(When(id=pid, then=Value(delta)) for pid, delta in deltas.items()),
+            default=Value(0),
+        )
+    )
+    return updated == len(deltas)
+
+
+def sync_holds(user, product_ids):
+    """
+    Samakan hold user untuk ``product_ids`` dengan quantity di keranjangnya, dan perpanjang
+    masa berlakunya. Dipanggil di dalam transaksi yang mengubah keranjang; jika stok tidak
+    cukup, tidak ada hold yang berubah dan ReservationError dilempar agar pemanggil ikut
+    membatalkan perubahan keranjangnya.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    wanted = dict(
+        CartItem.objects.filter(user=user, product_id__in=product_ids).values_list('product_id', 'quantity')
+    )
+    expires_at = timezone.now() + timedelta(seconds=settings.CART_RESERVATION_TTL_SECONDS)
+
+    with transaction.atomic():
+        # Hold dikunci sebelum baris produk, urutan yang sama dengan checkout dan penyapu.
+        held = dict(
+            StockHold.objects.select_for_update()
+            .filter(user=user, product_id__in=product_ids)
+            .values_list('product_id', 'quantity')
+        )
+        deltas = {
+            pid: wanted.get(pid, 0) - held.get(pid, 0)
+            for pid in product_ids
+            if wanted.get(pid, 0) != held.get(pid, 0)
+        }
+        reserved = adjust_reserved(deltas)
+        if reserved:
+            released = [pid for pid in held if not wanted.get(pid)]
+            if released:
+                StockHold.objects.filter(user=user, product_id__in=released).delete()
+            StockHold.objects.bulk_create(
+                [
+                    StockHold(user=user, product_id=pid, quantity=quantity, expires_at=expires_at)
+                    for pid, quantity in wanted.items()
+                    if quantity > 0
+                ],
+                update_conflicts=True, unique_fields=['user', 'product'], update_fields=['quantity', 'expires_at'],
+            )
+            if deltas:
+                transaction.on_commit(bump_catalog_version)
+        else:
+            transaction.set_rollback(True)
+
+    if not reserved:
+        raise ReservationError(_shortages(deltas))
+
+
+def _shortages(deltas):
+    wanted = {pid: delta for pid, delta in deltas.items() if delta > 0}
+    return {
+        product.id: f'Stok {product.name} hanya tersedia {product.available_stock}.'
+        for product in Product.objects.filter(id__in=wanted).only('id', 'name', 'stock', 'reserved')
+        if product.available_stock < wanted[product.id]
+    }
+
+
+def release_expired_holds(batch_size=1000, now=None):
+    """Lepas satu batch hold yang sudah kedaluwarsa; kembalikan jumlah hold yang dilepas."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        holds = list(
+            StockHold.objects.select_for_update(skip_locked=True)
+            .filter(expires_at__lte=now)
+            .order_by('expires_at', 'id')
+            .values_list('id', 'product_id', 'quantity')[:batch_size]
+        )
+        if not holds:
+            return 0
+        released = {}
+        for _, pid, quantity in holds:
+            released[pid] = released.get(pid, 0) - quantity
+        StockHold.objects.filter(id__in=[hold_id for hold_id, _, _ in holds]).delete()
+        adjust_reserved(released, guard=False)
+        transaction.on_commit(bump_catalog_version)
+    return len(holds)
@@ -0,0 +1,122 @@
+"""
+Pencarian full-text produk.
+
+SQLite memakai tabel virtual FTS5 ``ecommerceapp_product_fts`` (model unmanaged
+ProductSearchIndex, di-JOIN lewat ``search_index``) yang disinkronkan dari sinyal save/delete Product. Postgres memakai kolom generated ``search_vector`` (tsvector)
+dengan indeks GIN, sehingga sinkronisasinya dilakukan oleh database sendiri.
+Backend lain kembali ke pencarian icontains seperti SearchFilter bawaan DRF.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Count, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+FTS_TABLE = 'ecommerceapp_product_fts'
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(text):
+    return TERM_RE.findall((text or '').lower())
+
+
+def search_products(queryset, text):
+    """Saring queryset produk dengan pencarian prefix dan urutkan berdasarkan relevansi."""
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return (
+            queryset.filter(search_index__isnull=False)
+            .filter(RawSQL(f'{FTS_TABLE} MATCH %s', [match], output_field=BooleanField()))
+            .alias(search_rank=RawSQL(f'bm25({FTS_TABLE}, 10.0, 1.0)', [], output_field=FloatField()))
+            .order_by('search_rank', '-id')
+        )
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+        # search_vector adalah kolom generated di luar model (migrasi 0006), jadi dirujuk lewat RawSQL.
+        vector = RawSQL('ecommerceapp_product.search_vector', [], output_field=SearchVectorField())
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config='simple', search_type='raw')
+        return (
+            queryset.alias(search_vector=vector)
+            .filter(search_vector=query)
+            .alias(search_rank=SearchRank(vector, query))
+            .order_by('-search_rank', '-id')
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition)
+
+
+def _facet_rows(queryset):
+    return (
+        queryset.order_by()
+        .values('category__slug', 'category__name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'category__name')
+    )
+
+
+def _facet(row):
+    return {'slug': row['category__slug'], 'name': row['category__name'], 'count': row['count']}
+
+
+def category_facets(queryset):
+    return [_facet(row) for row in _facet_rows(queryset)]
+
+
+async def acategory_facets(queryset):
+    return [_facet(row) async for row in _facet_rows(queryset)]
+
+
+def index_products(products):
+    """Tulis ulang entri FTS untuk produk yang diberikan (no-op di luar SQLite)."""
+    if connection.vendor != 'sqlite':
+        return
+    rows = [(product.id, product.name, product.description) for product in products]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)', rows)
+
+
+def unindex_products(product_ids):
+    if connection.vendor != 'sqlite' or not product_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in product_ids])
+
+
+def rebuild_index():
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'SELECT id, name, description FROM ecommerceapp_product'
+        )
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """
+    Pengganti SearchFilter untuk produk. Hasil diurutkan berdasarkan relevansi pada
+    paginasi nomor halaman; mode keyset tetap berurutan dari yang terbaru.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not search_terms(text):
+            return queryset
+        queryset = search_products(queryset, text)
+        view.search_queryset = queryset
+        return queryset
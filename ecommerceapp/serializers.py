@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from .models import CustomUser, Product, CartItem, Order, OrderItem, Category
+from .fieldsets import FieldSetSerializerMixin
+from .images import variant_srcset
+from .order_status import MAX_BATCH, TransitionError, can_transition, transition_error, transition_orders
 import re
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
@@ -49,17 +52,25 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['email'] = user.email
         return token
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(FieldSetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug']
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(FieldSetSerializerMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
+    image_srcset = serializers.SerializerMethodField()
+    # stock - unit yang sedang ditahan keranjang (mode reservasi); sama dengan stock jika mode mati.
+    available_stock = serializers.IntegerField(read_only=True)
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'stock', 'image', 'category'] 
+        fields = ['id', 'name', 'description', 'price', 'stock', 'available_stock', 'image', 'image_srcset', 'category'] 
         read_only_fields = ['id', 'created_at']
+        # Kolom yang dibaca field non-kolom, agar only() dari ?fields= tidak menunda kolom ini.
+        field_dependencies = {'available_stock': ['stock', 'reserved'], 'image_srcset': ['image_variants']}
+
+    def get_image_srcset(self, obj):
+        return variant_srcset(obj, self.context.get('request'))
 
 class CartItemReadSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
@@ -77,36 +88,139 @@ class CartItemWriteSerializer(serializers.ModelSerializer):
         model = CartItem
         fields = ['product', 'quantity'] 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class CartBulkLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, default=1)
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'], default='add')
+
+    def validate(self, data):
+        if data['op'] == 'add' and data['quantity'] < 1:
+            raise serializers.ValidationError({"quantity": "Jumlah yang ditambahkan minimal 1."})
+        return data
+
+class CartBulkSerializer(serializers.Serializer):
+    items = CartBulkLineSerializer(many=True, allow_empty=False, max_length=500)
+
+class OrderItemSerializer(FieldSetSerializerMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity', 'price'] 
 
-class UserPublicSerializer(serializers.ModelSerializer):
+class UserPublicSerializer(FieldSetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['id', 'email', 'first_name']
 
-class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True) 
+class CartSellerSummarySerializer(serializers.Serializer):
+    seller = UserPublicSerializer(allow_null=True)
+    item_count = serializers.IntegerField()
+    units = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class CartSummarySerializer(serializers.Serializer):
+    item_count = serializers.IntegerField()
+    units = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=14, decimal_places=2)
+    sellers = CartSellerSummarySerializer(many=True)
+
+class OrderListSerializer(FieldSetSerializerMixin, serializers.ModelSerializer):
+    # Untuk daftar order: ringkasan item dari kolom Order, tanpa memuat OrderItem/Product.
     user = UserPublicSerializer(read_only=True)
     seller = UserPublicSerializer(read_only=True)
     class Meta:
         model = Order
-        fields = ['id', 'user','seller', 'created_at', 'total_amount', 'status', 'shipping_address', 'items']
+        fields = [
+            'id', 'user', 'seller', 'created_at', 'total_amount', 'status', 'shipping_address',
+            'item_count', 'total_units', 'preview_product_name', 'preview_image',
+        ]
         read_only_fields = ['created_at', 'total_amount', 'status']
+
+class OrderSerializer(OrderListSerializer):
+    items = OrderItemSerializer(many=True, read_only=True) 
+    class Meta(OrderListSerializer.Meta):
+        fields = [*OrderListSerializer.Meta.fields, 'items']
         
 class SellerProductSerializer(serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'stock', 'image', 'is_active', 'category']
-        read_only_fields = ['id', 'is_active']
+        fields = ['id', 'sku', 'name', 'description', 'price', 'stock', 'reserved', 'image', 'image_srcset', 'is_active', 'category']
+        read_only_fields = ['id', 'reserved', 'is_active']
+
+    def get_image_srcset(self, obj):
+        return variant_srcset(obj, self.context.get('request'))
+
+    def validate_sku(self, value):
+        # SKU kosong disimpan NULL agar tidak bentrok dengan produk lain yang juga tanpa SKU.
+        if not value:
+            return None
+        queryset = Product.objects.filter(seller=self.context['request'].user, sku=value)
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError("SKU sudah dipakai produk lain.")
+        return value
+
+class ProductImportRowSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    stock = serializers.IntegerField(min_value=0, default=0)
+    is_active = serializers.BooleanField(default=True)
+    category = serializers.SlugField(max_length=100, allow_null=True, default=None)
+
+    def validate_category(self, value):
+        # Peta slug -> id dimuat sekali per impor (lihat product_import.import_products).
+        if value is None:
+            return None
+        categories = self.context['categories']
+        if value not in categories:
+            raise serializers.ValidationError(f"Kategori '{value}' tidak ditemukan.")
+        return categories[value]
         
 class SellerOrderUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ['status']
+
+    def validate_status(self, value):
+        if self.instance is not None and value != self.instance.status and not can_transition(self.instance.status, value):
+            raise serializers.ValidationError(transition_error(self.instance.status, value))
+        return value
+
+    def update(self, instance, validated_data):
+        # Lewat transition_orders yang sama dengan perubahan massal: status lama dibaca ulang
+        # dengan lock, stok pembatalan dikembalikan, rollup dipindahkan, dan event ditulis.
+        new_status = validated_data.get('status', instance.status)
+        if new_status != instance.status:
+            try:
+                changed, skipped, _ = transition_orders(instance.seller_id, [instance.pk], new_status)
+            except TransitionError as e:
+                raise serializers.ValidationError({'status': [str(e)]})
+            if not changed:
+                raise serializers.ValidationError({'status': [skipped[0]['error']]})
+            instance.status = new_status
+        return instance
+
+class OrderStatusBulkSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_BATCH)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+class SalesProductSerializer(serializers.Serializer):
+    id = serializers.IntegerField(allow_null=True)
+    name = serializers.CharField(allow_null=True)
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class SalesPeriodSerializer(serializers.Serializer):
+    period = serializers.CharField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    orders = serializers.IntegerField()
+    units = serializers.IntegerField()
+    status = serializers.DictField(child=serializers.IntegerField())
+    products = SalesProductSerializer(many=True)
         
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
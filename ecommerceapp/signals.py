@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import autocomplete
+from .analytics import merge_deleted_product_rollups
+from .authentication import forget_auth_state, refresh_auth_state
+from .cart import bump_cart_prices
+from .catalog_cache import bump_catalog_version
+from .models import Category, CustomUser, Product
+from .search import index_products, unindex_products
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    # Naikkan versi setelah commit agar pembaca tidak mengisi ulang cache dengan data lama.
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'name', 'description'} & set(update_fields):
+        return
+    index_products([instance])
+
+
+@receiver(pre_delete, sender=Product)
+def merge_product_rollups(sender, instance, **kwargs):
+    merge_deleted_product_rollups([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    unindex_products([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+def update_autocomplete_product(sender, instance, **kwargs):
+    name = instance.name if instance.is_active and instance.stock > 0 else None
+    transaction.on_commit(lambda: autocomplete.index.update_products({instance.pk: name}))
+
+
+@receiver(post_delete, sender=Product)
+def remove_autocomplete_product(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.update_products({pk: None}))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_autocomplete_categories(sender, **kwargs):
+    transaction.on_commit(autocomplete.index.refresh_categories)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_cart_prices(sender, update_fields=None, **kwargs):
+    # Simpan tanpa update_fields bisa saja mengubah harga, jadi dianggap berubah.
+    if update_fields and 'price' not in update_fields:
+        return
+    transaction.on_commit(bump_cart_prices)
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_user_auth_state(sender, instance, **kwargs):
+    # Termasuk ganti password (ChangePasswordView) dan penonaktifan user dari admin.
+    refresh_auth_state(instance)
+
+
+@receiver(post_delete, sender=CustomUser)
+def forget_user_auth_state(sender, instance, **kwargs):
+    forget_auth_state(instance.pk)
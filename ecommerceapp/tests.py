@@ -1,3 +1,771 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.db.utils import ConnectionDoesNotExist
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+
+from ecommerce.database import cache_from_url
+
+from . import autocomplete, db_router, fast_serialization, outbox
+from .analytics import rebuild_rollups
+from .authentication import ClaimsJWTAuthentication
+from .images import generate_variants
+from .management.commands.check_query_counts import ENDPOINTS, create_users, seed, url_ids
+from .models import (
+    CartItem, Category, CustomUser, Order, OutboxJob, Product, SellerProductSalesRollup,
+    SellerSalesRollup, StockHold,
+)
+from .order_summary import SUMMARY_FIELDS, backfill_summaries
+from .reservations import release_expired_holds
+from .serializers import MyTokenObtainPairSerializer
+from .throttling import CacheBucketStore, get_store
+
+
+def rollup_rows():
+    """Isi tabel rollup (tanpa baris nol) untuk dibandingkan dengan hasil rebuild_rollups()."""
+    return (
+        sorted(
+            SellerSalesRollup.objects.exclude(order_count=0, units=0)
+            .values_list('seller_id', 'day', 'status', 'order_count', 'units', 'revenue')
+        ),
+        sorted(
+            SellerProductSalesRollup.objects.exclude(units=0)
+            .values_list('seller_id', 'product_id', 'day', 'status', 'units', 'revenue'),
+            key=str,
+        ),
+    )
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, CATALOG_CACHE_TIMEOUT=0)
+class APITestCase(TestCase):
+    """Dasar test API: cache dan bucket rate limit dikosongkan per test, rate limit dan cache katalog mati."""
+
+    def setUp(self):
+        cache.clear()
+        get_store().clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def create_user(self, email, **extra):
+        return CustomUser.objects.create_user(email=email, password='rahasia-123!', **extra)
+
+    def create_product(self, seller, name='Kopi Bubuk', price='10000.00', stock=10, **extra):
+        return Product.objects.create(seller=seller, name=name, price=Decimal(price), stock=stock, **extra)
+
+    def checkout(self, buyer, lines):
+        client = self.client_for(buyer)
+        for product, quantity in lines:
+            CartItem.objects.create(user=buyer, product=product, quantity=quantity)
+        return client.post('/api/v1/checkout/', {'shipping_address': 'Jl. Uji 1'}, format='json')
+
+
+class QueryCountTests(APITestCase):
+    """Setiap endpoint list/detail memakai jumlah query tetap, halaman berisi 1 baris maupun penuh."""
+
+    def assert_query_counts(self, users):
+        ids = url_ids()
+        for name, url, owner, expected in ENDPOINTS:
+            client = self.client_for(users[owner]) if owner else APIClient()
+            with self.subTest(endpoint=name), self.assertNumQueries(expected):
+                response = client.get(url.format(**ids))
+                if response.streaming:
+                    # Query ekspor baru berjalan saat isi respons dibaca.
+                    b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+
+    def test_fast_serialization(self):
+        users = create_users()
+        seed(users, 1)
+        self.assert_query_counts(users)
+        seed(users, 11)
+        self.assert_query_counts(users)
+
+    @override_settings(FAST_SERIALIZATION=False)
+    def test_drf_serializers(self):
+        users = create_users()
+        seed(users, 1)
+        self.assert_query_counts(users)
+        seed(users, 11)
+        self.assert_query_counts(users)
+
+
+class CheckoutTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.buyer = self.create_user('buyer@example.com')
+        self.sellers = [self.create_user(f'seller{i}@example.com') for i in range(2)]
+
+    def test_one_order_per_seller_and_stock_decremented(self):
+        first = self.create_product(self.sellers[0], stock=5)
+        second = self.create_product(self.sellers[0], name='Teh Celup', stock=5)
+        third = self.create_product(self.sellers[1], name='Gula Aren', stock=5)
+        response = self.checkout(self.buyer, [(first, 2), (second, 1), (third, 5)])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(order['seller']['id'] for order in response.json()), sorted(s.pk for s in self.sellers))
+        self.assertEqual(
+            dict(Product.objects.values_list('id', 'stock')), {first.pk: 3, second.pk: 4, third.pk: 0},
+        )
+        self.assertEqual(Order.objects.get(seller=self.sellers[0]).total_amount, Decimal('30000.00'))
+        self.assertFalse(CartItem.objects.filter(user=self.buyer).exists())
+
+    def test_insufficient_stock_changes_nothing(self):
+        plenty = self.create_product(self.sellers[0], stock=5)
+        scarce = self.create_product(self.sellers[1], name='Gula Aren', stock=1)
+        response = self.checkout(self.buyer, [(plenty, 1), (scarce, 2)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(dict(Product.objects.values_list('id', 'stock')), {plenty.pk: 5, scarce.pk: 1})
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(user=self.buyer).count(), 2)
+
+    def test_query_count_independent_of_cart_size(self):
+        counts = []
+        for size in (1, 8):
+            products = [self.create_product(self.sellers[i % 2], name=f'Produk {size}-{i}') for i in range(size)]
+            for product in products:
+                CartItem.objects.create(user=self.buyer, product=product, quantity=1)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client_for(self.buyer).post('/api/v1/checkout/', {'shipping_address': 'Jl. Uji 1'}, format='json')
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class CatalogCacheTests(APITestCase):
+    @override_settings(CATALOG_CACHE_TIMEOUT=300)
+    def test_cached_until_catalog_changes(self):
+        seller = self.create_user('seller@example.com')
+        product = self.create_product(seller)
+        client = APIClient()
+        first = client.get('/api/v1/products/')
+        with self.assertNumQueries(0):
+            cached = client.get('/api/v1/products/')
+        self.assertEqual(cached.json(), first.json())
+
+        not_modified = client.get('/api/v1/products/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        product.name = 'Kopi Arabika'
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        changed = client.get('/api/v1/products/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['results'][0]['name'], 'Kopi Arabika')
+
+    def test_cache_url_selects_backend(self):
+        self.assertEqual(cache_from_url('locmem://')['LOCATION'], 'ecommerce-default')
+        redis = cache_from_url('redis://cache:6379/1')
+        self.assertEqual(redis['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertEqual(redis['LOCATION'], 'redis://cache:6379/1')
+        memcached = cache_from_url('memcached://mc1:11211,mc2:11211')
+        self.assertEqual(memcached['LOCATION'], ['mc1:11211', 'mc2:11211'])
+        with self.assertRaises(ValueError):
+            cache_from_url('file:///tmp/cache')
+
+
+class KeysetPaginationTests(APITestCase):
+    def test_cursor_pages_cover_every_row_once(self):
+        seller = self.create_user('seller@example.com')
+        products = [self.create_product(seller, name=f'Produk {i}') for i in range(30)]
+        # Banyak baris dengan created_at sama: id menjadi pemutus urutan.
+        Product.objects.filter(pk__in=[p.pk for p in products[:20]]).update(created_at=products[0].created_at)
+
+        seen = []
+        url = '/api/v1/products/?cursor='
+        while url:
+            page = APIClient().get(url).json()
+            seen.extend(row['id'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(sorted(seen), sorted(p.pk for p in products))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(APIClient().get('/api/v1/products/?cursor=bukan-cursor').status_code, 404)
+
+
+class SearchTests(APITestCase):
+    def test_prefix_search_with_category_facets(self):
+        seller = self.create_user('seller@example.com')
+        drinks = Category.objects.create(name='Minuman')
+        self.create_product(seller, name='Kopi Bubuk', category=drinks)
+        self.create_product(seller, name='Kopiah Hitam')
+        self.create_product(seller, name='Teh Celup', category=drinks)
+
+        data = APIClient().get('/api/v1/products/?search=kop').json()
+        self.assertEqual(sorted(row['name'] for row in data['results']), ['Kopi Bubuk', 'Kopiah Hitam'])
+        self.assertEqual({facet['slug']: facet['count'] for facet in data['facets']['category']}, {'minuman': 1, None: 1})
+
+    def test_name_matches_rank_first(self):
+        seller = self.create_user('seller@example.com')
+        self.create_product(seller, name='Kopi Susu Gula Aren', description='Siap seduh')
+        self.create_product(seller, name='Gula Aren', description='Cocok untuk kopi susu')
+
+        data = APIClient().get('/api/v1/products/?search=kopi').json()
+        self.assertEqual([row['name'] for row in data['results']], ['Kopi Susu Gula Aren', 'Gula Aren'])
+
+
+class SalesRollupTests(APITestCase):
+    def test_incremental_rollups_match_rebuild(self):
+        buyer = self.create_user('buyer@example.com')
+        seller = self.create_user('seller@example.com')
+        products = [self.create_product(seller, name=f'Produk {i}', stock=20) for i in range(3)]
+        orders = self.checkout(buyer, [(products[0], 2), (products[1], 1)]).json()
+        self.checkout(buyer, [(products[2], 3)])
+        self.client_for(seller).patch(f"/api/v1/dashboard/sales/{orders[0]['id']}/", {'status': 'PROCESSING'}, format='json')
+
+        live = rollup_rows()
+        rebuild_rollups()
+        self.assertEqual(live, rollup_rows())
+
+        data = self.client_for(seller).get('/api/v1/dashboard/analytics/').json()
+        self.assertEqual(sum(row['orders'] for row in data['results']), 2)
+        self.assertEqual(sum(row['units'] for row in data['results']), 6)
+
+    def test_failed_rebuild_keeps_existing_rollups(self):
+        buyer = self.create_user('buyer@example.com')
+        seller = self.create_user('seller@example.com')
+        product = self.create_product(seller, stock=20)
+        self.checkout(buyer, [(product, 2)])
+        live = rollup_rows()
+
+        # Hapus dan hitung ulang satu seller berada dalam satu transaksi: gagal di tengah tidak meninggalkan rollup kosong.
+        with mock.patch('ecommerceapp.analytics._collect', side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            rebuild_rollups()
+        self.assertEqual(live, rollup_rows())
+
+    def test_deleted_products_share_one_row_per_key(self):
+        buyer = self.create_user('buyer@example.com')
+        seller = self.create_user('seller@example.com')
+        products = [self.create_product(seller, name=f'Produk {i}', stock=20) for i in range(2)]
+        order = self.checkout(buyer, [(products[0], 2), (products[1], 1)]).json()[0]
+        for product in products:
+            product.delete()
+        client = self.client_for(seller)
+        for status in ('PROCESSING', 'SHIPPED'):
+            client.patch(f"/api/v1/dashboard/sales/{order['id']}/", {'status': status}, format='json')
+
+        null_rows = SellerProductSalesRollup.objects.filter(product=None)
+        self.assertEqual(null_rows.count(), 3)
+        self.assertEqual(null_rows.get(status='SHIPPED').units, 3)
+        live = rollup_rows()
+        rebuild_rollups()
+        self.assertEqual(live, rollup_rows())
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=(200, 400, 800))
+class ImageVariantTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_variants_narrower_than_source(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (500, 300), 'red').save(buffer, format='JPEG')
+        product = self.create_product(self.create_user('seller@example.com'))
+        product.image.save('foto.jpg', io.BytesIO(buffer.getvalue()), save=True)
+
+        variants = generate_variants(product.pk)
+        self.assertEqual(set(variants), {'webp', 'jpeg'})
+        self.assertEqual(set(variants['webp']), {'200', '400'})
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants, variants)
+        srcset = APIClient().get(f'/api/v1/products/{product.pk}/').json()['image_srcset']
+        self.assertIn('200w', srcset['webp'])
+
+    def test_stale_save_keeps_variants(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (500, 300), 'red').save(buffer, format='JPEG')
+        product = self.create_product(self.create_user('seller@example.com'))
+        product.image.save('foto.jpg', io.BytesIO(buffer.getvalue()), save=True)
+
+        # Instance dimuat sebelum worker selesai, seperti form seller yang disimpan belakangan.
+        stale = Product.objects.get(pk=product.pk)
+        variants = generate_variants(product.pk)
+        stale.name = 'Kopi Arabika'
+        stale.save()
+        product.refresh_from_db()
+        self.assertEqual((product.name, product.image_variants), ('Kopi Arabika', variants))
+
+
+class ClaimsAuthenticationTests(APITestCase):
+    def authenticate(self, user):
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_user_from_claims_without_query(self):
+        user = self.create_user('buyer@example.com', first_name='Budi')
+        self.authenticate(user)
+        with self.assertNumQueries(0):
+            authenticated = self.authenticate(user)
+        self.assertEqual((authenticated.pk, authenticated.email, authenticated.first_name), (user.pk, user.email, 'Budi'))
+
+    def test_inactive_user_rejected(self):
+        user = self.create_user('buyer@example.com')
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        user.is_active = False
+        user.save()
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().authenticate(request)
+
+    def test_stale_claims_fall_back_to_database(self):
+        user = self.create_user('buyer@example.com', first_name='Budi')
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        user.first_name = 'Badu'
+        user.save()
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(ClaimsJWTAuthentication().authenticate(request)[0].first_name, 'Badu')
+
+    def test_password_change_revokes_tokens(self):
+        user = self.create_user('buyer@example.com')
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        self.authenticate(user)
+        user.set_password('rahasia-baru-456!')
+        user.save()
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().authenticate(request)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(user).pk, user.pk)
+
+
+class CartTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.buyer = self.create_user('buyer@example.com')
+        seller = self.create_user('seller@example.com')
+        self.coffee = self.create_product(seller, stock=10)
+        self.tea = self.create_product(seller, name='Teh Celup', stock=3)
+
+    def bulk(self, *items):
+        return self.client_for(self.buyer).post('/api/v1/cart/bulk/', {'items': list(items)}, format='json')
+
+    def test_bulk_operations(self):
+        CartItem.objects.create(user=self.buyer, product=self.tea, quantity=1)
+        response = self.bulk(
+            {'product': self.coffee.pk, 'quantity': 2},
+            {'product': self.coffee.pk, 'quantity': 1},
+            {'product': self.tea.pk, 'op': 'remove'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(dict(CartItem.objects.values_list('product_id', 'quantity')), {self.coffee.pk: 3})
+
+        self.bulk({'product': self.coffee.pk, 'op': 'set', 'quantity': 5})
+        self.assertEqual(dict(CartItem.objects.values_list('product_id', 'quantity')), {self.coffee.pk: 5})
+
+    def test_bulk_is_all_or_nothing(self):
+        response = self.bulk({'product': self.coffee.pk, 'quantity': 2}, {'product': self.tea.pk, 'quantity': 4})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['1'])
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_summary_cached_until_price_changes(self):
+        client = self.client_for(self.buyer)
+        self.bulk({'product': self.coffee.pk, 'quantity': 2}, {'product': self.tea.pk, 'quantity': 1})
+        summary = client.get('/api/v1/cart/summary/').json()
+        self.assertEqual((summary['item_count'], summary['units'], summary['subtotal']), (2, 3, '30000.00'))
+        with self.assertNumQueries(0):
+            client.get('/api/v1/cart/summary/')
+
+        self.coffee.price = Decimal('12000.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.coffee.save()
+        self.assertEqual(client.get('/api/v1/cart/summary/').json()['subtotal'], '34000.00')
+
+
+class ReplicaRoutingTests(APITestCase):
+    def test_reads_use_replica_unless_pinned(self):
+        router = db_router.PrimaryReplicaRouter()
+        with mock.patch.object(db_router, 'replica_aliases', return_value=['replica1']):
+            self.assertEqual(router.db_for_read(Product), 'default')
+            with db_router.replica_read_scope():
+                db_router._use_replica.set(True)
+                self.assertEqual(router.db_for_read(Product), 'replica1')
+                self.assertEqual(router.db_for_write(Product), 'default')
+            self.assertEqual(router.db_for_read(Product), 'default')
+
+            self.assertFalse(db_router.is_pinned('user:1'))
+            db_router.pin_to_primary('user:1')
+            self.assertTrue(db_router.is_pinned('catalog', 'user:1'))
+
+    def test_write_pins_reads_by_signed_cookie(self):
+        buyer = self.create_user('buyer@example.com')
+        product = self.create_product(self.create_user('seller@example.com'))
+        client = self.client_for(buyer)
+        with mock.patch.object(db_router, 'replica_aliases', return_value=['replica1']):
+            CartItem.objects.create(user=buyer, product=product, quantity=1)
+            response = client.post('/api/v1/checkout/', {'shipping_address': 'Jl. Uji 1'}, format='json')
+            self.assertIn(db_router.PIN_COOKIE, response.cookies)
+            # Cache kosong = worker lain dengan LocMemCache sendiri; cookie tetap memaku ke primary.
+            cache.clear()
+            self.assertEqual(client.get('/api/v1/orders/').status_code, 200)
+
+            client.cookies[db_router.PIN_COOKIE] = 'palsu'
+            with self.assertRaises(ConnectionDoesNotExist):
+                client.get('/api/v1/orders/')
+
+
+class OutboxTests(APITestCase):
+    def test_checkout_enqueues_and_worker_completes(self):
+        buyer = self.create_user('buyer@example.com')
+        product = self.create_product(self.create_user('seller@example.com'))
+        order = self.checkout(buyer, [(product, 1)]).json()[0]
+        job = OutboxJob.objects.get()
+        self.assertEqual((job.event, job.payload['order_id']), (outbox.ORDER_CREATED, order['id']))
+
+        self.assertEqual(outbox.drain('uji'), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('DONE', 1))
+
+    def test_enqueue_ignores_duplicate_keys(self):
+        outbox.enqueue([('uji.event', {'n': 1}, 'uji:1')])
+        outbox.enqueue([('uji.event', {'n': 2}, 'uji:1')])
+        self.assertEqual(OutboxJob.objects.get().payload, {'n': 1})
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failing_handler_retried_then_failed(self):
+        handler = mock.Mock(side_effect=RuntimeError('gagal'))
+        with mock.patch.dict(outbox._handlers, {'uji.event': [handler]}), self.assertLogs('ecommerceapp.outbox', 'ERROR'):
+            outbox.enqueue([('uji.event', {}, 'uji:1')])
+            outbox.drain('uji')
+            job = OutboxJob.objects.get()
+            self.assertEqual((job.status, job.attempts), ('PENDING', 1))
+            self.assertGreater(job.available_at, timezone.now())
+
+            OutboxJob.objects.update(available_at=timezone.now())
+            outbox.drain('uji')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), ('FAILED', 'RuntimeError: gagal'))
+        self.assertEqual(handler.call_count, 2)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_expired_lease_at_max_attempts_not_reclaimed(self):
+        # Worker mati di tengah handler: lease habis tanpa _record_failure.
+        handler = mock.Mock()
+        outbox.enqueue([('uji.event', {}, 'uji:1')])
+        OutboxJob.objects.update(attempts=2, locked_by='mati', locked_until=timezone.now() - timedelta(seconds=1))
+        with mock.patch.dict(outbox._handlers, {'uji.event': [handler]}):
+            self.assertEqual(outbox.drain('uji'), 0)
+        self.assertEqual(OutboxJob.objects.get().status, 'FAILED')
+        handler.assert_not_called()
+
+
+@override_settings(ROOT_URLCONF='ecommerce.urls_async')
+class AsyncReadTests(APITestCase):
+    async def test_async_views_match_sync_views(self):
+        await self.seed()
+        for url in ('/api/v1/products/', '/api/v1/products/?cursor=', '/api/v1/categories/'):
+            with self.subTest(url=url):
+                async_response = await self.async_client.get(url)
+                with override_settings(ROOT_URLCONF='ecommerce.urls'):
+                    sync_response = await self.sync_get(url)
+                self.assertEqual(async_response.status_code, 200)
+                self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+
+    async def seed(self):
+        seller = await CustomUser.objects.acreate(email='seller@example.com')
+        category = await Category.objects.acreate(name='Minuman')
+        for i in range(3):
+            await Product.objects.acreate(seller=seller, category=category, name=f'Kopi {i}', price=Decimal('1000.00'), stock=5)
+
+    async def sync_get(self, url):
+        return await sync_to_async(APIClient().get)(url)
+
+
+@override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+class InstrumentationTests(APITestCase):
+    @override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0)
+    def test_slow_log_lists_queries_without_sampling(self):
+        self.create_product(self.create_user('seller@example.com'))
+        with self.assertLogs('ecommerceapp.instrumentation', 'WARNING') as logs:
+            APIClient().get('/api/v1/products/')
+        self.assertIn('ecommerceapp_product', logs.output[-1])
+
+    def test_server_timing_behind_setting(self):
+        with override_settings(INSTRUMENTATION_SERVER_TIMING=False):
+            self.assertNotIn('Server-Timing', APIClient().get('/api/v1/categories/'))
+        with override_settings(INSTRUMENTATION_SERVER_TIMING=True):
+            self.assertIn('db;dur=', APIClient().get('/api/v1/categories/')['Server-Timing'])
+
+
+class ExportTests(APITestCase):
+    def test_sales_csv_one_row_per_item(self):
+        buyer = self.create_user('buyer@example.com')
+        seller = self.create_user('seller@example.com')
+        products = [self.create_product(seller, name=f'Produk {i}') for i in range(2)]
+        self.checkout(buyer, [(products[0], 1), (products[1], 2)])
+        client = self.client_for(seller)
+
+        response = client.get('/api/v1/dashboard/sales/export/csv/')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['order_id', 'created_at', 'status'])
+        self.assertEqual(len(lines), 3)
+
+        filtered = client.get('/api/v1/dashboard/sales/export/csv/?status=DELIVERED')
+        self.assertEqual(len(b''.join(filtered.streaming_content).decode().splitlines()), 1)
+        self.assertEqual(client.get('/api/v1/dashboard/sales/export/csv/?status=HILANG').status_code, 400)
+
+
+class ProductImportTests(APITestCase):
+    def post(self, client, body, content_type='application/x-ndjson'):
+        return client.post('/api/v1/dashboard/products/import/', body, content_type=content_type)
+
+    def test_upsert_by_sku_with_row_errors(self):
+        seller = self.create_user('seller@example.com')
+        client = self.client_for(seller)
+        body = '\n'.join([
+            json.dumps({'sku': 'K-1', 'name': 'Kopi', 'price': '10000', 'stock': 5}),
+            json.dumps({'sku': 'T-1', 'name': 'Teh', 'price': '-1'}),
+            'bukan json',
+        ])
+        result = self.post(client, body).json()
+        self.assertEqual((result['created'], result['updated'], result['failed']), (1, 0, 2))
+        self.assertEqual([error['row'] for error in result['errors']], [2, 3])
+
+        csv_body = 'sku,name,price,stock\nK-1,Kopi Robusta,12000,7\nG-1,Gula,5000,\n'
+        result = self.post(client, csv_body, 'text/csv').json()
+        self.assertEqual((result['created'], result['updated'], result['failed']), (1, 1, 0))
+        self.assertEqual(
+            dict(Product.objects.filter(seller=seller).values_list('sku', 'price')),
+            {'K-1': Decimal('12000.00'), 'G-1': Decimal('5000.00')},
+        )
+
+    @override_settings(PRODUCT_IMPORT_MAX_JSON_BYTES=200)
+    def test_json_array_size_capped_but_ndjson_streams(self):
+        client = self.client_for(self.create_user('seller@example.com'))
+        rows = [{'sku': f'K-{i}', 'name': 'Kopi', 'price': '10000'} for i in range(5)]
+        response = self.post(client, json.dumps(rows), 'application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('NDJSON', response.json()['error'])
+        self.assertFalse(Product.objects.exists())
+
+        result = self.post(client, '\n'.join(json.dumps(row) for row in rows)).json()
+        self.assertEqual(result['created'], 5)
+
+
+@override_settings(CART_RESERVATIONS_ENABLED=True)
+class ReservationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.create_product(self.create_user('seller@example.com'), stock=5)
+        self.buyers = [self.create_user(f'buyer{i}@example.com') for i in range(2)]
+
+    def add(self, buyer, quantity):
+        return self.client_for(buyer).post('/api/v1/cart/', {'product': self.product.pk, 'quantity': quantity}, format='json')
+
+    def assert_reserved_matches_holds(self, expected):
+        self.product.refresh_from_db()
+        held = sum(StockHold.objects.filter(product=self.product).values_list('quantity', flat=True))
+        self.assertEqual((self.product.reserved, held), (expected, expected))
+
+    def test_holds_limit_other_carts(self):
+        self.assertEqual(self.add(self.buyers[0], 3).status_code, 201)
+        self.assertEqual(self.add(self.buyers[1], 3).status_code, 400)
+        self.assertEqual(self.add(self.buyers[1], 2).status_code, 201)
+        self.assert_reserved_matches_holds(5)
+
+    def test_checkout_consumes_hold(self):
+        self.add(self.buyers[0], 3)
+        response = self.client_for(self.buyers[0]).post('/api/v1/checkout/', {'shipping_address': 'Jl. Uji 1'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assert_reserved_matches_holds(0)
+        self.assertEqual(self.product.stock, 2)
+
+    def test_expired_holds_released(self):
+        self.add(self.buyers[0], 3)
+        self.assertEqual(release_expired_holds(now=timezone.now() + timedelta(days=1)), 1)
+        self.assert_reserved_matches_holds(0)
+
+    def test_seller_edit_keeps_reserved(self):
+        # Instance dimuat sebelum hold dibuat, seperti form seller yang disimpan belakangan.
+        stale = Product.objects.get(pk=self.product.pk)
+        self.add(self.buyers[0], 3)
+        stale.name = 'Kopi Arabika'
+        stale.save()
+        self.assert_reserved_matches_holds(3)
+        self.assertEqual(self.product.name, 'Kopi Arabika')
+
+        response = self.client_for(self.product.seller).patch(
+            f'/api/v1/dashboard/products/{self.product.pk}/', {'stock': 8, 'reserved': 0}, format='json',
+        )
+        self.assertEqual(response.json()['reserved'], 3)
+        self.assert_reserved_matches_holds(3)
+
+
+class RateLimitTests(APITestCase):
+    @override_settings(RATE_LIMIT_ENABLED=True)
+    def test_bucket_capacity_then_429(self):
+        client = APIClient()
+        credentials = {'email': 'tidak-ada@example.com', 'password': 'salah'}
+        for remaining in range(9, -1, -1):
+            response = client.post('/api/v1/auth/token/', credentials, format='json')
+            self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+
+        response = client.post('/api/v1/auth/token/', credentials, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_cache_store_keeps_bucket_while_tat_ahead(self):
+        # 2 token, 1 token/detik: timeout kunci 3 detik sejak dibuat, padahal klien tidak pernah berhenti.
+        store, interval = CacheBucketStore(), 1_000_000
+        for second, expected in ((0, [True, True]), (1, [True]), (2, [True]), (3, [True, False])):
+            with mock.patch('time.time', return_value=1_000 + second):
+                now = (1_000 + second) * interval
+                allowed = [store.consume('uji', now, interval, 2 * interval)[0] for _ in expected]
+            self.assertEqual(allowed, expected, f'detik {second}')
+
+
+class AutocompleteTests(APITestCase):
+    def test_prefix_suggestions_follow_catalog(self):
+        seller = self.create_user('seller@example.com')
+        self.create_product(seller, name='Kopi Bubuk')
+        hidden = self.create_product(seller, name='Kopiah Hitam', stock=0)
+        Category.objects.create(name='Kopi Susu')
+        autocomplete.index.rebuild()
+
+        data = APIClient().get('/api/v1/suggest/?q=kop').json()
+        self.assertEqual([row['name'] for row in data['products']], ['Kopi Bubuk'])
+        self.assertEqual([row['slug'] for row in data['categories']], ['kopi-susu'])
+
+        hidden.stock = 4
+        with self.captureOnCommitCallbacks(execute=True):
+            hidden.save()
+        data = APIClient().get('/api/v1/suggest/?q=kop').json()
+        self.assertEqual(sorted(row['name'] for row in data['products']), ['Kopi Bubuk', 'Kopiah Hitam'])
+
+
+class FastSerializationTests(APITestCase):
+    def test_identical_to_drf_serializers(self):
+        users = create_users()
+        seed(users, 3)
+        Product.objects.update(image='products/foto.jpg', image_variants={'webp': {'200': 'products/v/foto-200w.webp'}})
+        ids = url_ids()
+        urls = [
+            (None, '/api/v1/products/'), (None, '/api/v1/products/?cursor='), (None, '/api/v1/products/{product}/'),
+            (None, '/api/v1/categories/'), ('buyer', '/api/v1/orders/'), ('buyer', '/api/v1/orders/{order}/'),
+            ('seller', '/api/v1/dashboard/sales/?cursor='),
+            (None, '/api/v1/products/?cursor=&fields=id,name,category.name&expand=category'),
+            ('buyer', '/api/v1/orders/{order}/?fields=id,items.product.name,items.quantity'),
+        ]
+        for owner, url in urls:
+            client = self.client_for(users[owner]) if owner else APIClient()
+            with self.subTest(url=url):
+                fast = client.get(url.format(**ids))
+                with override_settings(FAST_SERIALIZATION=False):
+                    slow = client.get(url.format(**ids))
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(json.loads(fast.content), json.loads(slow.content))
+
+    def test_missing_orjson_logged(self):
+        fast_serialization._warn_missing_orjson.cache_clear()
+        self.addCleanup(fast_serialization._warn_missing_orjson.cache_clear)
+        with mock.patch.object(fast_serialization, 'orjson', None), self.assertLogs('ecommerceapp.fast_serialization', 'WARNING'):
+            response = APIClient().get('/api/v1/categories/')
+        self.assertEqual(response.status_code, 200)
+
+
+class FieldSetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = create_users()
+        seed(self.users, 2)
+
+    def test_fields_and_expand(self):
+        row = APIClient().get('/api/v1/products/?fields=id,name,category&expand=').json()['results'][0]
+        self.assertEqual(set(row), {'id', 'name', 'category'})
+        self.assertIsInstance(row['category'], int)
+
+        order = self.client_for(self.users['buyer']).get(f"/api/v1/orders/{url_ids()['order']}/?fields=id,items.quantity").json()
+        self.assertEqual(order, {'id': order['id'], 'items': [{'quantity': 1}, {'quantity': 1}]})
+
+    def test_unknown_field_rejected(self):
+        response = APIClient().get('/api/v1/products/?fields=id,bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Field tidak dikenal: bogus.'})
+
+
+class OrderSummaryTests(APITestCase):
+    def test_checkout_and_backfill_write_same_summary(self):
+        buyer = self.create_user('buyer@example.com')
+        seller = self.create_user('seller@example.com')
+        products = [self.create_product(seller, name=f'Produk {i}') for i in range(2)]
+        order_id = self.checkout(buyer, [(products[0], 2), (products[1], 3)]).json()[0]['id']
+        expected = {'item_count': 2, 'total_units': 5, 'preview_product_name': 'Produk 0', 'preview_image': ''}
+        self.assertEqual(Order.objects.values(*SUMMARY_FIELDS).get(pk=order_id), expected)
+
+        Order.objects.update(item_count=0, total_units=0, preview_product_name='')
+        self.assertEqual(backfill_summaries(chunk_size=1), 1)
+        self.assertEqual(Order.objects.values(*SUMMARY_FIELDS).get(pk=order_id), expected)
+
+
+class OrderStatusTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.buyer = self.create_user('buyer@example.com')
+        self.seller = self.create_user('seller@example.com')
+        self.product = self.create_product(self.seller, stock=10)
+        self.orders = [self.checkout(self.buyer, [(self.product, 2)]).json()[0]['id'] for _ in range(3)]
+        self.client = self.client_for(self.seller)
+
+    def bulk(self, ids, status, query=''):
+        return self.client.post(f'/api/v1/dashboard/sales/status/{query}', {'ids': ids, 'status': status}, format='json')
+
+    def test_illegal_transition_rejected(self):
+        Order.objects.filter(pk=self.orders[0]).update(status='DELIVERED')
+        response = self.client.patch(f'/api/v1/dashboard/sales/{self.orders[0]}/', {'status': 'PENDING'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.get(pk=self.orders[0]).status, 'DELIVERED')
+
+    def test_bulk_returns_changed_rows_and_skips_others(self):
+        Order.objects.filter(pk=self.orders[0]).update(status='SHIPPED')
+        data = self.bulk([*self.orders, 999999], 'PROCESSING', '?fields=id,status').json()
+        self.assertEqual(sorted(row['id'] for row in data['orders']), sorted(self.orders[1:]))
+        self.assertEqual({row['status'] for row in data['orders']}, {'PROCESSING'})
+        self.assertEqual([row['id'] for row in data['skipped']], [self.orders[0], 999999])
+
+    def test_invalid_fieldset_changes_nothing(self):
+        for query in ('?fields=bogus', '?fields=id,items.bogus'):
+            with self.subTest(query=query):
+                response = self.bulk(self.orders, 'CANCELLED', query)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(set(Order.objects.values_list('status', flat=True)), {'PENDING'})
+                self.product.refresh_from_db()
+                self.assertEqual(self.product.stock, 4)
+                self.assertFalse(OutboxJob.objects.filter(event=outbox.ORDER_STATUS_CHANGED).exists())
+
+    def test_cancel_restocks_and_moves_rollups(self):
+        data = self.bulk(self.orders[:2], 'CANCELLED').json()
+        self.assertEqual(data['products'], [{'id': self.product.pk, 'stock': 8}])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 8)
+        self.assertEqual(
+            set(OutboxJob.objects.filter(event=outbox.ORDER_STATUS_CHANGED).values_list('idempotency_key', flat=True)),
+            {f'{outbox.ORDER_STATUS_CHANGED}:{pk}:PENDING:CANCELLED' for pk in self.orders[:2]},
+        )
+
+        live = rollup_rows()
+        rebuild_rollups()
+        self.assertEqual(live, rollup_rows())
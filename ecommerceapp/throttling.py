@@ -0,0 +1,221 @@
+"""
+Rate limiting token bucket untuk DRF.
+
+Setiap kunci (scope + user/IP) disimpan sebagai satu angka: "theoretical arrival time"
+(TAT) algoritma GCRA, yang setara dengan token bucket berkapasitas N dan terisi ulang N
+token per periode untuk rate "N/periode" di REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+Memori per kunci tetap, dan tidak ada daftar timestamp seperti SimpleRateThrottle bawaan DRF.
+
+Store dipilih lewat RATE_LIMIT_STORE:
+
+* LocalMemoryBucketStore: dict per proses dengan lock, untuk development/test atau satu proses.
+* CacheBucketStore: cache Django bersama (Redis/Memcached) dengan cache.incr() yang atomik,
+  sehingga batasnya berlaku untuk semua proses dan server.
+
+RateLimitHeadersMiddleware menambahkan header RateLimit-Limit/Remaining/Reset dari bucket
+paling ketat yang dicek selama request; respons 429 membawa Retry-After dari DRF.
+"""
+import math
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+MICROSECONDS = 1_000_000
+
+_rates = {}
+_stores = {}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, interval antar token dalam mikrodetik); hasil disimpan per string rate."""
+    if rate not in _rates:
+        limit, period = rate.split('/')
+        _rates[rate] = (int(limit), PERIODS[period[0]] * MICROSECONDS // int(limit))
+    return _rates[rate]
+
+
+def get_store():
+    path = settings.RATE_LIMIT_STORE
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = import_string(path)()
+    return store
+
+
+class LocalMemoryBucketStore:
+    """Bucket di memori proses. Kunci yang bucket-nya sudah penuh lagi dibuang saat dict melewati max_keys."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, now, interval, capacity):
+        """Ambil satu token; kembalikan (diizinkan, TAT setelah token ini diambil)."""
+        with self._lock:
+            tat = max(self._tats.get(key, now), now) + interval
+            allowed = tat - now <= capacity
+            if allowed:
+                if len(self._tats) >= self.max_keys and key not in self._tats:
+                    self._tats = {k: v for k, v in self._tats.items() if v > now}
+                self._tats[key] = tat
+        return allowed, tat
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class CacheBucketStore:
+    """
+    Bucket di cache Django bersama. Jalur utama satu cache.incr() atomik ditambah touch()
+    untuk memperpanjang TTL (incr tidak mengubah kedaluwarsa kunci); token yang ditolak
+    dikembalikan dengan decr(). Saat bucket sudah penuh lagi (TAT tertinggal dari
+    waktu sekarang), TAT disetel ulang ke sekarang; request yang bersamaan tepat pada saat
+    itu bisa saling menimpa dan paling banyak mendapat beberapa token ekstra sekali itu.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def consume(self, key, now, interval, capacity):
+        key = f'ratelimit:{key}'
+        # Setelah capacity berlalu bucket pasti penuh lagi, jadi kunci boleh kedaluwarsa.
+        timeout = math.ceil(capacity / MICROSECONDS) + 1
+        try:
+            tat = self.cache.incr(key, interval)
+        except ValueError:
+            if self.cache.add(key, now + interval, timeout):
+                return True, now + interval
+            tat = self.cache.incr(key, interval)
+        if tat - interval < now:
+            tat = now + interval
+            self.cache.set(key, tat, timeout)
+        elif tat - now <= capacity:
+            # Tanpa ini kunci kedaluwarsa timeout detik setelah dibuat walau TAT masih di depan,
+            # dan klien yang terus mengirim request mendapat bucket penuh baru.
+            self.cache.touch(key, timeout)
+        if tat - now <= capacity:
+            return True, tat
+        self.cache.decr(key, interval)
+        return False, tat
+
+    def clear(self):
+        self.cache.clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        """Identitas bucket; None berarti request ini tidak dibatasi throttle ini."""
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        if not settings.RATE_LIMIT_ENABLED:
+            return True
+        rate = self.get_rate()
+        if rate is None:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+
+        limit, interval = parse_rate(rate)
+        capacity = limit * interval
+        now = time.time_ns() // 1000
+        allowed, tat = get_store().consume(f'{self.scope}:{ident}', now, interval, capacity)
+        if allowed:
+            remaining = (capacity - (tat - now)) // interval
+            reset = tat - now
+        else:
+            remaining = 0
+            reset = tat - now - capacity
+        self.retry_after = reset / MICROSECONDS
+
+        # Simpan bucket paling ketat untuk header RateLimit-* (lihat RateLimitHeadersMiddleware).
+        django_request = request._request
+        current = getattr(django_request, 'ratelimit', None)
+        if current is None or remaining < current[1]:
+            django_request.ratelimit = (limit, remaining, math.ceil(reset / MICROSECONDS))
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class AnonRateThrottle(TokenBucketThrottle):
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return f'ip:{self.get_ident(request)}'
+
+
+class UserRateThrottle(TokenBucketThrottle):
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return None
+
+
+class ScopedRateThrottle(TokenBucketThrottle):
+    """Batas tambahan untuk view yang mendefinisikan ``throttle_scope`` (mis. 'auth', 'checkout')."""
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        if self.scope is None:
+            return True
+        return super().allow_request(request, view)
+
+
+class SearchRateThrottle(TokenBucketThrottle):
+    """Pencarian full-text lebih mahal dari listing biasa, jadi punya bucket sendiri."""
+    scope = 'search'
+
+    def get_cache_key(self, request, view):
+        if not request.query_params.get('search'):
+            return None
+        return super().get_cache_key(request, view)
+
+
+class RateLimitHeadersMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.add_headers(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_headers(request, await self.get_response(request))
+
+    def add_headers(self, request, response):
+        ratelimit = getattr(request, 'ratelimit', None)
+        if ratelimit is not None:
+            limit, remaining, reset = ratelimit
+            response['RateLimit-Limit'] = str(limit)
+            response['RateLimit-Remaining'] = str(remaining)
+            response['RateLimit-Reset'] = str(reset)
+        return response
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from .instrumentation import metrics_view
 from .views import (
     ProductViewSet,
     CartItemViewSet,
@@ -13,7 +14,9 @@ from .views import (
     CategoryViewSet,
     MyTokenObtainPairView,
     UserProfileView,
-    ChangePasswordView
+    ChangePasswordView,
+    SellerAnalyticsView,
+    SuggestView,
 )
 
 router = DefaultRouter()
@@ -28,6 +31,8 @@ dashboard_router.register(r'sales', SellerSalesViewSet, basename='seller-sales')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('suggest/', SuggestView.as_view(), name='suggest'),
+    path('dashboard/analytics/', SellerAnalyticsView.as_view(), name='seller-analytics'),
     path('dashboard/', include(dashboard_router.urls)),
 
     path('auth/register/', RegisterView.as_view(), name='register'),
@@ -38,4 +43,6 @@ urlpatterns = [
 
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('profile/change-password/', ChangePasswordView.as_view(), name='change-password'),
+
+    path('metrics/', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,45 +1,84 @@
-from django.shortcuts import render
 from django.db import transaction
-from collections import defaultdict
+from django.shortcuts import render
+from django.utils import timezone
+from datetime import date, timedelta
 
 from rest_framework import viewsets, generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from .models import Product, CartItem, CustomUser, Order, OrderItem, Category
+from .analytics import PERIODS, sales_summary
+from .autocomplete import suggest
+from .cart import (
+    CartError, add_to_cart, apply_cart_operations, cart_summary, hold_cart_items, invalidate_cart_summary,
+)
+from .catalog_cache import CatalogCacheMixin
+from .checkout import CheckoutError, place_orders
+from .db_router import ReplicaReadMixin
+from .eager_loading import EagerLoadingMixin, eager_load
+from .exports import (
+    ORDER_STATUSES, PRODUCT_COLUMNS, PRODUCT_STATUSES, SALES_COLUMNS, ExportError, parse_filters,
+    product_rows, sales_rows, streaming_export,
+)
+from .fast_serialization import (
+    FAST_RENDERER_CLASSES, CategoryFastSerializer, FastSerializationMixin, OrderFastSerializer, OrderListFastSerializer,
+    ProductFastSerializer,
+)
+from .fieldsets import FieldSetMixin
+from .images import schedule_variants
+from .order_status import TransitionError, transition_orders
+from .pagination import KeysetPagination
+from .product_import import ProductImportError, detect_format, import_products, read_rows
+from .search import ProductSearchFilter, category_facets
+from .throttling import SearchRateThrottle
 from .serializers import (
     ProductSerializer, 
     CartItemReadSerializer, 
     CartItemWriteSerializer, 
+    CartBulkSerializer,
+    CartSummarySerializer,
     RegisterSerializer,
+    OrderListSerializer,
     OrderSerializer,
     SellerProductSerializer,
     SellerOrderUpdateSerializer,
+    OrderStatusBulkSerializer,
     CategorySerializer,
     ChangePasswordSerializer,
     UserProfileSerializer,
-    MyTokenObtainPairSerializer
+    MyTokenObtainPairSerializer,
+    SalesPeriodSerializer
 )
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = (permissions.AllowAny,) 
     queryset = CustomUser.objects.all()
+    throttle_scope = 'auth'
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    # Setiap percobaan login menjalankan hashing password yang mahal.
+    throttle_scope = 'auth'
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(CatalogCacheMixin, ReplicaReadMixin, FieldSetMixin, FastSerializationMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ProductSerializer
+    fast_serializer_classes = (ProductFastSerializer,)
+    renderer_classes = FAST_RENDERER_CLASSES
     permission_classes = (permissions.AllowAny,)
+    pagination_class = KeysetPagination
+    throttle_classes = (*api_settings.DEFAULT_THROTTLE_CLASSES, SearchRateThrottle)
     
-    filter_backends = [SearchFilter, DjangoFilterBackend]
-    search_fields = ['name', 'description']
+    filter_backends = [ProductSearchFilter, DjangoFilterBackend]
     filterset_fields = ['category__slug']
+    search_queryset = None
 
     def get_queryset(self):
         queryset = Product.objects.filter(is_active=True, stock__gt=0)
@@ -51,12 +90,35 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             
         return queryset
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.search_queryset is not None:
+            response.data['facets'] = {'category': category_facets(self.search_queryset)}
+        return response
+
+class SuggestView(APIView):
+    """Saran pencarian saat mengetik: hanya id dan nama produk, serta id, nama, slug kategori."""
+    # Tanpa autentikasi (tidak ada decode JWT/query user per ketukan); throttle per IP.
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'suggest'
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+        except ValueError:
+            return Response({"error": "Limit harus berupa angka."}, status=status.HTTP_400_BAD_REQUEST)
+        products, categories = suggest(request.query_params.get('q', ''), limit)
+        return Response({'products': products, 'categories': categories})
+
+class CategoryViewSet(CatalogCacheMixin, ReplicaReadMixin, FastSerializationMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    fast_serializer_classes = (CategoryFastSerializer,)
+    renderer_classes = FAST_RENDERER_CLASSES
     permission_classes = (permissions.AllowAny,)
 
-class CartItemViewSet(viewsets.ModelViewSet):
+class CartItemViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     permission_classes = (permissions.IsAuthenticated,) 
     
     def get_queryset(self):
@@ -65,32 +127,65 @@ class CartItemViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return CartItemReadSerializer
+        if self.action == 'bulk':
+            return CartBulkSerializer
+        if self.action == 'summary':
+            return CartSummarySerializer
         return CartItemWriteSerializer
 
     def perform_create(self, serializer):
         try:
-            cart_item = CartItem.objects.get(user=self.request.user, product=serializer.validated_data['product'])
-            cart_item.quantity += serializer.validated_data['quantity']
-            cart_item.save()
-        except CartItem.DoesNotExist:
-            serializer.save(user=self.request.user)
+            add_to_cart(self.request.user, serializer.validated_data['product'].pk, serializer.validated_data['quantity'])
+        except CartError as e:
+            raise ValidationError({"quantity": list(e.errors.values())})
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            apply_cart_operations(request.user, serializer.validated_data['items'])
+        except CartError as e:
+            return Response({"errors": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        cart = eager_load(CartItemReadSerializer, self.get_queryset()).order_by('added_at', 'id')
+        return Response(CartItemReadSerializer(cart, many=True, context=self.get_serializer_context()).data)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        serializer = self.get_serializer(cart_summary(request.user))
+        return Response(serializer.data)
 
+    @transaction.atomic
     def perform_update(self, serializer):
+        invalidate_cart_summary(self.request.user.pk)
+        product_ids = {serializer.instance.product_id}
         if serializer.validated_data.get('quantity') <= 0:
             instance = self.get_object()
             instance.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        serializer.save(user=self.request.user)
+        else:
+            product_ids.add(serializer.save(user=self.request.user).product_id)
+        try:
+            hold_cart_items(self.request.user, product_ids)
+        except CartError as e:
+            raise ValidationError({"quantity": list(e.errors.values())})
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        invalidate_cart_summary(self.request.user.pk)
+        instance.delete()
+        hold_cart_items(self.request.user, [instance.product_id])
 
 class CheckoutView(generics.GenericAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = OrderSerializer 
+    throttle_scope = 'checkout'
 
     def post(self, request, *args, **kwargs):
         user = request.user
-        cart_items = CartItem.objects.filter(user=user).select_related('product__seller')
+        cart_items = list(CartItem.objects.filter(user=user).select_related('product__seller'))
 
-        if not cart_items.exists():
+        if not cart_items:
             return Response({"error": "Keranjang Anda kosong."}, status=status.HTTP_400_BAD_REQUEST)
 
         for item in cart_items:
@@ -104,57 +199,32 @@ class CheckoutView(generics.GenericAPIView):
         if not shipping_address:
             return Response({"error": "Alamat pengiriman diperlukan."}, status=status.HTTP_400_BAD_REQUEST)
 
-        seller_cart_groups = defaultdict(list)
-        for item in cart_items:
-            seller = item.product.seller
-            seller_cart_groups[seller].append(item)
-
-        created_orders = []
-
         try:
-            with transaction.atomic():
-                for seller, items in seller_cart_groups.items():
-                    
-                    total_amount = sum(item.get_total_price() for item in items)
-
-                    order = Order.objects.create(
-                        user=user,              
-                        seller=seller,          
-                        total_amount=total_amount,
-                        shipping_address=shipping_address,
-                        status='PENDING'
-                    )
-
-                    for item in items:
-                        OrderItem.objects.create(
-                            order=order,
-                            product=item.product,
-                            quantity=item.quantity,
-                            price=item.product.price 
-                        )
-                        
-                        product = item.product
-                        if product.stock < item.quantity:
-                            raise Exception(f'Stok untuk {product.name} tidak mencukupi.')
-                        product.stock -= item.quantity
-                        product.save()
-
-                    created_orders.append(order)
-                
-                cart_items.delete()
-
-            serializer = self.get_serializer(created_orders, many=True)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
+            created_orders = place_orders(user, cart_items, shipping_address)
+        except CheckoutError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class OrderViewSet(viewsets.ReadOnlyModelViewSet):
-    serializer_class = OrderSerializer
+        created_orders = eager_load(
+            self.get_serializer_class(),
+            Order.objects.filter(pk__in=[order.pk for order in created_orders]).order_by('id'),
+        )
+        serializer = self.get_serializer(created_orders, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class OrderViewSet(ReplicaReadMixin, FieldSetMixin, FastSerializationMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    fast_serializer_classes = (OrderListFastSerializer, OrderFastSerializer)
+    renderer_classes = FAST_RENDERER_CLASSES
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).order_by('-created_at')
+        return Order.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+    def get_serializer_class(self):
+        # Daftar memakai kolom ringkasan; item lengkap hanya di detail.
+        if self.action == 'list':
+            return OrderListSerializer
+        return OrderSerializer
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
     queryset = CustomUser.objects.all()
@@ -178,7 +248,7 @@ class ChangePasswordView(generics.GenericAPIView):
         
         return Response({"detail": "Password berhasil diubah."}, status=status.HTTP_200_OK)
 
-class SellerProductViewSet(viewsets.ModelViewSet):
+class SellerProductViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = SellerProductSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -186,18 +256,119 @@ class SellerProductViewSet(viewsets.ModelViewSet):
         return Product.objects.filter(seller=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(seller=self.request.user)
+        product = serializer.save(seller=self.request.user)
+        if product.image:
+            schedule_variants(product.pk)
+
+    def perform_update(self, serializer):
+        product = serializer.save()
+        if 'image' in serializer.validated_data:
+            schedule_variants(product.pk)
+
+    @action(detail=False, methods=['get'], url_path='export/(?P<fmt>csv|ndjson)')
+    def export(self, request, fmt):
+        try:
+            filters = parse_filters(request.query_params, list(PRODUCT_STATUSES))
+        except ExportError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = product_rows(request.user, **filters)
+        return streaming_export(request._request, PRODUCT_COLUMNS, rows, fmt, 'produk')
 
-class SellerSalesViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        # Body dibaca langsung dari stream request Django (tanpa parser DRF), atau dari field
+        # multipart "file", sehingga file besar tidak dimuat utuh ke memori.
+        try:
+            if request.content_type.startswith('multipart/'):
+                upload = request._request.FILES.get('file')
+                if upload is None:
+                    return Response({"error": "Field file wajib diisi."}, status=status.HTTP_400_BAD_REQUEST)
+                lines = upload
+                fmt = detect_format(upload.content_type, upload.name)
+            else:
+                lines = request._request
+                fmt = detect_format(request.content_type)
+            result = import_products(request.user, read_rows(lines, fmt))
+        except ProductImportError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+class SellerSalesViewSet(FieldSetMixin, FastSerializationMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
+    fast_serializer_classes = (OrderListFastSerializer, OrderFastSerializer)
+    renderer_classes = FAST_RENDERER_CLASSES
+    fieldset_actions = ('list', 'retrieve', 'bulk_status')
 
     def get_queryset(self):
-        return Order.objects.filter(seller=self.request.user).order_by('-created_at')
+        return Order.objects.filter(seller=self.request.user).order_by('-created_at', '-id')
 
     def get_serializer_class(self):
         if self.action == 'update' or self.action == 'partial_update':
             return SellerOrderUpdateSerializer
+        if self.action == 'bulk_status':
+            return OrderStatusBulkSerializer
+        if self.action == 'list':
+            return OrderListSerializer
         return OrderSerializer
     
     def perform_update(self, serializer):
-        serializer.save()
\ No newline at end of file
+        serializer.save()
+
+    @action(detail=False, methods=['post'], url_path='status')
+    def bulk_status(self, request):
+        """
+        Ubah status banyak order sekaligus: ``{"ids": [...], "status": "SHIPPED"}``. Respons hanya
+        berisi baris yang berubah (bentuknya mengikuti ?fields=), order yang dilewati beserta
+        alasannya, dan stok terbaru produk yang dikembalikan oleh pembatalan.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            # ?fields= baru divalidasi saat serializer respons dibangun; FieldSetError di dalam
+            # transaksi ini ikut membatalkan perubahan status, stok, rollup, dan job outbox.
+            with transaction.atomic():
+                changed, skipped, restocked = transition_orders(
+                    request.user, serializer.validated_data['ids'], serializer.validated_data['status'],
+                )
+                orders = eager_load(OrderListSerializer, self.get_queryset().filter(id__in=changed), self.fieldset)
+                data = OrderListSerializer(orders, many=True, context=self.get_serializer_context()).data
+        except TransitionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        products = []
+        if restocked:
+            products = list(Product.objects.filter(id__in=list(restocked)).order_by('id').values('id', 'stock'))
+        return Response({"orders": data, "skipped": skipped, "products": products})
+
+    @action(detail=False, methods=['get'], url_path='export/(?P<fmt>csv|ndjson)')
+    def export(self, request, fmt):
+        try:
+            filters = parse_filters(request.query_params, ORDER_STATUSES)
+        except ExportError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = sales_rows(request.user, **filters)
+        return streaming_export(request._request, SALES_COLUMNS, rows, fmt, 'penjualan')
+
+class SellerAnalyticsView(generics.GenericAPIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = SalesPeriodSerializer
+
+    def get(self, request, *args, **kwargs):
+        period = request.query_params.get('period', 'day')
+        if period not in PERIODS:
+            return Response({"error": "Periode harus salah satu dari day, week, month."}, status=status.HTTP_400_BAD_REQUEST)
+
+        end = timezone.localdate()
+        start = end - timedelta(days=30)
+        try:
+            if request.query_params.get('start'):
+                start = date.fromisoformat(request.query_params['start'])
+            if request.query_params.get('end'):
+                end = date.fromisoformat(request.query_params['end'])
+        except ValueError:
+            return Response({"error": "Format tanggal harus YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = sales_summary(request.user, period, start, end)
+        serializer = self.get_serializer(results, many=True)
+        return Response({"period": period, "start": start, "end": end, "results": serializer.data})
@@ -1,13 +1,19 @@
 import React, { useState, useEffect, useContext } from "react";
+import { Link } from "react-router-dom";
 import axios from "axios";
 import AuthContext from "../context/AuthContext";
 import ProductCard from "../components/ProductCard";
 
+// Hanya field yang ditampilkan ProductCard (lihat ?fields= di API).
+const CARD_FIELDS = "id,name,price,stock,image,category.name,category.slug";
+
 const HomePage = () => {
   const { user } = useContext(AuthContext);
   const [products, setProducts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const [query, setQuery] = useState('');
+  const [suggestions, setSuggestions] = useState({ products: [], categories: [] });
   const [nextPageUrl, setNextPageUrl] = useState(null);
   const [categories, setCategories] = useState([]);
   const [selectedCategory, setSelectedCategory] = useState(null);
@@ -48,8 +54,40 @@ const HomePage = () => {
     fetchCategories();
   }, []);
 
+  // Saran saat mengetik diambil dari endpoint suggest yang ringan; pencarian penuh
+  // (products/?search=) baru dijalankan saat Enter ditekan atau saran kategori dipilih.
+  useEffect(() => {
+    if (!query.trim() || query === searchTerm) {
+      setSuggestions({ products: [], categories: [] });
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get("http://127.0.0.1:8000/api/v1/suggest/", { params: { q: query } });
+        if (!cancelled) setSuggestions(response.data);
+      } catch (error) {
+        console.error("Gagal mengambil saran pencarian:", error);
+      }
+    }, 100);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, searchTerm]);
+
+  const submitSearch = (e) => {
+    e.preventDefault();
+    setSearchTerm(query);
+  };
+
+  const clearSearch = () => {
+    setQuery('');
+    setSearchTerm('');
+  };
+
   useEffect(() => {
-    let url = `http://127.0.0.1:8000/api/v1/products/?search=${searchTerm}`;
+    let url = `http://127.0.0.1:8000/api/v1/products/?search=${encodeURIComponent(searchTerm)}&fields=${CARD_FIELDS}`;
 
     if (selectedCategory) {
       url += `&category__slug=${selectedCategory}`;
@@ -72,26 +110,56 @@ const HomePage = () => {
             </div>
           </div>
 
-          <div className="relative max-w-2xl">
+          <form onSubmit={submitSearch} className="relative max-w-2xl">
             <span className="material-icons absolute left-4 top-1/2 transform -translate-y-1/2 text-gray-400">
               search
             </span>
             <input
               type="text"
               placeholder="Cari produk..."
-              value={searchTerm}
-              onChange={(e) => setSearchTerm(e.target.value)}
+              value={query}
+              onChange={(e) => setQuery(e.target.value)}
               className="w-full pl-12 pr-4 py-3 border border-gray-200 rounded-xl focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent transition-all"
             />
-            {searchTerm && (
+            {query && (
               <button
-                onClick={() => setSearchTerm('')}
+                type="button"
+                onClick={clearSearch}
                 className="absolute right-4 top-1/2 transform -translate-y-1/2 text-gray-400 hover:text-gray-600"
               >
                 <span className="material-icons">close</span>
               </button>
             )}
-          </div>
+            {(suggestions.products.length > 0 || suggestions.categories.length > 0) && (
+              <ul className="absolute z-10 left-0 right-0 mt-2 bg-white border border-gray-200 rounded-xl shadow-lg overflow-hidden">
+                {suggestions.categories.map(category => (
+                  <li key={`category-${category.id}`}>
+                    <button
+                      type="button"
+                      onClick={() => {
+                        setSelectedCategory(category.slug);
+                        clearSearch();
+                      }}
+                      className="w-full text-left px-4 py-2 hover:bg-gray-50 flex items-center space-x-2"
+                    >
+                      <span className="material-icons text-gray-400 text-base">category</span>
+                      <span>{category.name}</span>
+                    </button>
+                  </li>
+                ))}
+                {suggestions.products.map(product => (
+                  <li key={`product-${product.id}`}>
+                    <Link
+                      to={`/product/${product.id}`}
+                      className="block px-4 py-2 hover:bg-gray-50 text-gray-700"
+                    >
+                      {product.name}
+                    </Link>
+                  </li>
+                ))}
+              </ul>
+            )}
+          </form>
         </div>
 
         <div className="mb-8">
@@ -6,12 +6,31 @@ import { Link } from 'react-router-dom';
 const OrderHistoryPage = () => {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  // Item lengkap per order, dimuat dari detail order saat dibuka.
+  const [details, setDetails] = useState({});
+
+  const toggleItems = async (orderId) => {
+    if (details[orderId]) {
+      setDetails(({ [orderId]: _, ...rest }) => rest);
+      return;
+    }
+    try {
+      const response = await axiosInstance.get(`/orders/${orderId}/`, {
+        params: { fields: 'items.quantity,items.price,items.product.name' },
+      });
+      setDetails(prev => ({ ...prev, [orderId]: response.data.items }));
+    } catch (error) {
+      console.error("Gagal mengambil item order:", error);
+    }
+  };
 
   useEffect(() => {
     const fetchOrders = async () => {
       setLoading(true);
       try {
-        const response = await axiosInstance.get('/orders/');
+        const response = await axiosInstance.get('/orders/', {
+          params: { fields: 'id,created_at,status,total_amount,shipping_address,item_count,total_units,preview_product_name,preview_image' },
+        });
         setOrders(response.data.results);
       } catch (error) {
         console.error("Gagal mengambil riwayat order:", error);
@@ -125,26 +144,48 @@ const OrderHistoryPage = () => {
                     <span className="material-icons text-sm">inventory_2</span>
                     <span>Item Pesanan</span>
                   </h4>
-                  <div className="space-y-3">
-                    {order.items.map((item, index) => (
-                      <div key={index} className="flex items-center justify-between p-3 bg-gray-50 rounded-lg">
-                        <div className="flex items-center space-x-3">
-                          <div className="w-12 h-12 bg-blue-100 rounded-lg flex items-center justify-center">
-                            <span className="material-icons text-blue-600">inventory</span>
-                          </div>
+                  <div className="flex items-center justify-between p-3 bg-gray-50 rounded-lg">
+                    <div className="flex items-center space-x-3">
+                      {order.preview_image ? (
+                        <img src={order.preview_image} alt={order.preview_product_name} className="w-12 h-12 rounded-lg object-cover" />
+                      ) : (
+                        <div className="w-12 h-12 bg-blue-100 rounded-lg flex items-center justify-center">
+                          <span className="material-icons text-blue-600">inventory</span>
+                        </div>
+                      )}
+                      <div>
+                        <p className="font-medium text-gray-800">
+                          {order.preview_product_name || 'Produk dihapus'}
+                          {order.item_count > 1 && ` + ${order.item_count - 1} produk lainnya`}
+                        </p>
+                        <p className="text-sm text-gray-500">{order.total_units} unit</p>
+                      </div>
+                    </div>
+                    <button
+                      onClick={() => toggleItems(order.id)}
+                      className="text-sm font-medium text-blue-600 hover:underline"
+                    >
+                      {details[order.id] ? 'Sembunyikan' : 'Lihat item'}
+                    </button>
+                  </div>
+
+                  {details[order.id] && (
+                    <div className="space-y-3 mt-3">
+                      {details[order.id].map((item, index) => (
+                        <div key={index} className="flex items-center justify-between p-3 bg-gray-50 rounded-lg">
                           <div>
-                            <p className="font-medium text-gray-800">{item.product.name}</p>
+                            <p className="font-medium text-gray-800">{item.product ? item.product.name : 'Produk dihapus'}</p>
                             <p className="text-sm text-gray-500">
                               {item.quantity}x @ Rp {parseFloat(item.price).toLocaleString('id-ID')}
                             </p>
                           </div>
+                          <p className="font-semibold text-gray-800">
+                            Rp {(parseFloat(item.price) * item.quantity).toLocaleString('id-ID')}
+                          </p>
                         </div>
-                        <p className="font-semibold text-gray-800">
-                          Rp {(parseFloat(item.price) * item.quantity).toLocaleString('id-ID')}
-                        </p>
-                      </div>
-                    ))}
-                  </div>
+                      ))}
+                    </div>
+                  )}
 
                   {/* Shipping Address */}
                   <div className="mt-4 p-4 bg-blue-50 rounded-lg">
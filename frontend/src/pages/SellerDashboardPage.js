@@ -4,25 +4,34 @@ import axiosInstance from '../api/AxiosInstance';
 import { Link } from 'react-router-dom';
 import { toast } from 'react-toastify';
 
-const ORDER_STATUS_CHOICES = [
-  'PENDING',
-  'PROCESSING',
-  'SHIPPED',
-  'DELIVERED',
-  'CANCELLED',
-];
+// Sama dengan order_status.TRANSITIONS di backend: status tujuan yang boleh dipilih per status.
+const ORDER_STATUS_TRANSITIONS = {
+  PENDING: ['PROCESSING', 'CANCELLED'],
+  PROCESSING: ['SHIPPED', 'CANCELLED'],
+  SHIPPED: ['DELIVERED'],
+  DELIVERED: [],
+  CANCELLED: [],
+};
+
+const BULK_STATUS_CHOICES = ['PROCESSING', 'SHIPPED', 'DELIVERED', 'CANCELLED'];
+
+const SALES_FIELDS = 'id,user.email,total_amount,status';
 
 const SellerDashboardPage = () => {
   const [sales, setSales] = useState([]);
   const [products, setProducts] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [selected, setSelected] = useState([]);
+  const [bulkStatus, setBulkStatus] = useState('PROCESSING');
 
   // --- FUNGSI UNTUK MENGAMBIL DATA ---
   const fetchData = async () => {
     setLoading(true);
     try {
       // 1. Ambil data Penjualan (Sales)
-      const salesResponse = await axiosInstance.get('/dashboard/sales/');
+      const salesResponse = await axiosInstance.get('/dashboard/sales/', {
+        params: { fields: SALES_FIELDS },
+      });
 
       // --- PERBAIKAN 1 DI SINI ---
       setSales(salesResponse.data.results); // Ambil dari .results
@@ -59,21 +68,48 @@ const SellerDashboardPage = () => {
     }
   };
 
-  const handleOrderStatusUpdate = async (orderId, newStatus) => {
+  // Ubah status lewat endpoint massal; respons hanya berisi order yang berubah dan stok
+  // produk yang dikembalikan pembatalan, jadi state cukup ditambal tanpa memuat ulang.
+  const updateOrderStatus = async (orderIds, newStatus) => {
     try {
-      // Kirim PATCH request ke API dashboard/sales/
-      await axiosInstance.patch(`/dashboard/sales/${orderId}/`, {
-        status: newStatus,
-      });
-      toast.sucess(`Order #${orderId} telah diupdate ke ${newStatus}`);
-      // Muat ulang data sales untuk menampilkan status baru
-      fetchData();
+      const { data } = await axiosInstance.post(
+        '/dashboard/sales/status/',
+        { ids: orderIds, status: newStatus },
+        { params: { fields: SALES_FIELDS } },
+      );
+      const changed = new Map(data.orders.map((order) => [order.id, order]));
+      setSales((prev) => prev.map((order) => changed.get(order.id) || order));
+      if (data.products.length > 0) {
+        const stock = new Map(data.products.map((product) => [product.id, product.stock]));
+        setProducts((prev) => prev.map((product) => (
+          stock.has(product.id) ? { ...product, stock: stock.get(product.id) } : product
+        )));
+      }
+      setSelected((prev) => prev.filter((id) => !changed.has(id)));
+
+      if (data.orders.length > 0) {
+        toast.success(`${data.orders.length} order telah diupdate ke ${newStatus}`);
+      }
+      if (data.skipped.length > 0) {
+        toast.warn(`${data.skipped.length} order dilewati: ${data.skipped[0].error}`);
+      }
     } catch (error) {
       console.error("Gagal update status order:", error);
-      toast.error("Gagal update status.");
+      toast.error(error.response?.data?.error || "Gagal update status.");
     }
   };
 
+  const toggleSelected = (orderId) => {
+    setSelected((prev) => (
+      prev.includes(orderId) ? prev.filter((id) => id !== orderId) : [...prev, orderId]
+    ));
+  };
+
+  const selectableIds = sales
+    .filter((order) => ORDER_STATUS_TRANSITIONS[order.status].length > 0)
+    .map((order) => order.id);
+  const allSelected = selectableIds.length > 0 && selectableIds.every((id) => selected.includes(id));
+
   if (loading) return <p className="p-8 text-center text-xl">Loading Dashboard...</p>;
 
   return (
@@ -82,11 +118,39 @@ const SellerDashboardPage = () => {
 
       {/* Bagian Penjualan (Sales) */}
       <div className="mb-12">
-        <h2 className="text-2xl font-semibold mb-4">Order Masuk (Penjualan)</h2>
+        <div className="flex justify-between items-center mb-4">
+          <h2 className="text-2xl font-semibold">Order Masuk (Penjualan)</h2>
+          <div className="flex items-center gap-2">
+            <span className="text-sm text-gray-600">{selected.length} dipilih</span>
+            <select
+              value={bulkStatus}
+              onChange={(e) => setBulkStatus(e.target.value)}
+              className="border rounded px-2 py-1"
+            >
+              {BULK_STATUS_CHOICES.map(status => (
+                <option key={status} value={status}>{status}</option>
+              ))}
+            </select>
+            <button
+              onClick={() => updateOrderStatus(selected, bulkStatus)}
+              disabled={selected.length === 0}
+              className="bg-blue-600 text-white px-4 py-1 rounded font-semibold hover:bg-blue-700 disabled:opacity-50"
+            >
+              Ubah Status
+            </button>
+          </div>
+        </div>
         <div className="bg-white shadow rounded-lg overflow-x-auto">
           <table className="min-w-full divide-y divide-gray-200">
             <thead className="bg-gray-100">
               <tr>
+                <th className="px-6 py-3">
+                  <input
+                    type="checkbox"
+                    checked={allSelected}
+                    onChange={() => setSelected(allSelected ? [] : selectableIds)}
+                  />
+                </th>
                 <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Order ID</th>
                 <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Pembeli</th>
                 <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Total</th>
@@ -97,6 +161,14 @@ const SellerDashboardPage = () => {
             <tbody className="bg-white divide-y divide-gray-200">
               {sales.length > 0 ? sales.map((order) => (
                 <tr key={order.id}>
+                  <td className="px-6 py-4">
+                    <input
+                      type="checkbox"
+                      checked={selected.includes(order.id)}
+                      disabled={ORDER_STATUS_TRANSITIONS[order.status].length === 0}
+                      onChange={() => toggleSelected(order.id)}
+                    />
+                  </td>
                   <td className="px-6 py-4 font-medium">#{order.id}</td>
                   <td className="px-6 py-4">{order.user ? order.user.email : 'N/A'}</td>
                   <td className="px-6 py-4 font-semibold">Rp {parseFloat(order.total_amount).toLocaleString('id-ID')}</td>
@@ -114,17 +186,18 @@ const SellerDashboardPage = () => {
                   <td className="px-6 py-4">
                     <select
                       value={order.status}
-                      onChange={(e) => handleOrderStatusUpdate(order.id, e.target.value)}
+                      onChange={(e) => updateOrderStatus([order.id], e.target.value)}
+                      disabled={ORDER_STATUS_TRANSITIONS[order.status].length === 0}
                       className="border rounded px-2 py-1"
                     >
-                      {ORDER_STATUS_CHOICES.map(status => (
+                      {[order.status, ...ORDER_STATUS_TRANSITIONS[order.status]].map(status => (
                         <option key={status} value={status}>{status}</option>
                       ))}
                     </select>
                   </td>
                 </tr>
               )) : (
-                <tr><td colSpan="5" className="p-4 text-center">Belum ada penjualan.</td></tr>
+                <tr><td colSpan="6" className="p-4 text-center">Belum ada penjualan.</td></tr>
               )}
             </tbody>
           </table>